@@ -1,9 +1,9 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-import uuid
+from _global.uuids import uuid7
 
 class UserSettings(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.OneToOneField(get_user_model(), on_delete=models.CASCADE, related_name='user_settings')
     
     # subscription
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BucketsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = '_buckets'
+
+    def ready(self):
+        from . import content
+        content.setup()
@@ -0,0 +1,156 @@
+"""
+Bucket content: the members of all nine relations of a bucket as one stream, newest first.
+
+A page is read in two steps. For every non-empty relation (per the cached counts), a keyset query selects
+(created_at, id) of its next `per_page + 1` members; the sorted streams are merged and cut at the page size.
+(A single UNION ALL would need ORDER BY/LIMIT inside its branches, which SQLite doesn't allow.) The page is
+then hydrated with one query per kind present on it, plus that kind's prefetches, so only `per_page` objects
+are ever loaded, however large the bucket is. The through-tables carry no created_at, so each relation query
+still sorts that relation's members of the bucket in the database.
+
+Member counts per relation come from a single query of through-table subqueries and are cached per
+bucket; m2m_changed and member deletion invalidate them.
+"""
+import heapq
+from collections import namedtuple
+
+from django.db.models import F, Func, IntegerField, OuterRef, Subquery
+from django.db.models.signals import m2m_changed, pre_delete
+
+from _global.cache import tiered_cache
+from _global.pagination import KeysetPage, decode_cursor, encode_cursor, keyset_after
+from .models import Bucket
+
+CURSOR_SCOPE = "_buckets.content"
+COUNTS_TIMEOUT = 60 * 60
+
+# (relation on Bucket, prefetch_related lookups when hydrating a page)
+MEMBER_TYPES = [
+    ("documents", ("tags",)),
+    ("files", ("tags",)),
+    ("images", ("tags",)),
+    ("links", ()),
+    ("contacts", ("tags",)),
+    ("shopping_lists", ()),
+    ("recipes", ()),
+    ("tasks", ("tags",)),
+    ("trips", ()),
+]
+
+class BucketMember(namedtuple("BucketMember", "kind created_at obj")):
+    """A member of a bucket; `kind` is the Bucket relation it belongs to."""
+
+    __slots__ = ()
+
+    @property
+    def label(self):
+        return self.obj._meta.verbose_name
+
+
+def _field(relation):
+    return Bucket._meta.get_field(relation)
+
+
+def _member_rows(bucket, after, limit):
+    """(kind, pk, created_at) of the next `limit` members after the (created_at, pk) `after`, newest first."""
+    counts = member_counts(bucket.pk)
+    streams = []
+    for relation, _ in MEMBER_TYPES:
+        if not counts[relation]:
+            continue
+        queryset = _field(relation).related_model.objects.filter(buckets=bucket)
+        if after is not None:
+            queryset = queryset.filter(keyset_after("created_at", *after, descending=True))
+        rows = queryset.order_by("-created_at", "-pk").values_list("created_at", "pk")[:limit]
+        streams.append([(created_at, pk, relation) for created_at, pk in rows])
+    merged = heapq.merge(*streams, key=lambda row: (row[0], row[1]), reverse=True)
+    return [(kind, pk, created_at) for created_at, pk, kind in list(merged)[:limit]]
+
+
+def _hydrate(rows):
+    ids_by_kind = {}
+    for kind, pk, _ in rows:
+        ids_by_kind.setdefault(kind, []).append(pk)
+    objects = {}
+    for relation, prefetch in MEMBER_TYPES:
+        if relation in ids_by_kind:
+            queryset = _field(relation).related_model.objects.filter(pk__in=ids_by_kind[relation]).prefetch_related(*prefetch)
+            objects.update(((relation, obj.pk), obj) for obj in queryset)
+    # a member deleted between the two queries is skipped
+    return [BucketMember(kind, created_at, objects[kind, pk]) for kind, pk, created_at in rows if (kind, pk) in objects]
+
+
+def bucket_members(bucket, cursor=None, per_page=50):
+    """The KeysetPage of BucketMembers after `cursor` (the first page without one)."""
+    # every member model has the same created_at and pk types as Bucket
+    created_at = Bucket._meta.get_field("created_at")
+    decoded = decode_cursor(cursor, created_at, Bucket._meta.pk, CURSOR_SCOPE)
+    rows = _member_rows(bucket, decoded[1:] if decoded else None, per_page + 1)
+    members = _hydrate(rows[:per_page])
+    has_next = len(rows) > per_page and bool(members)
+    return KeysetPage(members, next_cursor=encode_cursor(created_at, members[-1].obj, "next", CURSOR_SCOPE) if has_next else None)
+
+
+# --- COUNTS ---
+
+def bucket_namespace(bucket_id):
+    return f"bucket:{bucket_id}"
+
+
+def compute_member_counts(bucket_id):
+    """{relation: member count} in one query."""
+    counts = {}
+    for relation, _ in MEMBER_TYPES:
+        field = _field(relation)
+        through = field.remote_field.through
+        counts[f"{relation}_count"] = Subquery(
+            # COUNT as a plain function, so the subquery isn't grouped
+            through.objects.filter(**{field.m2m_field_name(): OuterRef("pk")})
+            .annotate(count=Func(F("pk"), function="COUNT")).values("count"),
+            output_field=IntegerField(),
+        )
+    row = Bucket.objects.filter(pk=bucket_id).values(**counts).first() or {}
+    return {relation: row.get(f"{relation}_count", 0) for relation, _ in MEMBER_TYPES}
+
+
+def member_counts(bucket_id):
+    """Cached compute_member_counts(); invalidated whenever a member is added, removed or deleted."""
+    return tiered_cache.get_or_set(
+        "counts", lambda: compute_member_counts(bucket_id), COUNTS_TIMEOUT, namespace=bucket_namespace(bucket_id),
+    )
+
+
+# bulk_create() into a through-table and raw SQL don't send these signals; the counts of such
+# buckets are stale until COUNTS_TIMEOUT unless invalidate_bucket() is called.
+def invalidate_bucket(bucket_id):
+    tiered_cache.bump(bucket_namespace(bucket_id))
+
+
+def members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # bucket.documents.add(...)
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_bucket(instance.pk)
+    elif action == "pre_clear":
+        # document.buckets.clear(): the buckets are unknown afterwards
+        instance._cleared_bucket_ids = list(instance.buckets.values_list("pk", flat=True))
+    elif action == "post_clear":
+        for bucket_id in instance.__dict__.pop("_cleared_bucket_ids", ()):
+            invalidate_bucket(bucket_id)
+    elif action in ("post_add", "post_remove"):
+        for bucket_id in pk_set or ():
+            invalidate_bucket(bucket_id)
+
+
+def member_deleted(sender, instance, **kwargs):
+    # pre_delete: the through rows are gone (without m2m_changed) once the member is deleted
+    for bucket_id in instance.buckets.values_list("pk", flat=True):
+        invalidate_bucket(bucket_id)
+
+
+def setup():
+    for relation, _ in MEMBER_TYPES:
+        field = _field(relation)
+        uid = f"_buckets.content.{relation}"
+        m2m_changed.connect(members_changed, sender=field.remote_field.through, dispatch_uid=uid)
+        pre_delete.connect(member_deleted, sender=field.related_model, dispatch_uid=uid)
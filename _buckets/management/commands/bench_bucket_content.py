@@ -0,0 +1,101 @@
+import json
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from _buckets.content import MEMBER_TYPES, bucket_members, compute_member_counts, invalidate_bucket, member_counts
+from _buckets.models import Bucket, Document, File, Image, Link
+from _global.benchmarking import throwaway_database, median_ms
+from _global.seeding import (
+    bulk_link, seed_bucket_resources, seed_contacts, seed_recipes, seed_shopping_lists, seed_tags, seed_tasks, seed_trips,
+)
+
+
+def naive_members(bucket):
+    """What the stream replaces: every member of every relation loaded and sorted in Python."""
+    members = [
+        (obj.created_at, obj.pk, relation, obj)
+        for relation, prefetch in MEMBER_TYPES
+        for obj in getattr(bucket, relation).prefetch_related(*prefetch)
+    ]
+    members.sort(key=lambda member: (member[0], member[1]), reverse=True)
+    return members
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway database with one bucket holding members of every type and measures "
+        "the first and a deep page of the member stream, a full load and the member counts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--members", type=int, default=50_000, help="Members of the bucket, spread over the nine relations")
+        parser.add_argument("--per-page", type=int, default=50, help="Members per page")
+        parser.add_argument("--depth", type=int, default=200, help="Pages walked before measuring the deep page")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the median is reported")
+        parser.add_argument("--skip-naive", action="store_true", help="Don't load the whole bucket")
+        parser.add_argument("--report", help="Write a JSON report to this path")
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            result = self.run_benchmark(options)
+
+        for key, value in result.items():
+            self.stdout.write(f"{key}: {value}")
+        if options["report"]:
+            with open(options["report"], "w") as f:
+                json.dump(result, f, indent=2)
+
+    def seed(self, options):
+        rng = random.Random(0)
+        user = get_user_model().objects.create_user("bench-buckets", password="bench")
+        per_relation = max(1, options["members"] // len(MEMBER_TYPES))
+        tagging = {"tags_per_object": 2, "rng": rng, "batch_size": 5000}
+        tag_pks = seed_tags(user, 50, rng)
+        members = {
+            "documents": seed_bucket_resources(user, Document, per_relation, tag_pks, **tagging),
+            "files": seed_bucket_resources(user, File, per_relation, tag_pks, **tagging),
+            "images": seed_bucket_resources(user, Image, per_relation, tag_pks, **tagging),
+            "links": seed_bucket_resources(user, Link, per_relation, **tagging),
+            "contacts": seed_contacts(user, per_relation, 0, tag_pks, **tagging),
+            "shopping_lists": seed_shopping_lists(user, per_relation, 0, [], rng, 5000),
+            "recipes": seed_recipes(user, per_relation, 0, [], rng, 5000),
+            "tasks": seed_tasks(user, per_relation, tag_pks, **tagging),
+            "trips": seed_trips(user, per_relation, 0, 0, 0, rng, 5000),
+        }
+        bucket = Bucket.objects.create(created_by=user, name="Everything")
+        for relation, pks in members.items():
+            bulk_link(Bucket, relation, ((bucket.pk, pk) for pk in pks), 5000)
+        return bucket
+
+    def run_benchmark(self, options):
+        bucket = self.seed(options)
+        repeat, per_page = options["repeat"], options["per_page"]
+
+        cursor = None
+        for _ in range(options["depth"]):
+            page = bucket_members(bucket, cursor, per_page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        with CaptureQueriesContext(connection) as queries:
+            bucket_members(bucket, None, per_page)
+        result = {
+            "members": sum(compute_member_counts(bucket.pk).values()),
+            "per_page": per_page,
+            "page_queries": len(queries),
+            "first_page_ms": median_ms(lambda: bucket_members(bucket, None, per_page), repeat),
+            "deep_page_ms": median_ms(lambda: bucket_members(bucket, cursor, per_page), repeat),
+            "counts_ms": median_ms(lambda: compute_member_counts(bucket.pk), repeat),
+        }
+        invalidate_bucket(bucket.pk)
+        member_counts(bucket.pk)
+        result["counts_cached_ms"] = median_ms(lambda: member_counts(bucket.pk), repeat)
+        result["counts_naive_ms"] = median_ms(lambda: {relation: getattr(bucket, relation).count() for relation, _ in MEMBER_TYPES}, repeat)
+        if not options["skip_naive"]:
+            result["naive_first_page_ms"] = median_ms(lambda: naive_members(bucket)[:per_page], 1)
+        return result
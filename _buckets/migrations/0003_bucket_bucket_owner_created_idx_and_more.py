@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('_buckets', '0002_bucket_tags_file_tags_image_tags'),
+        ('_contacts', '0005_contact_contact_owner_created_idx_and_more'),
+        ('_global', '0002_tag_tag_owner_name_idx'),
+        ('_shopping', '0005_shoppinglist_shoplist_owner_archived_idx_and_more'),
+        ('_tasks', '0002_task_task_owner_status_prio_idx_and_more'),
+        ('_trips', '0003_activity_activity_event_start_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bucket',
+            index=models.Index(fields=['created_by', 'created_at'], name='bucket_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['created_by', 'created_at'], name='document_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='file',
+            index=models.Index(fields=['created_by', 'created_at'], name='file_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(fields=['created_by', 'created_at'], name='image_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='link',
+            index=models.Index(fields=['created_by', 'created_at'], name='link_owner_created_idx'),
+        ),
+    ]
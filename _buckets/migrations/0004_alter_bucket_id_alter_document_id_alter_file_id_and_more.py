@@ -0,0 +1,45 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:48
+
+import _global.uuids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('_buckets', '0003_bucket_bucket_owner_created_idx_and_more'),
+    ]
+
+    # The primary key default only lives in Python, so existing rows and the schema stay untouched
+    # (a plain AlterField would make SQLite rebuild every table).
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='bucket',
+                    name='id',
+                    field=models.UUIDField(default=_global.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='document',
+                    name='id',
+                    field=models.UUIDField(default=_global.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='file',
+                    name='id',
+                    field=models.UUIDField(default=_global.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='image',
+                    name='id',
+                    field=models.UUIDField(default=_global.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='link',
+                    name='id',
+                    field=models.UUIDField(default=_global.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
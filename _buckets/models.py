@@ -1,9 +1,9 @@
 from django.db import models
-import uuid
+from _global.uuids import uuid7
 from django.contrib.auth import get_user_model
 
 class Document(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="documents_created")
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -13,11 +13,16 @@ class Document(models.Model):
     
     tags = models.ManyToManyField("_global.Tag", blank=True, related_name="documents_tagged")
     
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_by", "created_at"], name="document_owner_created_idx"),
+        ]
+    
     def __str__(self):
         return str(self.name)
     
 class Image(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="images_created")
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -25,8 +30,13 @@ class Image(models.Model):
     
     tags = models.ManyToManyField("_global.Tag", blank=True, related_name="images_tagged")
     
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_by", "created_at"], name="image_owner_created_idx"),
+        ]
+    
 class File(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="files_created")
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -34,16 +44,26 @@ class File(models.Model):
     
     tags = models.ManyToManyField("_global.Tag", blank=True, related_name="files_tagged")
     
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_by", "created_at"], name="file_owner_created_idx"),
+        ]
+    
 class Link(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="links_created")
     created_at = models.DateTimeField(auto_now_add=True)
     
     name = models.CharField(max_length=255)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_by", "created_at"], name="link_owner_created_idx"),
+        ]
 
 
 class Bucket(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="buckets_created")
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -52,6 +72,11 @@ class Bucket(models.Model):
     
     tags = models.ManyToManyField("_global.Tag", blank=True, related_name="buckets_tagged")
     
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_by", "created_at"], name="bucket_owner_created_idx"),
+        ]
+    
     def __str__(self):
         return f"{self.name}: {self.description}"
         
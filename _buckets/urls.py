@@ -1,5 +1,8 @@
 from django.urls import path
+from . import views
 
 urlpatterns = [
-
+    path('', views.bucket_list, name="bucket_list"),
+    path('<uuid:bucket_pk>/', views.bucket_read, name="bucket_read"),
+    path('<uuid:bucket_pk>/content/', views.bucket_content, name="bucket_content"),
 ]
@@ -1,3 +1,59 @@
-from django.shortcuts import render
+from django.shortcuts import render, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+import uuid
 
-# Create your views here.
+from _global.pagination import paginate_keyset
+from .content import MEMBER_TYPES, bucket_members, member_counts
+from .models import Bucket
+
+@login_required
+def bucket_list(request):
+    page = paginate_keyset(request, Bucket.objects.filter(created_by=request.user))
+    context = {
+        "title_action_section": True,
+        "page_title": "My buckets",
+        "obj_list": page.object_list,
+        "page": page,
+    }
+    return render(request, "buckets/bucket_list.html", context)
+
+@login_required
+def bucket_read(request, bucket_pk: uuid):
+    obj = get_object_or_404(Bucket, pk=bucket_pk, created_by=request.user)
+    page = bucket_members(obj, request.GET.get("cursor"))
+    context = {
+        "title_action_section": True,
+        "page_title": obj.name,
+        "obj": obj,
+        "obj_list": page.object_list,
+        "page": page,
+    }
+    # htmx "load more" only needs the next rows
+    if request.htmx:
+        return render(request, "buckets/bucket_read_rows.html", context)
+    counts = member_counts(obj.pk)
+    context["counts"] = [(Bucket._meta.get_field(relation).verbose_name, counts[relation]) for relation, _ in MEMBER_TYPES]
+    return render(request, "buckets/bucket_read.html", context)
+
+@login_required
+def bucket_content(request, bucket_pk: uuid):
+    bucket = get_object_or_404(Bucket, pk=bucket_pk, created_by=request.user)
+    page = bucket_members(bucket, request.GET.get("cursor"))
+    results = [
+        {
+            "type": member.kind,
+            "id": str(member.obj.pk),
+            "name": member.obj.name,
+            "created_at": member.created_at.isoformat(),
+            # prefetched where the model is taggable (see MEMBER_TYPES)
+            "tags": [tag.name for tag in member.obj.tags.all()] if hasattr(member.obj, "tags") else [],
+        }
+        for member in page
+    ]
+    return JsonResponse({
+        "bucket": str(bucket.pk),
+        "counts": member_counts(bucket.pk),
+        "results": results,
+        "next_cursor": page.next_cursor,
+    })
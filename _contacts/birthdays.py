@@ -0,0 +1,65 @@
+"""
+Upcoming birthdays of a user's contacts.
+
+`Contact.birthday_key` is the birthday's month * 100 + day (1231 for December 31st), computed by the
+database and indexed behind the owner, so a window of days is one range of that index, or two when it
+wraps over the end of the year, however large the address book is. Both ranges come back in index order;
+only contacts sharing a birthday are sorted (by name). February 29th sorts between 228 and 301 and is
+celebrated on February 28th in other years.
+"""
+import calendar
+from collections import namedtuple
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+from .models import Contact
+
+# a full year would wrap onto its own first day
+MAX_DAYS = 364
+
+UpcomingBirthday = namedtuple("UpcomingBirthday", "contact date age days")
+
+
+def month_day(day):
+    return day.month * 100 + day.day
+
+
+def next_birthday(birthday, today):
+    """The first celebration of `birthday` on or after `today`."""
+    for year in (today.year, today.year + 1):
+        try:
+            celebrated = birthday.replace(year=year)
+        except ValueError:
+            celebrated = date(year, 2, 28)
+        if celebrated >= today:
+            return celebrated
+
+
+def key_ranges(today, days):
+    """The inclusive birthday_key ranges of the window from `today` through `days` days later."""
+    end_day = today + timedelta(days=days)
+    start, end = month_day(today), month_day(end_day)
+    if end == 228 and not calendar.isleap(end_day.year):
+        end = 229
+    if start <= end:
+        return [(start, end)]
+    return [(start, 1231), (101, end)]
+
+
+def upcoming_birthdays(user, days=14, today=None, limit=None):
+    """UpcomingBirthdays of the user's contacts from today through `days` days later, soonest first."""
+    today = today or timezone.localdate()
+    days = min(max(days, 0), MAX_DAYS)
+    contacts = Contact.objects.filter(created_by=user).order_by("birthday_key", "name")
+    upcoming = []
+    for low, high in key_ranges(today, days):
+        queryset = contacts.filter(birthday_key__range=(low, high))
+        if limit is not None:
+            queryset = queryset[:limit - len(upcoming)]
+        for contact in queryset:
+            celebrated = next_birthday(contact.birthday, today)
+            upcoming.append(UpcomingBirthday(contact, celebrated, celebrated.year - contact.birthday.year, (celebrated - today).days))
+        if limit is not None and len(upcoming) >= limit:
+            break
+    return upcoming
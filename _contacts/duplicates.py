@@ -0,0 +1,207 @@
+"""
+Fuzzy name lookup, duplicate detection and merging for contacts.
+
+Names are compared by their trigrams (as in PostgreSQL's pg_trgm: lower-cased, accents stripped, each word
+padded with two leading and one trailing space), and their similarity is the Jaccard index of the two
+trigram sets: "Jon Smith" and "John Smith" share 8 of 13 trigrams (0.62).
+
+A lookup reads the ContactTrigram postings of the query's trigrams (an index range per trigram), counts the
+shared trigrams per contact and only scores the best candidates. The duplicate finder blocks in memory:
+contacts with the same normalized name are grouped directly, and distinct names are only compared when they
+share one of their rarest trigrams. With trigrams ordered by frequency, two names with a similarity of at
+least t always share one of the first `n - ceil(t * n) + 1` trigrams of the longer name, and, when the names
+are visited from short to long, one of the first `n - ceil(2t / (1 + t) * n) + 1` of the shorter one
+(prefix filtering, as in the AllPairs set-similarity join), so the blocks stay small without missing pairs.
+Blocks over `max_block_size` names are skipped as a safety net.
+Similar names are joined transitively, but groups stop growing at `max_group_size` names, so chains of
+similar names ("Ann Lee" ~ "Ann Leo" ~ "Ana Leo" ...) can't collapse a whole address book into one group.
+"""
+import math
+import unicodedata
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from _global.utils import batched
+from _global.uuids import uuid7
+from _global.tagging import bulk_tag
+from .models import Contact, ContactInformation, ContactTrigram
+
+LOOKUP_THRESHOLD = 0.3
+DUPLICATE_THRESHOLD = 0.5
+
+
+def normalize(name):
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join("".join(char if char.isalnum() else " " for char in stripped.lower()).split())
+
+
+def trigrams(name):
+    grams = set()
+    for word in normalize(name).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(grams, other_grams):
+    if not grams or not other_grams:
+        return 0.0
+    shared = len(grams & other_grams)
+    return shared / (len(grams) + len(other_grams) - shared)
+
+
+# --- INDEX ---
+
+def _insert(rows, batch_size):
+    """
+    Writes (created_by_id, contact_id, name) rows as trigrams with plain INSERTs: building a model instance
+    per trigram costs several times the insert itself. Returns the number of rows written.
+    """
+    sql = f"INSERT INTO {ContactTrigram._meta.db_table} (id, created_by_id, contact_id, trigram) VALUES (%s, %s, %s, %s)"
+    trigram_rows = (
+        (uuid7().hex, created_by_id, contact_pk.hex, gram)
+        for created_by_id, contact_pk, name in rows for gram in trigrams(name)
+    )
+    written = 0
+    with connection.cursor() as cursor:
+        for batch in batched(trigram_rows, batch_size):
+            cursor.executemany(sql, batch)
+            written += len(batch)
+    return written
+
+
+def index_contacts(contacts, batch_size=1000):
+    """(Re-)writes the trigrams of `contacts` (instances or a queryset); returns the number of rows written."""
+    written = 0
+    with transaction.atomic():
+        for batch in batched(contacts, batch_size):
+            ContactTrigram.objects.filter(contact__in=[contact.pk for contact in batch]).delete()
+            written += _insert(((contact.created_by_id, contact.pk, contact.name) for contact in batch), batch_size)
+    return written
+
+
+def rebuild(user=None, batch_size=5000):
+    """Rewrites the trigram index (of `user` only, if given); returns the number of rows written."""
+    contacts, trigrams_qs = Contact.objects.all(), ContactTrigram.objects.all()
+    if user is not None:
+        contacts, trigrams_qs = contacts.filter(created_by=user), trigrams_qs.filter(created_by=user)
+    with transaction.atomic():
+        trigrams_qs.delete()
+        rows = contacts.values_list("created_by_id", "pk", "name").iterator(chunk_size=batch_size)
+        return _insert(rows, batch_size)
+
+
+# --- LOOKUP ---
+
+def fuzzy_lookup(user, query, limit=10, threshold=LOOKUP_THRESHOLD, candidates=50):
+    """[(contact, similarity)] of the user's contacts whose names are most similar to `query`, best first."""
+    query_grams = trigrams(query)
+    if not query_grams:
+        return []
+    shared = dict(
+        ContactTrigram.objects.filter(created_by=user, trigram__in=query_grams)
+        .values_list("contact").annotate(shared=Count("id")).order_by("-shared")[:candidates]
+    )
+    scored = []
+    for contact in Contact.objects.filter(pk__in=shared):
+        score = similarity(query_grams, trigrams(contact.name))
+        if score >= threshold:
+            scored.append((contact, score))
+    scored.sort(key=lambda hit: (-hit[1], hit[0].name))
+    return scored[:limit]
+
+
+# --- DUPLICATES ---
+
+def _find_root(parents, i):
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+def find_duplicates(user, threshold=DUPLICATE_THRESHOLD, max_block_size=200, max_group_size=50):
+    """
+    Groups of the user's contacts with similar names, as lists of pks (oldest first, the suggested
+    merge target), largest groups first. One query; no all-pairs comparison.
+    """
+    pks_by_name = {}
+    for pk, name in Contact.objects.filter(created_by=user).order_by("created_at", "pk").values_list("pk", "name"):
+        pks_by_name.setdefault(normalize(name), []).append(pk)
+    # in order of their oldest contact
+    names = list(pks_by_name)
+    grams = [trigrams(name) for name in names]
+    frequency = Counter(gram for name_grams in grams for gram in name_grams)
+
+    parents, sizes = list(range(len(names))), [1] * len(names)
+    postings = {}
+    for i in sorted(range(len(names)), key=lambda i: len(grams[i])):
+        name_grams = grams[i]
+        rarest = sorted(name_grams, key=lambda gram: (frequency[gram], gram))
+        probed = len(rarest) - math.ceil(threshold * len(rarest)) + 1
+        indexed = len(rarest) - math.ceil(2 * threshold / (1 + threshold) * len(rarest)) + 1
+        candidates = set()
+        for position, gram in enumerate(rarest[:probed]):
+            posting = postings.setdefault(gram, [])
+            if len(posting) <= max_block_size:
+                candidates.update(posting)
+            if position < indexed:
+                posting.append(i)
+        for j in candidates:
+            # the candidates aren't longer; a similarity of `threshold` needs at least that share of the trigrams
+            if len(grams[j]) < threshold * len(name_grams):
+                continue
+            root, other = _find_root(parents, j), _find_root(parents, i)
+            if root != other and sizes[root] + sizes[other] <= max_group_size and similarity(name_grams, grams[j]) >= threshold:
+                # the older name stays the root
+                root, other = min(root, other), max(root, other)
+                parents[other] = root
+                sizes[root] += sizes[other]
+
+    groups = {}
+    for i, name in enumerate(names):
+        groups.setdefault(_find_root(parents, i), []).append(i)
+    duplicates = []
+    for members in groups.values():
+        pks = [pk for i in sorted(members) for pk in pks_by_name[names[i]]]
+        if len(pks) > 1:
+            duplicates.append(pks)
+    duplicates.sort(key=len, reverse=True)
+    return duplicates
+
+
+# --- MERGE ---
+
+def merge_contacts(target, duplicates):
+    """
+    Moves the informations, tags and bucket memberships of `duplicates` (instances or pks) to `target`,
+    fills its empty fields from them and deletes them. Returns the number of merged contacts.
+    """
+    duplicate_pks = [getattr(duplicate, "pk", duplicate) for duplicate in duplicates]
+    duplicate_pks = [pk for pk in duplicate_pks if pk != target.pk]
+    if not duplicate_pks:
+        return 0
+    bucket_through = Contact.buckets.through
+    with transaction.atomic():
+        ContactInformation.objects.filter(contact__in=duplicate_pks).update(contact=target)
+        tag_pks = list(set(Contact.tags.through.objects.filter(contact__in=duplicate_pks).values_list("tag", flat=True)))
+        if tag_pks:
+            bulk_tag(Contact, [target.pk], tag_pks)
+        bucket_pks = set(bucket_through.objects.filter(contact__in=duplicate_pks).values_list("bucket", flat=True))
+        bucket_through.objects.bulk_create(
+            [bucket_through(bucket_id=bucket_pk, contact_id=target.pk) for bucket_pk in bucket_pks], ignore_conflicts=True,
+        )
+
+        merged = Contact.objects.filter(pk__in=duplicate_pks).order_by("created_at")
+        for field in ("description", "birthday", "account_id"):
+            if not getattr(target, field):
+                setattr(target, field, next((value for value in merged.values_list(field, flat=True) if value), None))
+        # deleting the duplicates also drops their old through rows and invalidates the buckets' counts;
+        # saving the target reindexes its name and (now merged) informations for search
+        merged.delete()
+        target.save()
+    return len(duplicate_pks)
+
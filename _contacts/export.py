@@ -0,0 +1,66 @@
+"""
+Streaming exports of a user's contacts and their informations, as CSV and NDJSON.
+
+Both read one LEFT JOIN of contacts and informations through a chunked iterator, in the order of the
+owner's created_at index, and yield the encoded rows batch by batch, so memory stays flat whatever the size
+of the address book. CSV has one row per information (one without information columns for contacts
+that have none); NDJSON one line per contact with its informations nested.
+"""
+import csv
+import io
+import json
+from itertools import groupby
+from operator import itemgetter
+
+from _global.utils import batched
+from .models import Contact
+
+CHUNK_SIZE = 2000
+CSV_COLUMNS = ["contact_id", "name", "description", "birthday", "information_type", "information"]
+
+
+def export_rows(user, chunk_size=CHUNK_SIZE):
+    """(pk, name, description, birthday, information_type, information) per information of the user's contacts."""
+    return (
+        Contact.objects.filter(created_by=user)
+        .order_by("created_at", "pk", "contact_informations__created_at")
+        .values_list(
+            "pk", "name", "description", "birthday",
+            "contact_informations__information_type", "contact_informations__content",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def csv_chunks(user, chunk_size=CHUNK_SIZE):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for batch in batched(export_rows(user, chunk_size), chunk_size):
+        writer.writerows(
+            (pk, name, description or "", birthday.isoformat() if birthday else "", information_type or "", information or "")
+            for pk, name, description, birthday, information_type, information in batch
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _contact_lines(rows):
+    # the rows of a contact are consecutive, so only one contact is held at a time
+    for (pk, name, description, birthday), contact_rows in groupby(rows, key=itemgetter(0, 1, 2, 3)):
+        informations = [
+            {"type": information_type, "content": information}
+            for *_, information_type, information in contact_rows if information_type is not None
+        ]
+        contact = {
+            "id": str(pk), "name": name, "description": description,
+            "birthday": birthday.isoformat() if birthday else None, "informations": informations,
+        }
+        yield json.dumps(contact, ensure_ascii=False) + "\n"
+
+
+def ndjson_chunks(user, chunk_size=CHUNK_SIZE):
+    for batch in batched(_contact_lines(export_rows(user, chunk_size)), chunk_size):
+        yield "".join(batch)
@@ -1,6 +1,9 @@
 from django import forms
 from _global.dc_forms import *
+from _global.forms import MultipleUUIDField
 
+from .duplicates import merge_contacts
+from .importing import DUPLICATE_POLICIES, detect_format, import_contacts, parse_file
 from .models import Contact, ContactInformation
 
 class ContactCreateForm(forms.ModelForm):
@@ -18,3 +21,45 @@ class ContactInformationCreateForm(forms.ModelForm):
     
     information_type = dc_form_fields_select2_choice(label="Information Type", choices=ContactInformation.INFORMATION_TYPES.choices)
     content = dc_form_fields_textarea(label="Information")
+
+
+class ContactMergeForm(forms.Form):
+    """Merges the selected contacts into one of them (see duplicates.merge_contacts)."""
+    target = forms.UUIDField(widget=forms.RadioSelect)
+    ids = MultipleUUIDField(error_messages={"required": "Select the contacts to merge"})
+    
+    def __init__(self, user, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user = user
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.errors:
+            return cleaned_data
+        contacts = Contact.objects.filter(created_by=self.user, pk__in=set(cleaned_data["ids"]) | {cleaned_data["target"]})
+        cleaned_data["contacts"] = {contact.pk: contact for contact in contacts}
+        if cleaned_data["target"] not in cleaned_data["contacts"]:
+            raise forms.ValidationError("Unknown merge target")
+        return cleaned_data
+    
+    def save(self):
+        """Returns the target contact."""
+        contacts = self.cleaned_data["contacts"]
+        target = contacts.pop(self.cleaned_data["target"])
+        merge_contacts(target, list(contacts))
+        return target
+
+
+class ContactImportForm(forms.Form):
+    """Imports a vCard or CSV file (see importing.py)."""
+    file = dc_form_fields_file(label="File", help_text="A vCard (.vcf) or CSV file; a CSV file needs a name column")
+    on_duplicate = dc_form_fields_choice(
+        label="Existing contacts", help_text="Contacts of the file whose name you already have",
+        choices=DUPLICATE_POLICIES.items(), initial="merge",
+    )
+    
+    def save(self, user):
+        """Returns the ImportReport."""
+        upload = self.cleaned_data["file"]
+        records = parse_file(upload.file, detect_format(upload.name))
+        return import_contacts(user, records, self.cleaned_data["on_duplicate"])
@@ -0,0 +1,365 @@
+"""
+Bulk import of contacts from vCard and CSV files.
+
+Files are parsed as a stream of records (one vCard, or the rows of one contact in CSV) and written in
+batches, each one transaction of bulk_create()s. A record whose normalized name (see duplicates.normalize)
+matches one of the user's contacts, or an earlier record of the file, is a duplicate: by default its new
+informations are merged into that contact and its other fields are dropped. Records that can't be imported
+are reported with their line number and don't stop the import.
+
+bulk_create() sends no signals, so every batch writes the name trigrams and search index rows of the
+contacts it touched itself, and the contact list cache is bumped once at the end.
+"""
+import csv
+import io
+import quopri
+from collections import namedtuple
+from datetime import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from _global.cache import tiered_cache
+from _global.search import index_objects
+from _global.utils import batched
+from .duplicates import index_contacts, normalize
+from .models import Contact, ContactInformation
+from .receivers import contacts_namespace
+
+TYPES = ContactInformation.INFORMATION_TYPES
+FORMATS = {"csv": "CSV", "vcard": "vCard"}
+DUPLICATE_POLICIES = {"merge": "Add their new informations to the existing contact", "skip": "Skip them"}
+BIRTHDAY_FORMATS = ["%Y-%m-%d", "%Y%m%d", "%d.%m.%Y"]
+NAME_MAX_LENGTH = Contact._meta.get_field("name").max_length
+
+ImportRecord = namedtuple("ImportRecord", "line name description birthday informations")
+RowError = namedtuple("RowError", "line message")
+
+
+class ImportReport:
+    """Counts of an import, updated after every batch, and the errors of the rows that weren't imported."""
+
+    def __init__(self):
+        self.records = 0
+        self.created = 0
+        self.merged = 0
+        self.skipped = 0
+        self.informations = 0
+        self.errors = []
+
+    def as_dict(self):
+        return {
+            "records": self.records, "created": self.created, "merged": self.merged, "skipped": self.skipped,
+            "informations": self.informations, "errors": len(self.errors),
+        }
+
+    def __str__(self):
+        return (
+            f"{self.records} records: {self.created} created, {self.merged} merged, {self.skipped} skipped, "
+            f"{self.informations} informations, {len(self.errors)} errors"
+        )
+
+
+def _record(line, name, description, birthday, informations):
+    """
+    The ImportRecord of the parsed values, or a RowError if they can't be imported. A birthday that isn't
+    a date (or has no year) is dropped with a RowError of its own, but doesn't cost the contact.
+    """
+    name = " ".join((name or "").split())
+    if not name:
+        yield RowError(line, "No name")
+        return
+    if len(name) > NAME_MAX_LENGTH:
+        yield RowError(line, f"Name longer than {NAME_MAX_LENGTH} characters")
+        return
+    parsed_birthday = None
+    if birthday and birthday.strip():
+        parsed_birthday = parse_birthday(birthday.strip())
+        if parsed_birthday is None:
+            yield RowError(line, f"Birthday {birthday.strip()!r} isn't a full date, imported without it")
+    informations = [(information_type, content.strip()) for information_type, content in informations if content and content.strip()]
+    yield ImportRecord(line, name, (description or "").strip() or None, parsed_birthday, informations)
+
+
+def parse_birthday(value):
+    # vCard dates may carry a time (19900704T000000Z); dates without a year (--0704) can't be stored
+    value = value.split("T")[0]
+    for birthday_format in BIRTHDAY_FORMATS:
+        try:
+            return datetime.strptime(value, birthday_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+# --- CSV ---
+
+def _header(column):
+    return " ".join(column.replace("_", " ").replace("-", " ").lower().split())
+
+
+# Columns read into the contact itself; the export's own columns (see export.py) are included
+CONTACT_COLUMNS = {
+    "contact id": "contact_id",
+    "name": "name", "full name": "name", "display name": "name", "fn": "name",
+    "first name": "first_name", "given name": "first_name",
+    "last name": "last_name", "family name": "last_name", "surname": "last_name",
+    "description": "description", "notes": "description", "note": "description",
+    "birthday": "birthday", "birth date": "birthday", "date of birth": "birthday", "bday": "birthday",
+    "information type": "information_type", "information": "information",
+}
+# Columns that become informations: (type, prefix of the content); every type is a column under its name and label
+INFORMATION_COLUMNS = {
+    **{_header(value): (value, None) for value, _ in TYPES.choices},
+    **{_header(label): (value, None) for value, label in TYPES.choices},
+    "company": (TYPES.JOB, None), "organization": (TYPES.JOB, None), "job title": (TYPES.JOB, None),
+    "title": (TYPES.JOB, None), "occupation": (TYPES.JOB, None),
+    "pets": (TYPES.PET, None), "hobbies": (TYPES.HOBBY, None), "interests": (TYPES.INTEREST, None),
+    "email": (TYPES.GENERAL, "Email"), "e mail": (TYPES.GENERAL, "Email"), "phone": (TYPES.GENERAL, "Phone"),
+    "mobile": (TYPES.GENERAL, "Phone"), "address": (TYPES.GENERAL, "Address"), "website": (TYPES.GENERAL, "Website"),
+    "url": (TYPES.GENERAL, "Website"),
+}
+TYPE_NAMES = {_header(value): value for value, _ in TYPES.choices} | {_header(label): value for value, label in TYPES.choices}
+
+
+def _csv_record(rows):
+    """The record (see _record) of one contact's (line, row)s; several only in exports, which have one row per information."""
+    line, first = rows[0]
+    name = first.get("name") or " ".join(part for part in (first.get("first_name"), first.get("last_name")) if part)
+    informations = []
+    for _, row in rows:
+        if row.get("information"):
+            information_type = TYPE_NAMES.get(_header(row.get("information_type") or ""), TYPES.GENERAL)
+            informations.append((information_type, row["information"]))
+        for value, (information_type, prefix) in row["informations"]:
+            informations.append((information_type, f"{prefix}: {value}" if prefix else value))
+    return _record(line, name, first.get("description"), first.get("birthday"), informations)
+
+
+def parse_csv(lines):
+    """ImportRecords (and RowErrors) of a CSV file with a header row; `lines` is a text stream opened with newline=""."""
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = []
+    for column in header:
+        key = _header(column.lstrip("\ufeff"))
+        if key in CONTACT_COLUMNS:
+            columns.append((CONTACT_COLUMNS[key], None))
+        elif key in INFORMATION_COLUMNS:
+            columns.append(("informations", INFORMATION_COLUMNS[key]))
+        else:
+            columns.append((None, None))
+    if not any(field in ("name", "first_name", "last_name") for field, _ in columns):
+        yield RowError(1, "No name column (expected 'name', or 'first name' and 'last name')")
+        return
+
+    pending, line = [], 2
+    for values in reader:
+        # line_num counts the physical lines read so far, so a row spanning several starts after the previous one
+        row_line, line = line, reader.line_num + 1
+        if not any(value.strip() for value in values):
+            continue
+        row = {"informations": []}
+        for (field, information_column), value in zip(columns, values):
+            if field == "informations":
+                if value.strip():
+                    row["informations"].append((value.strip(), information_column))
+            elif field is not None:
+                row[field] = value
+        # the rows of an exported contact share its id and are consecutive
+        if pending and not (row.get("contact_id") and row.get("contact_id") == pending[0][1].get("contact_id")):
+            yield from _csv_record(pending)
+            pending = []
+        pending.append((row_line, row))
+    if pending:
+        yield from _csv_record(pending)
+
+
+# --- VCARD ---
+
+# Properties that become informations: (type, prefix of the content)
+VCARD_PROPERTIES = {
+    "ORG": (TYPES.JOB, None), "TITLE": (TYPES.JOB, None), "ROLE": (TYPES.JOB, None),
+    "EMAIL": (TYPES.GENERAL, "Email"), "TEL": (TYPES.GENERAL, "Phone"), "ADR": (TYPES.GENERAL, "Address"),
+    "URL": (TYPES.GENERAL, "Website"), "NICKNAME": (TYPES.GENERAL, "Nickname"), "CATEGORIES": (TYPES.GENERAL, "Categories"),
+}
+VCARD_ESCAPES = {"n": "\n", "N": "\n", ",": ",", ";": ";", "\\": "\\"}
+
+
+def _unescape(value):
+    """Splits a structured value at its unescaped `;` and resolves the escapes of each component."""
+    components, current, chars = [], [], iter(value)
+    for char in chars:
+        if char == "\\":
+            escaped = next(chars, "")
+            current.append(VCARD_ESCAPES.get(escaped, escaped))
+        elif char == ";":
+            components.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    components.append("".join(current))
+    return components
+
+
+def _split_property(line):
+    """(name, {param: value}, raw value) of a content line; the name without its group (item1.EMAIL)."""
+    quoted = False
+    for i, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            break
+    else:
+        return None
+    name, *params = line[:i].split(";")
+    parameters = {}
+    for param in params:
+        key, _, value = param.partition("=")
+        # vCard 2.1 allows bare types (TEL;CELL)
+        parameters[key.upper() if value else "TYPE"] = value.strip('"') if value else key
+    return name.rsplit(".", 1)[-1].upper(), parameters, line[i + 1:]
+
+
+def _vcard_lines(lines):
+    """(line number, unfolded content line) of a vCard stream, quoted-printable values joined and decoded."""
+    buffered, buffered_line = None, 0
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if buffered is not None and line[:1] in (" ", "\t"):
+            buffered += line[1:]
+            continue
+        if buffered is not None and buffered.endswith("=") and "QUOTED-PRINTABLE" in buffered.split(":", 1)[0].upper():
+            # a soft line break of a quoted-printable value
+            buffered = buffered[:-1] + line
+            continue
+        if buffered is not None:
+            yield buffered_line, buffered
+        buffered, buffered_line = line, number
+    if buffered is not None:
+        yield buffered_line, buffered
+
+
+def _vcard_record(line, properties):
+    name, structured_name, description, birthday, informations = None, None, [], None, []
+    for property_name, parameters, value in properties:
+        if parameters.get("ENCODING", "").upper() == "QUOTED-PRINTABLE":
+            value = quopri.decodestring(value.encode()).decode(parameters.get("CHARSET", "utf-8"), errors="replace")
+        components = _unescape(value)
+        if property_name == "FN":
+            name = ";".join(components)
+        elif property_name == "N":
+            # family; given; additional; prefixes; suffixes
+            parts = components + [""] * (5 - len(components))
+            structured_name = " ".join(part for part in (parts[3], parts[1], parts[2], parts[0], parts[4]) if part)
+        elif property_name == "NOTE":
+            description.append(";".join(components))
+        elif property_name == "BDAY":
+            birthday = value
+        elif property_name in VCARD_PROPERTIES:
+            information_type, prefix = VCARD_PROPERTIES[property_name]
+            content = ", ".join(component for component in components if component.strip())
+            informations.append((information_type, f"{prefix}: {content}" if prefix and content else content))
+    return _record(line, name or structured_name, "\n".join(description), birthday, informations)
+
+
+def parse_vcard(lines):
+    """ImportRecords (and RowErrors) of a vCard (2.1, 3.0 or 4.0) stream with any number of cards."""
+    card_line, properties = None, None
+    for number, line in _vcard_lines(lines):
+        if not line.strip():
+            continue
+        upper = line.upper()
+        if upper == "BEGIN:VCARD":
+            if properties is not None:
+                yield RowError(card_line, "Card without END:VCARD")
+            card_line, properties = number, []
+        elif upper == "END:VCARD":
+            if properties is None:
+                yield RowError(number, "END:VCARD without BEGIN:VCARD")
+            else:
+                yield from _vcard_record(card_line, properties)
+            properties = None
+        elif properties is not None:
+            split = _split_property(line)
+            if split is not None:
+                properties.append(split)
+    if properties is not None:
+        yield RowError(card_line, "Card without END:VCARD")
+
+
+def detect_format(filename):
+    return "vcard" if filename.lower().endswith((".vcf", ".vcard")) else "csv"
+
+
+def parse_file(file, file_format):
+    """Records of an uploaded (binary) file, decoded lazily; a BOM and invalid bytes are tolerated."""
+    lines = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace", newline="")
+    return parse_vcard(lines) if file_format == "vcard" else parse_csv(lines)
+
+
+# --- IMPORT ---
+
+def _write_batch(user, batch, known, on_duplicate, report):
+    contacts, informations, merged_pks = [], {}, set()
+    for record in batch:
+        if isinstance(record, RowError):
+            report.errors.append(record)
+            continue
+        report.records += 1
+        key = normalize(record.name)
+        contact_pk = known.get(key)
+        if contact_pk is None:
+            contact = Contact(created_by=user, name=record.name, description=record.description, birthday=record.birthday)
+            contacts.append(contact)
+            known[key] = contact_pk = contact.pk
+            report.created += 1
+        elif on_duplicate == "skip":
+            report.skipped += 1
+            continue
+        else:
+            merged_pks.add(contact_pk)
+            report.merged += 1
+        # a dict keeps the order and drops repeated informations
+        for information_type, content in record.informations:
+            informations[(contact_pk, information_type, content)] = None
+
+    if merged_pks:
+        existing = ContactInformation.objects.filter(contact__in=merged_pks).values_list("contact", "information_type", "content")
+        for information in existing.iterator():
+            informations.pop(information, None)
+    updated_pks = {contact_pk for contact_pk, _, _ in informations} & merged_pks
+
+    with transaction.atomic():
+        Contact.objects.bulk_create(contacts)
+        ContactInformation.objects.bulk_create([
+            ContactInformation(created_by=user, contact_id=contact_pk, information_type=information_type, content=content)
+            for contact_pk, information_type, content in informations
+        ])
+        if updated_pks:
+            # what receivers.information_changed does for a single information
+            Contact.objects.filter(pk__in=updated_pks).update(updated_at=timezone.now())
+        index_contacts(contacts)
+        index_objects("contacts", Contact.objects.filter(pk__in=[contact.pk for contact in contacts] + list(updated_pks)))
+    report.informations += len(informations)
+
+
+def import_contacts(user, records, on_duplicate="merge", batch_size=1000, progress=None):
+    """
+    Imports parsed `records` (see parse_file) as contacts of `user`, one transaction per `batch_size`
+    records, and returns the ImportReport. `progress` is called with the report after every batch.
+    """
+    # normalized name -> pk of the user's contacts, and of the ones this import creates
+    known = {}
+    for contact_pk, name in Contact.objects.filter(created_by=user).values_list("pk", "name").iterator(chunk_size=5000):
+        known.setdefault(normalize(name), contact_pk)
+    report = ImportReport()
+    for batch in batched(records, batch_size):
+        _write_batch(user, batch, known, on_duplicate, report)
+        if progress is not None:
+            progress(report)
+    if report.created or report.merged:
+        tiered_cache.bump(contacts_namespace(user.pk))
+    return report
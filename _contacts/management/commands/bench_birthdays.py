@@ -0,0 +1,83 @@
+import json
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from _contacts.birthdays import next_birthday, upcoming_birthdays
+from _contacts.models import Contact
+from _global.benchmarking import throwaway_database, median_ms
+from _global.seeding import bulk_insert
+
+
+def naive_upcoming(user, days, today):
+    """What the index replaces: every birthday of the user loaded and compared in Python."""
+    upcoming = []
+    for contact in Contact.objects.filter(created_by=user, birthday__isnull=False):
+        celebrated = next_birthday(contact.birthday, today)
+        if (celebrated - today).days <= days:
+            upcoming.append((celebrated, contact.name, contact))
+    upcoming.sort(key=lambda hit: hit[:2])
+    return upcoming
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway database with one large address book and measures the upcoming-birthdays "
+        "query within the year and across its end, against filtering every birthday in Python."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--contacts", type=int, default=200_000, help="Contacts of the benchmark user")
+        parser.add_argument("--days", type=int, default=14, help="Window of the query")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the median is reported")
+        parser.add_argument("--report", help="Write a JSON report to this path")
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            result = self.run_benchmark(options)
+
+        for key, value in result.items():
+            self.stdout.write(f"{key}: {value}")
+        if options["report"]:
+            with open(options["report"], "w") as f:
+                json.dump(result, f, indent=2)
+
+    def seed(self, options):
+        rng = random.Random(0)
+        user_model = get_user_model()
+        user = user_model.objects.create_user("bench-birthdays", password="bench")
+        # a second address book, so the owner prefix of the index has to do its part
+        other = user_model.objects.create_user("bench-birthdays-other", password="bench")
+        for owner, count in ((user, options["contacts"]), (other, options["contacts"] // 2)):
+            bulk_insert(Contact, (
+                Contact(
+                    created_by=owner, name=f"Contact {i}",
+                    birthday=date(1940, 1, 1) + timedelta(days=rng.randrange(365 * 70)) if rng.random() < 0.8 else None,
+                )
+                for i in range(count)
+            ), 5000)
+        return user
+
+    def run_benchmark(self, options):
+        user = self.seed(options)
+        repeat, days = options["repeat"], options["days"]
+        result = {"contacts": options["contacts"], "days": days}
+        for name, today in (("within_year", date(2026, 6, 10)), ("across_year_end", date(2026, 12, 25))):
+            with CaptureQueriesContext(connection) as queries:
+                hits = upcoming_birthdays(user, days, today)
+            plans = []
+            with connection.cursor() as cursor:
+                for query in queries.captured_queries:
+                    cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                    plans += [row[3] for row in cursor.fetchall()]
+            result[f"{name}_hits"] = len(hits)
+            result[f"{name}_queries"] = len(queries)
+            result[f"{name}_plan"] = plans
+            result[f"{name}_ms"] = median_ms(lambda: upcoming_birthdays(user, days, today), repeat)
+            result[f"{name}_widget_ms"] = median_ms(lambda: upcoming_birthdays(user, days, today, limit=10), repeat)
+            result[f"{name}_naive_ms"] = median_ms(lambda: naive_upcoming(user, days, today), 1)
+        return result
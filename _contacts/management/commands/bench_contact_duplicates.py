@@ -0,0 +1,120 @@
+import itertools
+import json
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from _contacts.duplicates import find_duplicates, fuzzy_lookup, merge_contacts, rebuild, similarity, trigrams
+from _contacts.models import Contact
+from _global.benchmarking import throwaway_database, median_ms
+from _global.seeding import bulk_insert
+
+CONSONANTS = "bcdfghjklmnprstvwz"
+VOWELS = "aeiou"
+
+
+def random_name(rng, syllables):
+    return "".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) + (rng.choice(CONSONANTS) if rng.random() < 0.3 else "") for _ in range(syllables)).capitalize()
+
+
+def typo(rng, name):
+    """`name` with one character dropped, doubled, swapped with its neighbour or replaced."""
+    i = rng.randrange(1, len(name) - 1)
+    edit = rng.randrange(4)
+    if edit == 0:
+        return name[:i] + name[i + 1:]
+    if edit == 1:
+        return name[:i] + name[i] + name[i:]
+    if edit == 2:
+        return name[:i - 1] + name[i] + name[i - 1] + name[i + 1:]
+    return name[:i] + rng.choice("aeiou") + name[i + 1:]
+
+
+def naive_lookup(names, query, limit=10):
+    """What the trigram index replaces: scoring every name."""
+    query_grams = trigrams(query)
+    return sorted(((similarity(query_grams, trigrams(name)), pk) for pk, name in names), reverse=True)[:limit]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway database with one address book of synthetic names, a share of them misspelled copies, "
+        "and measures the fuzzy lookup, the duplicate finder (with its recall) and a merge."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--contacts", type=int, default=100_000, help="Contacts of the benchmark user")
+        parser.add_argument("--duplicate-rate", type=float, default=0.05, help="Share of contacts that are misspelled copies")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the median is reported")
+        parser.add_argument("--report", help="Write a JSON report to this path")
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            result = self.run_benchmark(options)
+
+        for key, value in result.items():
+            self.stdout.write(f"{key}: {value}")
+        if options["report"]:
+            with open(options["report"], "w") as f:
+                json.dump(result, f, indent=2)
+
+    def seed(self, options):
+        rng = random.Random(0)
+        user = get_user_model().objects.create_user("bench-duplicates", password="bench")
+        # a few common first names, many distinct last names, like a real address book
+        first_names = [random_name(rng, rng.randint(2, 3)) for _ in range(2000)]
+        first_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(first_names) + 1)))
+        last_names = [random_name(rng, rng.randint(2, 4)) for _ in range(50_000)]
+        names, copies = [], []
+        for i in range(options["contacts"]):
+            if names and rng.random() < options["duplicate_rate"]:
+                original = rng.randrange(len(names))
+                copies.append((original, i))
+                names.append(typo(rng, names[original]))
+            else:
+                names.append(f"{rng.choices(first_names, cum_weights=first_weights)[0]} {rng.choice(last_names)}")
+        pks = bulk_insert(Contact, (Contact(created_by=user, name=name) for name in names), 5000)
+        return user, names, pks, [(pks[a], pks[b]) for a, b in copies]
+
+    def run_benchmark(self, options):
+        user, names, pks, copies = self.seed(options)
+        repeat = options["repeat"]
+        rng = random.Random(1)
+
+        start = time.perf_counter()
+        trigram_rows = rebuild(user)
+        result = {
+            "contacts": len(pks),
+            "injected_duplicates": len(copies),
+            "trigrams": trigram_rows,
+            "index_build_s": round(time.perf_counter() - start, 2),
+        }
+
+        query = typo(rng, names[len(names) // 2])
+        result["lookup_ms"] = median_ms(lambda: fuzzy_lookup(user, query), repeat)
+        rows = list(zip(pks, names))
+        result["naive_lookup_ms"] = median_ms(lambda: naive_lookup(rows, query), 1)
+        result["lookup_finds_original"] = any(contact.pk == pks[len(names) // 2] for contact, _ in fuzzy_lookup(user, query))
+
+        start = time.perf_counter()
+        groups = find_duplicates(user)
+        result["find_duplicates_s"] = round(time.perf_counter() - start, 2)
+        group_of = {pk: i for i, group in enumerate(groups) for pk in group}
+        found = sum(1 for a, b in copies if a in group_of and group_of.get(a) == group_of.get(b))
+        result["groups"] = len(groups)
+        result["recall"] = round(found / len(copies), 3) if copies else None
+        # all-pairs comparison, extrapolated from a sample
+        sample = [trigrams(name) for name in rng.sample(names, 300)]
+        start = time.perf_counter()
+        for a, b in itertools.combinations(sample, 2):
+            similarity(a, b)
+        per_pair = (time.perf_counter() - start) / (len(sample) * (len(sample) - 1) / 2)
+        result["naive_all_pairs_estimated_s"] = round(per_pair * len(names) * (len(names) - 1) / 2, 1)
+
+        target = Contact.objects.get(pk=groups[0][0])
+        start = time.perf_counter()
+        result["merged"] = merge_contacts(target, groups[0][1:])
+        result["merge_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
@@ -0,0 +1,120 @@
+import json
+import logging
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from _contacts.models import Contact, ContactInformation
+from _global.benchmarking import throwaway_database
+from _global.seeding import bulk_insert
+
+FORMATS = {"csv": "contact_export_csv", "ndjson": "contact_export_ndjson"}
+
+
+def naive_export(user):
+    """What the stream replaces: the whole export built in memory before it is sent."""
+    return json.dumps([
+        {"id": str(contact.pk), "name": contact.name, "informations": [
+            {"type": information.information_type, "content": information.content} for information in contact.contact_informations.all()
+        ]}
+        for contact in Contact.objects.filter(created_by=user).prefetch_related("contact_informations")
+    ])
+
+
+def traced(fn):
+    """(result of `fn`, peak of the memory allocated by Python while it ran, in MB)."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, round(peak / 2**20, 2)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway database with a small and a large address book, streams both exports of each "
+        "and fails when the memory peak of a stream exceeds the ceiling or grows with the address book."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--contacts", type=int, default=200_000, help="Contacts of the large address book (the small one has a tenth)")
+        parser.add_argument("--informations", type=int, default=3, help="Contact informations per contact")
+        parser.add_argument("--max-mb", type=float, default=16.0, help="Memory ceiling of one streamed export")
+        parser.add_argument("--max-growth", type=float, default=2.0, help="Allowed ratio of the large to the small export's peak")
+        parser.add_argument("--skip-naive", action="store_true", help="Don't build the large export in memory for comparison")
+        parser.add_argument("--report", help="Write a JSON report to this path")
+
+    def handle(self, *args, **options):
+        # per-request log lines would drown the report
+        logging.getLogger("_global.middleware").setLevel(logging.WARNING)
+        with throwaway_database():
+            result, failures = self.run_benchmark(options)
+
+        for key, value in result.items():
+            self.stdout.write(f"{key}: {value}")
+        if options["report"]:
+            with open(options["report"], "w") as f:
+                json.dump(result, f, indent=2)
+        if failures:
+            raise CommandError("; ".join(failures))
+
+    def seed(self, username, count, options, rng):
+        user = get_user_model().objects.create_user(username, password="bench")
+        contact_pks = bulk_insert(Contact, (
+            Contact(created_by=user, name=f"Contact {i}", description=f"Met at event {rng.randrange(1000)}",
+                    birthday=date(1950, 1, 1) + timedelta(days=rng.randrange(365 * 60)))
+            for i in range(count)
+        ), 5000)
+        information_types = [choice for choice, _ in ContactInformation.INFORMATION_TYPES.choices]
+        bulk_insert(ContactInformation, (
+            ContactInformation(created_by=user, contact_id=contact_pk, information_type=rng.choice(information_types),
+                               content=f"Information {i} of a contact, long enough to look like a note")
+            for contact_pk in contact_pks for i in range(options["informations"])
+        ), 5000)
+        return user
+
+    def stream(self, user, url_name):
+        """Requests the export and consumes it chunk by chunk; returns its size in bytes."""
+        client = Client()
+        client.force_login(user)
+        response = client.get(reverse(url_name))
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        response.close()
+        return size
+
+    def run_benchmark(self, options):
+        rng = random.Random(0)
+        sizes = {"small": max(1, options["contacts"] // 10), "large": options["contacts"]}
+        users = {name: self.seed(f"bench-export-{name}", count, options, rng) for name, count in sizes.items()}
+        result = {f"{name}_contacts": count for name, count in sizes.items()}
+        result["informations_per_contact"] = options["informations"]
+
+        failures = []
+        for export_format, url_name in FORMATS.items():
+            peaks = {}
+            for name, user in users.items():
+                start = time.perf_counter()
+                size = self.stream(user, url_name)
+                elapsed = time.perf_counter() - start
+                _, peaks[name] = traced(lambda: self.stream(user, url_name))
+                result[f"{export_format}_{name}_mb"] = round(size / 2**20, 1)
+                result[f"{export_format}_{name}_s"] = round(elapsed, 2)
+                result[f"{export_format}_{name}_peak_mb"] = peaks[name]
+            result[f"{export_format}_large_rows_per_s"] = round(sizes["large"] * max(options["informations"], 1) / result[f"{export_format}_large_s"])
+            if peaks["large"] > options["max_mb"]:
+                failures.append(f"{export_format} export peaked at {peaks['large']} MB (ceiling {options['max_mb']} MB)")
+            if peaks["large"] > peaks["small"] * options["max_growth"]:
+                failures.append(f"{export_format} export grew from {peaks['small']} to {peaks['large']} MB with the address book")
+
+        if not options["skip_naive"]:
+            _, result["naive_large_peak_mb"] = traced(lambda: naive_export(users["large"]))
+        result["passed"] = not failures
+        return result, failures
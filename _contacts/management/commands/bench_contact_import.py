@@ -0,0 +1,104 @@
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from _contacts.importing import import_contacts, parse_file
+from _contacts.models import Contact, ContactInformation
+from _global.benchmarking import throwaway_database
+from _global.seeding import bulk_insert
+
+from .bench_contact_duplicates import random_name
+
+
+def write_vcard(path, people):
+    with open(path, "w", newline="") as f:
+        for name, birthday, email, company, note in people:
+            f.write(
+                f"BEGIN:VCARD\r\nVERSION:3.0\r\nFN:{name}\r\nN:{';'.join(reversed(name.split(' ', 1)))};;;\r\n"
+                f"BDAY:{birthday:%Y-%m-%d}\r\nEMAIL;TYPE=INTERNET:{email}\r\nORG:{company}\r\nNOTE:{note}\r\nEND:VCARD\r\n"
+            )
+
+
+def write_csv(path, people):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Name", "Birthday", "Email", "Company", "Notes"])
+        writer.writerows((name, f"{birthday:%Y-%m-%d}", email, company, note) for name, birthday, email, company, note in people)
+
+
+def save_each(user, people):
+    """What the pipeline replaces: the contact and each information saved on its own, as the forms do."""
+    for name, birthday, email, company, note in people:
+        contact = Contact.objects.create(created_by=user, name=name, description=note, birthday=birthday)
+        ContactInformation.objects.create(created_by=user, contact=contact, information_type="GENERAL", content=f"Email: {email}")
+        ContactInformation.objects.create(created_by=user, contact=contact, information_type="JOB", content=company)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway database with an address book, imports a generated vCard and CSV file into it "
+        "(a share of the people already exist) and compares the import with saving every contact on its own."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--contacts", type=int, default=50_000, help="People in each file")
+        parser.add_argument("--existing", type=int, default=5000, help="Contacts the user has before the import")
+        parser.add_argument("--duplicate-rate", type=float, default=0.05, help="Share of the file's people the user already has")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Contacts per transaction")
+        parser.add_argument("--sample", type=int, default=500, help="Contacts saved one by one to extrapolate the naive import")
+        parser.add_argument("--report", help="Write a JSON report to this path")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory, throwaway_database():
+            result = self.run_benchmark(options, directory)
+
+        for key, value in result.items():
+            self.stdout.write(f"{key}: {value}")
+        if options["report"]:
+            with open(options["report"], "w") as f:
+                json.dump(result, f, indent=2)
+
+    def people(self, rng, count, existing_names, duplicate_rate):
+        for i in range(count):
+            if existing_names and rng.random() < duplicate_rate:
+                name = rng.choice(existing_names)
+            else:
+                name = f"{random_name(rng, 2)} {random_name(rng, rng.randint(2, 4))}"
+            birthday = date(1950, 1, 1) + timedelta(days=rng.randrange(365 * 60))
+            yield name, birthday, f"person{i}@example.org", f"{random_name(rng, 3)} GmbH", f"Met at event {rng.randrange(1000)}"
+
+    def run_benchmark(self, options, directory):
+        rng = random.Random(0)
+        user_model = get_user_model()
+        existing_names = [f"{random_name(rng, 2)} {random_name(rng, 3)}" for _ in range(options["existing"])]
+        result = {"contacts": options["contacts"], "existing": options["existing"]}
+
+        for file_format, write in (("vcard", write_vcard), ("csv", write_csv)):
+            user = user_model.objects.create_user(f"bench-import-{file_format}", password="bench")
+            bulk_insert(Contact, (Contact(created_by=user, name=name) for name in existing_names), 5000)
+            path = os.path.join(directory, f"contacts.{file_format}")
+            write(path, self.people(rng, options["contacts"], existing_names, options["duplicate_rate"]))
+
+            start = time.perf_counter()
+            with open(path, "rb") as file:
+                report = import_contacts(user, parse_file(file, file_format), batch_size=options["batch_size"])
+            elapsed = time.perf_counter() - start
+            result[f"{file_format}_file_mb"] = round(os.path.getsize(path) / 2**20, 1)
+            result[f"{file_format}_s"] = round(elapsed, 2)
+            result[f"{file_format}_contacts_per_s"] = round(report.records / elapsed)
+            result[f"{file_format}_report"] = report.as_dict()
+
+        user = user_model.objects.create_user("bench-import-naive", password="bench")
+        sample = list(self.people(rng, options["sample"], [], 0))
+        start = time.perf_counter()
+        save_each(user, sample)
+        per_contact = (time.perf_counter() - start) / len(sample)
+        result["save_each_estimated_s"] = round(per_contact * options["contacts"], 1)
+        return result
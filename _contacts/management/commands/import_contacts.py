@@ -0,0 +1,37 @@
+import csv
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from _contacts.importing import DUPLICATE_POLICIES, FORMATS, detect_format, import_contacts, parse_file
+
+
+class Command(BaseCommand):
+    help = "Imports the contacts of a vCard or CSV file for one user, printing the progress after every batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The vCard (.vcf) or CSV file")
+        parser.add_argument("--user", required=True, help="Username the contacts are imported for")
+        parser.add_argument("--format", choices=list(FORMATS), help="File format (default: from the file extension)")
+        parser.add_argument("--on-duplicate", choices=list(DUPLICATE_POLICIES), default="merge", help="What happens to contacts the user already has")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Contacts per transaction")
+        parser.add_argument("--errors", help="Write the rows with errors to this CSV file")
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(username=options["user"]).first()
+        if user is None:
+            raise CommandError(f"No user {options['user']!r}")
+        file_format = options["format"] or detect_format(options["path"])
+        with open(options["path"], "rb") as file:
+            report = import_contacts(
+                user, parse_file(file, file_format), options["on_duplicate"], options["batch_size"],
+                progress=lambda report: self.stdout.write(str(report)),
+            )
+
+        if options["errors"]:
+            with open(options["errors"], "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["line", "error"])
+                writer.writerows(report.errors)
+        style = self.style.WARNING if report.errors else self.style.SUCCESS
+        self.stdout.write(style(f"Imported {report}"))
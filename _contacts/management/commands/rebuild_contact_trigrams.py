@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from _contacts import duplicates
+
+
+class Command(BaseCommand):
+    help = "Rewrites the name trigrams used by the fuzzy contact lookup (after bulk imports or the migration)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only rebuild the contacts of this username")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT")
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            user = get_user_model().objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"No user {options['user']!r}")
+        written = duplicates.rebuild(user, options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} trigrams"))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('_contacts', '0004_contact_tags'),
+        ('_global', '0002_tag_tag_owner_name_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['created_by', 'created_at'], name='contact_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['created_by', 'name'], name='contact_owner_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactinformation',
+            index=models.Index(fields=['created_by', 'created_at'], name='contactinfo_owner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactinformation',
+            index=models.Index(fields=['contact', 'created_at'], name='contactinfo_contact_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:21
+
+import _global.uuids
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('_contacts', '0007_contact_updated_at_contactinformation_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContactTrigram',
+            fields=[
+                ('id', models.UUIDField(default=_global.uuids.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('trigram', models.CharField(max_length=3)),
+                ('contact', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='_contacts.contact')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contact_trigrams_created', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_by', 'trigram', 'contact'], name='contacttrigram_lookup_idx')],
+                'constraints': [models.UniqueConstraint(fields=('contact', 'trigram'), name='contacttrigram_unique')],
+            },
+        ),
+    ]
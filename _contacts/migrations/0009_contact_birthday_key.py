@@ -0,0 +1,26 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:39
+
+import _contacts.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('_contacts', '0008_contacttrigram'),
+        ('_global', '0005_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contact',
+            name='birthday_key',
+            field=models.GeneratedField(db_persist=False, expression=_contacts.models.MonthDay('birthday'), output_field=models.PositiveSmallIntegerField(blank=True, null=True)),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['created_by', 'birthday_key'], name='contact_owner_birthday_idx'),
+        ),
+    ]
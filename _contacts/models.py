@@ -1,20 +1,50 @@
 from django.db import models
-import uuid
+from _global.uuids import uuid7
 from django.contrib.auth import get_user_model
+from django.db.models import Func
+
+class MonthDay(Func):
+    """month * 100 + day of a date (1231 for December 31st), NULL without a date."""
+    arity = 1
+    output_field = models.PositiveSmallIntegerField()
+    template = "(EXTRACT(MONTH FROM %(expressions)s) * 100 + EXTRACT(DAY FROM %(expressions)s))"
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # dates are stored as YYYY-MM-DD text
+        return self.as_sql(
+            compiler, connection,
+            template="CAST(substr(%(expressions)s, 6, 2) || substr(%(expressions)s, 9, 2) AS INTEGER)",
+            **extra_context,
+        )
 
 class Contact(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="contacts_created")
     created_at = models.DateTimeField(auto_now_add=True)
+    # also touched when one of its informations changes (see receivers.py)
+    updated_at = models.DateTimeField(auto_now=True)
     
     account = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="as_contact_in", blank=True, null=True)
     
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     birthday = models.DateField(blank=True, null=True)
+    # computed by the database, so it also holds for bulk_create/update(); see birthdays.py
+    birthday_key = models.GeneratedField(
+        expression=MonthDay("birthday"),
+        output_field=models.PositiveSmallIntegerField(blank=True, null=True),
+        db_persist=False,
+    )
     
     tags = models.ManyToManyField("_global.Tag", blank=True, related_name="contacts_tagged")
     
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_by", "created_at"], name="contact_owner_created_idx"),
+            models.Index(fields=["created_by", "name"], name="contact_owner_name_idx"),
+            models.Index(fields=["created_by", "birthday_key"], name="contact_owner_birthday_idx"),
+        ]
+    
     def __str__(self):
         return f"{self.name}: {self.description}"
         
@@ -33,9 +63,10 @@ class ContactInformation(models.Model):
         LIKES = "LIKES", "Likes"
         LIKES_NOT = "LIKES_NOT", "Likes not"
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="contact_informations_created")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     contact = models.ForeignKey(Contact, on_delete=models.CASCADE, related_name="contact_informations")
     information_type = models.CharField(max_length=255, choices=INFORMATION_TYPES.choices, default=INFORMATION_TYPES.GENERAL)
@@ -44,6 +75,31 @@ class ContactInformation(models.Model):
     class Meta:
         verbose_name = "Contact Information"
         verbose_name_plural = "Contact Informations"
+        indexes = [
+            models.Index(fields=["created_by", "created_at"], name="contactinfo_owner_idx"),
+            models.Index(fields=["contact", "created_at"], name="contactinfo_contact_idx"),
+        ]
     
     def __str__(self):
         return f"{self.contact.name}: {self.information_type}"
+
+class ContactTrigram(models.Model):
+    """
+    One row per distinct trigram of a contact's normalized name (see duplicates.py), so fuzzy
+    name lookups read the postings of the query's trigrams instead of every contact.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="contact_trigrams_created")
+    contact = models.ForeignKey(Contact, on_delete=models.CASCADE, related_name="trigrams")
+    trigram = models.CharField(max_length=3)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["contact", "trigram"], name="contacttrigram_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["created_by", "trigram", "contact"], name="contacttrigram_lookup_idx"),
+        ]
+    
+    def __str__(self):
+        return f"{self.contact_id}: {self.trigram!r}"
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from _global.cache import tiered_cache
+from .duplicates import index_contacts
+from .models import Contact, ContactInformation
+
+
+def contacts_namespace(user_id):
+    """Cache namespace of a user's contact list fragments."""
+    return f"contacts:{user_id}"
+
+
+@receiver([post_save, post_delete], sender=Contact, dispatch_uid="_contacts.receivers.contact_changed")
+def contact_changed(sender, instance, **kwargs):
+    tiered_cache.bump(contacts_namespace(instance.created_by_id))
+
+
+@receiver([post_save, post_delete], sender=ContactInformation, dispatch_uid="_contacts.receivers.information_changed")
+def information_changed(sender, instance, **kwargs):
+    # the contact's updated_at is the change stamp of its information fragment; update() skips contact_changed
+    Contact.objects.filter(pk=instance.contact_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Contact, dispatch_uid="_contacts.receivers.contact_name_changed")
+def contact_name_changed(sender, instance, update_fields=None, **kwargs):
+    # the trigrams are deleted with the contact (CASCADE)
+    if update_fields is None or "name" in update_fields:
+        index_contacts([instance])
@@ -1,3 +1,251 @@
-from django.test import TestCase
+import io
+import json
+import tracemalloc
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from _buckets.models import Bucket
+from _global.models import Tag
+from _global.search import search
+from _global.seeding import seed_contacts
+from .birthdays import key_ranges, next_birthday, upcoming_birthdays
+from .duplicates import find_duplicates, fuzzy_lookup, merge_contacts
+from .export import csv_chunks, ndjson_chunks
+from .importing import ImportRecord, RowError, import_contacts, parse_csv, parse_vcard
+from .models import Contact, ContactInformation, ContactTrigram
+
+EXPORTED_CONTACTS = 20000
+# streaming holds one chunk of rows at a time (about 7 MB peak, flat from 5k to 40k contacts), so the
+# bound stays under the size of the export itself and a buffered export would fail
+PEAK_MEMORY_BOUND = 8 * 1024 * 1024
+
+
+class ExportMemoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("exporter", password="x")
+        seed_contacts(cls.user, EXPORTED_CONTACTS, informations_per_contact=3)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def stream(self, url_name):
+        """Streams the export, returning (bytes, peak traced memory) without keeping the body."""
+        tracemalloc.start()
+        try:
+            response = self.client.get(reverse(url_name))
+            size = sum(len(chunk) for chunk in response.streaming_content)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(response.status_code, 200)
+        return size, peak
+
+    def test_csv_export_memory_is_bounded(self):
+        size, peak = self.stream("contact_export_csv")
+        self.assertGreater(size, PEAK_MEMORY_BOUND)
+        self.assertLess(peak, PEAK_MEMORY_BOUND)
+
+    def test_ndjson_export_memory_is_bounded(self):
+        size, peak = self.stream("contact_export_ndjson")
+        self.assertGreater(size, PEAK_MEMORY_BOUND)
+        self.assertLess(peak, PEAK_MEMORY_BOUND)
+
+
+class DuplicateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("deduper", password="x")
+        cls.jon = Contact.objects.create(created_by=cls.user, name="Jon Smith")
+        cls.john = Contact.objects.create(created_by=cls.user, name="John Smith")
+        Contact.objects.create(created_by=cls.user, name="Mary Poppins")
+
+    def test_groups_similar_names_oldest_first(self):
+        self.assertEqual(find_duplicates(self.user), [[self.jon.pk, self.john.pk]])
+
+    def test_groups_stop_growing_at_max_group_size(self):
+        # each name is similar to the next, the ends aren't
+        chain = ["Annabel Lee", "Annabel Leo", "Annabell Leon", "Anabell Leone", "Anabelle Leoni"]
+        user = get_user_model().objects.create_user("chained", password="x")
+        pks = [Contact.objects.create(created_by=user, name=name).pk for name in chain]
+        self.assertEqual(find_duplicates(user), [pks])
+        groups = find_duplicates(user, max_group_size=2)
+        self.assertTrue(groups)
+        self.assertTrue(all(len(group) <= 2 for group in groups))
+
+    def test_lookup_is_scoped_to_the_user(self):
+        other = get_user_model().objects.create_user("other", password="x")
+        Contact.objects.create(created_by=other, name="Jon Smith")
+        hits = fuzzy_lookup(self.user, "Jon Smith")
+        self.assertEqual([contact.pk for contact, _ in hits], [self.jon.pk, self.john.pk])
+        self.assertEqual(hits[0][1], 1.0)
+
+    def test_merge_moves_everything_to_the_target(self):
+        tag = Tag.objects.create(created_by=self.user, name="school")
+        bucket = Bucket.objects.create(created_by=self.user, name="Friends")
+        self.john.tags.add(tag)
+        bucket.contacts.add(self.john)
+        information = ContactInformation.objects.create(created_by=self.user, contact=self.john, content="Loves kayaking")
+
+        self.assertEqual(merge_contacts(self.jon, [self.john]), 1)
+        self.assertFalse(Contact.objects.filter(pk=self.john.pk).exists())
+        information.refresh_from_db()
+        self.assertEqual(information.contact_id, self.jon.pk)
+        self.assertEqual(list(self.jon.tags.all()), [tag])
+        self.assertEqual(list(self.jon.buckets.all()), [bucket])
+        # the duplicate's trigrams went with it, the target's are current
+        self.assertFalse(ContactTrigram.objects.filter(contact=self.john.pk).exists())
+        self.assertEqual([contact.pk for contact, _ in fuzzy_lookup(self.user, "John Smith")], [self.jon.pk])
+        self.assertEqual([hit.id for hit in search(self.user, "kayak")], [self.jon.pk])
+
+
+def parse_text(parser, text):
+    return list(parser(io.StringIO(text, newline="")))
+
+
+class VCardParserTests(SimpleTestCase):
+    def card(self, *lines):
+        return parse_text(parse_vcard, "\r\n".join(["BEGIN:VCARD", "VERSION:3.0", *lines, "END:VCARD", ""]))
+
+    def test_folded_lines_are_joined(self):
+        [record] = self.card("FN:Ada Lovelace", "NOTE:Met at the con", " ference")
+        self.assertEqual(record.description, "Met at the conference")
+
+    def test_quoted_printable_is_decoded_across_soft_breaks(self):
+        [record] = self.card("FN:Ada Lovelace", "NOTE;ENCODING=QUOTED-PRINTABLE;CHARSET=UTF-8:Caf=C3=A9 =", "au lait")
+        self.assertEqual(record.description, "Café au lait")
+
+    def test_name_from_n_only(self):
+        [record] = self.card("N:Smith;John;;Dr.;", "TEL;TYPE=CELL:+1 555 0100")
+        self.assertEqual(record.name, "Dr. John Smith")
+        self.assertEqual(record.informations, [("GENERAL", "Phone: +1 555 0100")])
+
+    def test_birthday_without_year_is_dropped_with_an_error(self):
+        error, record = self.card("FN:Ada Lovelace", "BDAY:--1210")
+        self.assertIsInstance(error, RowError)
+        self.assertEqual(error.line, 1)
+        self.assertEqual(record.birthday, None)
+        [record] = self.card("FN:Ada Lovelace", "BDAY:18151210")
+        self.assertEqual(record.birthday, date(1815, 12, 10))
+
+    def test_card_without_end(self):
+        self.assertEqual(parse_text(parse_vcard, "BEGIN:VCARD\r\nFN:Ada Lovelace\r\n"), [RowError(1, "Card without END:VCARD")])
+
+
+class CsvParserTests(SimpleTestCase):
+    def test_export_rows_of_one_contact_are_one_record(self):
+        records = parse_text(parse_csv, (
+            "contact_id,name,description,birthday,information_type,information\r\n"
+            "1,Ada Lovelace,,1815-12-10,HOBBY,Poetry\r\n"
+            "1,Ada Lovelace,,1815-12-10,JOB,Mathematician\r\n"
+            "2,Grace Hopper,,,,\r\n"
+        ))
+        self.assertEqual(records, [
+            ImportRecord(2, "Ada Lovelace", None, date(1815, 12, 10), [("HOBBY", "Poetry"), ("JOB", "Mathematician")]),
+            ImportRecord(4, "Grace Hopper", None, None, []),
+        ])
+
+    def test_name_from_first_and_last_name(self):
+        [record] = parse_text(parse_csv, "First Name,Last Name,E-Mail\nAda,Lovelace,ada@example.com\n")
+        self.assertEqual(record.name, "Ada Lovelace")
+        self.assertEqual(record.informations, [("GENERAL", "Email: ada@example.com")])
+
+    def test_missing_name_column(self):
+        [error] = parse_text(parse_csv, "email,phone\nada@example.com,555\n")
+        self.assertEqual(error.line, 1)
+        self.assertIn("No name column", error.message)
+
+
+class ImportTests(TestCase):
+    CSV = (
+        "name,email,phone,birthday\n"
+        "Ada Lovelace,ada@example.com,555 0100,\n"
+        "Grace Hopper,,,someday\n"
+        ",nobody@example.com,,\n"
+        "grace  HOPPER,grace@example.com,,\n"
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("importer", password="x")
+        ada = Contact.objects.create(created_by=cls.user, name="Ada Lovelace")
+        ContactInformation.objects.create(created_by=cls.user, contact=ada, content="Email: ada@example.com")
+
+    def test_duplicates_are_merged(self):
+        report = import_contacts(self.user, parse_text(parse_csv, self.CSV))
+        self.assertEqual(report.as_dict(), {"records": 3, "created": 1, "merged": 2, "skipped": 0, "informations": 2, "errors": 2})
+        self.assertEqual([error.line for error in report.errors], [3, 4])
+        informations = {
+            name: sorted(Contact.objects.get(created_by=self.user, name=name).contact_informations.values_list("content", flat=True))
+            for name in ["Ada Lovelace", "Grace Hopper"]
+        }
+        self.assertEqual(informations, {
+            "Ada Lovelace": ["Email: ada@example.com", "Phone: 555 0100"],
+            "Grace Hopper": ["Email: grace@example.com"],
+        })
+
+    def test_duplicates_are_skipped(self):
+        report = import_contacts(self.user, parse_text(parse_csv, self.CSV), on_duplicate="skip")
+        self.assertEqual(report.as_dict(), {"records": 3, "created": 1, "merged": 0, "skipped": 2, "informations": 0, "errors": 2})
+        self.assertEqual(Contact.objects.filter(created_by=self.user).count(), 2)
+
+    def test_export_imports_back(self):
+        source = get_user_model().objects.create_user("source", password="x")
+        ada = Contact.objects.create(created_by=source, name="Ada Lovelace", description='Wrote "notes", on\nthe engine', birthday=date(1815, 12, 10))
+        ContactInformation.objects.create(created_by=source, contact=ada, information_type="HOBBY", content="Poetry")
+        ContactInformation.objects.create(created_by=source, contact=ada, information_type="JOB", content="Mathematician")
+        Contact.objects.create(created_by=source, name="Grace Hopper")
+
+        target = get_user_model().objects.create_user("target", password="x")
+        report = import_contacts(target, parse_text(parse_csv, "".join(csv_chunks(source))))
+        self.assertEqual((report.created, report.informations, report.errors), (2, 2, []))
+
+        def exported(user):
+            contacts = (json.loads(line) for chunk in ndjson_chunks(user) for line in chunk.splitlines())
+            return sorted(({**contact, "id": None} for contact in contacts), key=lambda contact: contact["name"])
+        self.assertEqual(exported(target), exported(source))
+
+
+class BirthdayWindowTests(SimpleTestCase):
+    def test_window_within_the_year(self):
+        self.assertEqual(key_ranges(date(2026, 6, 1), 14), [(601, 615)])
+        self.assertEqual(key_ranges(date(2026, 6, 1), 0), [(601, 601)])
+
+    def test_window_over_new_year_is_two_ranges(self):
+        self.assertEqual(key_ranges(date(2026, 12, 25), 14), [(1225, 1231), (101, 108)])
+        self.assertEqual(key_ranges(date(2026, 12, 31), 1), [(1231, 1231), (101, 101)])
+
+    def test_window_ending_on_february_28_includes_the_29th_in_common_years(self):
+        self.assertEqual(key_ranges(date(2027, 2, 20), 8), [(220, 229)])
+        # in a leap year the 29th is a day of its own
+        self.assertEqual(key_ranges(date(2028, 2, 20), 8), [(220, 228)])
+        self.assertEqual(key_ranges(date(2026, 3, 1), 364), [(301, 1231), (101, 229)])
+
+    def test_february_29_is_celebrated_on_the_28th_in_common_years(self):
+        leap_birthday = date(2000, 2, 29)
+        self.assertEqual(next_birthday(leap_birthday, date(2027, 2, 20)), date(2027, 2, 28))
+        self.assertEqual(next_birthday(leap_birthday, date(2027, 3, 1)), date(2028, 2, 29))
+
+
+class UpcomingBirthdayTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("birthdays", password="x")
+        for name, birthday in [("Leap", date(2000, 2, 29)), ("New Year", date(1990, 1, 3)), ("Eve", date(1985, 12, 31))]:
+            Contact.objects.create(created_by=cls.user, name=name, birthday=birthday)
+
+    def upcoming(self, today, days):
+        return [(hit.contact.name, hit.date, hit.age, hit.days) for hit in upcoming_birthdays(self.user, days, today)]
+
+    def test_window_over_new_year_is_in_date_order(self):
+        self.assertEqual(self.upcoming(date(2026, 12, 30), 7), [
+            ("Eve", date(2026, 12, 31), 41, 1),
+            ("New Year", date(2027, 1, 3), 37, 4),
+        ])
+
+    def test_leap_day_birthday_in_a_common_year(self):
+        self.assertEqual(self.upcoming(date(2027, 2, 20), 8), [("Leap", date(2027, 2, 28), 27, 8)])
+        self.assertEqual(self.upcoming(date(2027, 2, 20), 7), [])
@@ -4,6 +4,15 @@ from . import views
 urlpatterns = [
     path('', views.contact_list, name="contact_list"),
     path('create/', views.contact_create, name="contact_create"),
+    path('tags/', views.contact_bulk_tag, name="contact_bulk_tag"),
+    path('import/', views.contact_import, name="contact_import"),
+    path('export/csv/', views.contact_export_csv, name="contact_export_csv"),
+    path('export/ndjson/', views.contact_export_ndjson, name="contact_export_ndjson"),
+    path('lookup/', views.contact_lookup, name="contact_lookup"),
+    path('birthdays/', views.contact_birthdays, name="contact_birthdays"),
+    path('birthdays/widget/', views.contact_birthdays_widget, name="contact_birthdays_widget"),
+    path('duplicates/', views.contact_duplicates, name="contact_duplicates"),
+    path('duplicates/merge/', views.contact_merge, name="contact_merge"),
     path('<uuid:contact_pk>/', views.contact_read, name="contact_read"),
     path('<uuid:contact_pk>/update/', views.contact_update, name="contact_update"),
     
@@ -1,23 +1,161 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse, StreamingHttpResponse
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.http import require_POST
+from django.views.decorators.vary import vary_on_headers
 import uuid
 
+from _global.cache import tiered_cache, user_namespace
+from _global.conditional import stamped
+from _global.forms import BulkTagForm
+from _global.pagination import paginate_keyset
+from .birthdays import MAX_DAYS, upcoming_birthdays
+from .duplicates import find_duplicates, fuzzy_lookup
+from .export import csv_chunks, ndjson_chunks
 from .models import Contact
-from .forms import ContactCreateForm, ContactInformationCreateForm
+from .receivers import contacts_namespace
+from .forms import ContactCreateForm, ContactImportForm, ContactInformationCreateForm, ContactMergeForm
+
+DUPLICATES_CACHE_TIMEOUT = 60 * 60
+DUPLICATE_GROUPS_SHOWN = 50
+BIRTHDAY_WINDOW_DAYS = 14
+BIRTHDAY_WIDGET_SIZE = 10
+IMPORT_ERRORS_SHOWN = 100
+
+def contact_list_stamp(request):
+    # no query: the contacts namespace is bumped whenever one of the user's contacts is saved or deleted, and
+    # the user's version also covers the tags offered by the bulk tag form. No Last-Modified, as no timestamp
+    # changes when a contact is deleted
+    return (
+        None, tiered_cache.version(contacts_namespace(request.user.pk)), request.GET.get("cursor", ""),
+        tiered_cache.version(user_namespace(request.user)),
+    )
 
 @login_required
+@vary_on_headers("HX-Request")
+@stamped(contact_list_stamp)
 def contact_list(request):
     user = request.user
-    contact_list = Contact.objects.filter(created_by=user)
+    # Lazy, so the rows are only queried when the cached fragment is missing or outdated
+    page = SimpleLazyObject(lambda: paginate_keyset(request, Contact.objects.filter(created_by=user), ordering="name"))
     context = {
         "title_action_section": True,
         "page_title": "My contacts",
-        "action_menu": [{"name": "Add new", "url": reverse("contact_create")}],
-        "obj_list": contact_list
+        "action_menu": [
+            {"name": "Add new", "url": reverse("contact_create")},
+            {"name": "Find duplicates", "url": reverse("contact_duplicates")},
+            {"name": "Import", "url": reverse("contact_import")},
+            {"name": "Export CSV", "url": reverse("contact_export_csv")},
+        ],
+        "obj_list": SimpleLazyObject(lambda: page.object_list),
+        "page": page,
+        "cursor": request.GET.get("cursor", ""),
+        "cache_namespace": contacts_namespace(user.pk),
+        "form": BulkTagForm(user),
     }
+    # htmx "load more" only needs the next rows
+    if request.htmx:
+        return render(request, "contacts/contact_list_rows.html", context)
     return render(request, "contacts/contact_list.html", context)
 
+@login_required
+@require_POST
+def contact_bulk_tag(request):
+    form = BulkTagForm(request.user, request.POST)
+    changed = form.save(Contact.objects.filter(created_by=request.user)) if form.is_valid() else 0
+    if request.htmx:
+        return render(request, "global/bulk_tag_result.html", {"form": form, "changed": changed})
+    return redirect("contact_list")
+
+def _export_response(chunks, content_type, extension):
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="contacts-{timezone.localdate():%Y-%m-%d}.{extension}"'
+    return response
+
+@login_required
+def contact_export_csv(request):
+    return _export_response(csv_chunks(request.user), "text/csv; charset=utf-8", "csv")
+
+@login_required
+def contact_export_ndjson(request):
+    return _export_response(ndjson_chunks(request.user), "application/x-ndjson; charset=utf-8", "ndjson")
+
+@login_required
+def contact_import(request):
+    form = ContactImportForm(request.POST or None, request.FILES or None)
+    report = form.save(request.user) if request.method == "POST" and form.is_valid() else None
+    context = {
+        "title_action_section": True,
+        "page_title": "Import contacts",
+        "form": form,
+        "report": report,
+        "errors_shown": report.errors[:IMPORT_ERRORS_SHOWN] if report else [],
+    }
+    return render(request, "contacts/contact_import.html", context)
+
+@login_required
+def contact_lookup(request):
+    hits = fuzzy_lookup(request.user, request.GET.get("q", ""))
+    results = [
+        {"id": str(contact.pk), "name": contact.name, "similarity": round(score, 3), "url": reverse("contact_read", args=[contact.pk])}
+        for contact, score in hits
+    ]
+    return JsonResponse({"results": results})
+
+@login_required
+def contact_birthdays(request):
+    try:
+        days = min(max(int(request.GET.get("days", BIRTHDAY_WINDOW_DAYS)), 0), MAX_DAYS)
+    except ValueError:
+        days = BIRTHDAY_WINDOW_DAYS
+    results = [
+        {
+            "id": str(upcoming.contact.pk), "name": upcoming.contact.name, "birthday": upcoming.contact.birthday.isoformat(),
+            "date": upcoming.date.isoformat(), "age": upcoming.age, "days": upcoming.days,
+            "url": reverse("contact_read", args=[upcoming.contact.pk]),
+        }
+        for upcoming in upcoming_birthdays(request.user, days)
+    ]
+    return JsonResponse({"days": days, "results": results})
+
+@login_required
+def contact_birthdays_widget(request):
+    # loaded into the homepage by htmx
+    context = {
+        "obj_list": upcoming_birthdays(request.user, BIRTHDAY_WINDOW_DAYS, limit=BIRTHDAY_WIDGET_SIZE),
+        "days": BIRTHDAY_WINDOW_DAYS,
+    }
+    return render(request, "contacts/birthday_widget.html", context)
+
+@login_required
+def contact_duplicates(request):
+    user = request.user
+    # the contacts namespace is bumped whenever one of the user's contacts changes
+    groups = tiered_cache.get_or_set(
+        "duplicates", lambda: find_duplicates(user), DUPLICATES_CACHE_TIMEOUT, namespace=contacts_namespace(user.pk),
+    )
+    shown = groups[:DUPLICATE_GROUPS_SHOWN]
+    contacts = Contact.objects.filter(created_by=user).in_bulk([pk for group in shown for pk in group])
+    context = {
+        "title_action_section": True,
+        "page_title": "Possible duplicates",
+        "obj_list": [[contacts[pk] for pk in group if pk in contacts] for group in shown],
+        "group_count": len(groups),
+    }
+    return render(request, "contacts/contact_duplicates.html", context)
+
+@login_required
+@require_POST
+def contact_merge(request):
+    form = ContactMergeForm(request.user, request.POST)
+    if not form.is_valid():
+        return redirect("contact_duplicates")
+    target = form.save()
+    return redirect("contact_read", target.pk)
+
 @login_required
 def contact_create(request):
     user = request.user
@@ -34,10 +172,17 @@ def contact_create(request):
     }
     return render(request, "contacts/contact_create.html", context)
     
+def contact_read_stamp(request, contact_pk):
+    # updated_at is also touched when an information of the contact changes
+    updated_at = Contact.objects.filter(pk=contact_pk, created_by=request.user).values_list("updated_at", flat=True).first()
+    return (updated_at, contact_pk) if updated_at else None
+
 @login_required
+@stamped(contact_read_stamp)
 def contact_read(request, contact_pk: uuid):
     user = request.user
-    contact = get_object_or_404(Contact.objects.prefetch_related("contact_informations"), pk=contact_pk, created_by=user)
+    # informations are loaded by the template, only when their cached fragment is outdated
+    contact = get_object_or_404(Contact, pk=contact_pk, created_by=user)
     context = {
         "title_action_section": True,
         "page_title": str(contact.name),
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class GlobalConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = '_global'
+
+    def ready(self):
+        from . import cache, search, slow_queries, tag_index
+        cache.setup()
+        tag_index.setup()
+        search.setup()
+        slow_queries.setup()
@@ -0,0 +1,237 @@
+"""
+Two-level cache: a bounded in-process LRU (L1) in front of the `default` cache (L2, Redis).
+
+Keys are scoped to a namespace such as `user:<pk>` whose current version is part of every key, so
+invalidating everything a user can see is a single write of a new version instead of a key scan.
+Versions are bumped by the model signals below; stale entries are never read again and expire on their own.
+
+Other processes learn about a bump when their L1 copy of the version expires (CACHE_VERSION_TTL seconds),
+so that is the longest a cross-process change can stay invisible. Cached values are shared between
+threads and must be treated as read-only.
+
+When Redis can't be reached, at startup or later on, the failing call counts as a miss (or a lost write)
+and L2 is skipped for L2_RETRY_INTERVAL seconds, so an outage slows nothing down and never fails a request
+or a model save (the invalidation receivers write versions); development and test runs work without a
+Redis server. Meanwhile every process only has its L1, whose versions expire after CACHE_VERSION_TTL like
+any other. Versions bumped during the outage are written once L2 answers again, so no process reads an
+entry of an old version afterwards.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .middleware import current_metrics
+from .models import Tag
+from .signals import tags_bulk_changed
+from .uuids import uuid7
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+# seconds L2 is skipped after a failed call
+L2_RETRY_INTERVAL = 5
+
+
+def _count(alias, hit):
+    metrics = current_metrics.get()
+    if metrics is not None:
+        metrics.count_cache(alias, 1 if hit else 0, 0 if hit else 1)
+
+
+class LocalLRUCache:
+    """Thread-safe dict with a maximum size (least recently used entries go first) and per-entry expiry."""
+
+    def __init__(self, max_entries=1000, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key: (expires_at, value)
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class TieredCache:
+    def __init__(self, alias="default", max_entries=1000, ttl=60, version_ttl=2):
+        self.alias = alias
+        self.local = LocalLRUCache(max_entries, ttl)
+        self.version_ttl = version_ttl
+        self.lock = threading.Lock()
+        self.down_until = 0.0
+        # namespace: version of the bumps L2 missed
+        self.missed_bumps = {}
+
+    @property
+    def l2(self):
+        return caches[self.alias]
+
+    def _l2_call(self, method, *args, default=None):
+        """Calls `method` of L2; while it fails, returns `default` instead of raising."""
+        if self.down_until > time.monotonic():
+            return default
+        # missed bumps go first, so no old version is read after an outage
+        if self.missed_bumps and not self._write_missed_bumps():
+            return default
+        try:
+            return getattr(self.l2, method)(*args)
+        except Exception as e:
+            self._failed(e)
+            return default
+
+    def _failed(self, error):
+        logger.warning("Cache %r failed (%s), skipping it for %ss", self.alias, error, L2_RETRY_INTERVAL)
+        self.down_until = time.monotonic() + L2_RETRY_INTERVAL
+
+    def _write_missed_bumps(self):
+        with self.lock:
+            missed, self.missed_bumps = self.missed_bumps, {}
+        try:
+            self.l2.set_many({self._version_key(namespace): version for namespace, version in missed.items()}, None)
+        except Exception as e:
+            with self.lock:
+                # bumps made meanwhile are newer
+                self.missed_bumps = {**missed, **self.missed_bumps}
+            self._failed(e)
+            return False
+        return True
+
+    def _l2_get(self, key):
+        # the configured caches count themselves (see middleware.instrument_caches)
+        return self._l2_call("get", key, MISSING, default=MISSING)
+
+    # --- versions ---
+
+    def _version_key(self, namespace):
+        return f"cachever:{namespace}"
+
+    def version(self, namespace):
+        key = self._version_key(namespace)
+        version = self.local.get(key)
+        if version is None:
+            version = self._l2_get(key)
+            if version is MISSING:
+                # versions are random rather than counters, so an evicted version can't bring back old entries
+                candidate = uuid7().hex
+                self._l2_call("add", key, candidate, None)
+                version = self._l2_call("get", key, default=None) or candidate
+            self.local.set(key, version, self.version_ttl)
+        return version
+
+    def bump(self, namespace):
+        """Invalidates every entry of the namespace."""
+        key = self._version_key(namespace)
+        version = uuid7().hex
+        if self._l2_call("set", key, version, None, default=MISSING) is MISSING:
+            with self.lock:
+                self.missed_bumps[namespace] = version
+        self.local.set(key, version, self.version_ttl)
+
+    # --- entries ---
+
+    def make_key(self, key, namespace=None):
+        if namespace is None:
+            return f"tiered:{key}"
+        return f"tiered:{namespace}:{self.version(namespace)}:{key}"
+
+    def get(self, key, default=None, namespace=None):
+        full_key = self.make_key(key, namespace)
+        value = self.local.get(full_key, MISSING)
+        _count("l1", value is not MISSING)
+        if value is MISSING:
+            value = self._l2_get(full_key)
+            if value is MISSING:
+                return default
+            self.local.set(full_key, value)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, namespace=None):
+        full_key = self.make_key(key, namespace)
+        self._l2_call("set", full_key, value, timeout)
+        self.local.set(full_key, value, None if timeout in (DEFAULT_TIMEOUT, None) else timeout)
+
+    def delete(self, key, namespace=None):
+        full_key = self.make_key(key, namespace)
+        self._l2_call("delete", full_key)
+        self.local.delete(full_key)
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, namespace=None):
+        """Returns the cached value, computing and storing `default()` on a miss."""
+        value = self.get(key, MISSING, namespace)
+        if value is MISSING:
+            value = default() if callable(default) else default
+            self.set(key, value, timeout, namespace)
+        return value
+
+
+def user_namespace(user_or_pk):
+    return f"user:{getattr(user_or_pk, 'pk', user_or_pk)}"
+
+
+tiered_cache = TieredCache(
+    max_entries=getattr(settings, "L1_CACHE_MAX_ENTRIES", 1000),
+    ttl=getattr(settings, "L1_CACHE_TTL", 60),
+    version_ttl=getattr(settings, "CACHE_VERSION_TTL", 2),
+)
+
+
+# --- INVALIDATION ---
+
+def bump_owner(instance):
+    """Bumps the version of the user owning `instance` (models with a `created_by` field)."""
+    owner_id = getattr(instance, "created_by_id", None)
+    if owner_id is not None:
+        tiered_cache.bump(user_namespace(owner_id))
+
+
+def model_changed(sender, instance, **kwargs):
+    bump_owner(instance)
+
+
+def relation_changed(sender, instance, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_owner(instance)
+
+
+def tags_changed_in_bulk(sender, tag_ids, **kwargs):
+    for owner_id in Tag.objects.filter(pk__in=tag_ids).values_list("created_by_id", flat=True).distinct():
+        tiered_cache.bump(user_namespace(owner_id))
+
+
+def setup():
+    tags_bulk_changed.connect(tags_changed_in_bulk, dispatch_uid="_global.cache.tags_bulk_changed")
+    post_save.connect(model_changed, dispatch_uid="_global.cache.post_save")
+    post_delete.connect(model_changed, dispatch_uid="_global.cache.post_delete")
+    m2m_changed.connect(relation_changed, dispatch_uid="_global.cache.m2m_changed")
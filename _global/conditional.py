@@ -0,0 +1,33 @@
+"""
+Conditional GET (ETag / Last-Modified) for views whose content can be summarised by a cheap stamp query.
+"""
+import hashlib
+
+from django.views.decorators.http import condition
+
+
+def make_etag(request, *parts):
+    """ETag over the user, the response flavour (full page or htmx fragment) and the given stamps."""
+    raw = "|".join(str(part) for part in (request.user.pk, bool(getattr(request, "htmx", False)), *parts))
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def stamped(stamp_func):
+    """
+    condition() decorator fed by a single query per request: `stamp_func(request, *args, **kwargs)` returns
+    (last_modified, *etag_parts), or None when there is nothing to validate (the view then runs as usual).
+    """
+    def get_stamp(request, *args, **kwargs):
+        if not hasattr(request, "_conditional_stamp"):
+            request._conditional_stamp = stamp_func(request, *args, **kwargs)
+        return request._conditional_stamp
+
+    def etag(request, *args, **kwargs):
+        stamp = get_stamp(request, *args, **kwargs)
+        return make_etag(request, *stamp) if stamp is not None else None
+
+    def last_modified(request, *args, **kwargs):
+        stamp = get_stamp(request, *args, **kwargs)
+        return stamp[0] if stamp is not None else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
@@ -1,6 +1,8 @@
 from django import forms
 from django_select2.forms import Select2Widget, Select2MultipleWidget
 
+from .select2 import PrefixModelSelect2Widget, PrefixModelSelect2MultipleWidget
+
 def dc_form_fields_char(label, help_text="", placeholder="", required=True, **kwargs):
     """Factory for a standard CharField with a TextInput widget."""
     attrs = {"class": "field"}
@@ -158,6 +160,34 @@ def dc_form_fields_select2_model_choice_multiple(label, queryset, help_text="",
         widget=Select2MultipleWidget(attrs={"class": "field"}),
         **kwargs
     )
+
+def dc_form_fields_select2_model_search(label, queryset, search_field="name", help_text="", required=True, empty_label="---------", **kwargs):
+    """
+    Like dc_form_fields_select2_model_choice, but for large querysets: the options are searched on the server
+    by prefix of `search_field` (index it together with the queryset's filter) and loaded page by page.
+    """
+    return forms.ModelChoiceField(
+        label=label,
+        help_text=help_text,
+        queryset=queryset,
+        required=required,
+        empty_label=empty_label,
+        widget=PrefixModelSelect2Widget(search_fields=[search_field], attrs={"class": "field", "data-minimum-input-length": 1}),
+        **kwargs
+    )
+
+def dc_form_fields_select2_model_search_multiple(label, queryset, search_field="name", help_text="", required=True, **kwargs):
+    """
+    Like dc_form_fields_select2_model_choice_multiple, but for large querysets (see dc_form_fields_select2_model_search).
+    """
+    return forms.ModelMultipleChoiceField(
+        label=label,
+        help_text=help_text,
+        queryset=queryset,
+        required=required,
+        widget=PrefixModelSelect2MultipleWidget(search_fields=[search_field], attrs={"class": "field", "data-minimum-input-length": 1}),
+        **kwargs
+    )
   
 def dc_form_fields_select2_choice(label, choices, help_text="", required=True, **kwargs):
     return forms.ChoiceField(
@@ -0,0 +1,35 @@
+import uuid
+
+from django import forms
+from .dc_forms import *
+
+from .models import Tag
+from .tagging import bulk_tag, bulk_untag
+
+class MultipleUUIDField(forms.Field):
+    """A list of UUIDs posted under one name (e.g. the checked rows of a list)."""
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        try:
+            return [uuid.UUID(str(item)) for item in value or []]
+        except ValueError:
+            raise forms.ValidationError("Invalid selection")
+
+class BulkTagForm(forms.Form):
+    """Adds or removes one of the user's tags on the selected objects of a list view."""
+    ACTIONS = [("add", "Add tag"), ("remove", "Remove tag")]
+    
+    ids = MultipleUUIDField(error_messages={"required": "Select at least one entry"})
+    tag = dc_form_fields_select2_model_search(label="Tag", queryset=Tag.objects.none())
+    action = dc_form_fields_choice(label="Action", choices=ACTIONS)
+    
+    def __init__(self, user, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["tag"].queryset = Tag.objects.filter(created_by=user).order_by("name")
+    
+    def save(self, queryset):
+        """Applies the action to the selected objects within `queryset`; returns the number of changed links."""
+        objects = queryset.filter(pk__in=self.cleaned_data["ids"])
+        apply = bulk_tag if self.cleaned_data["action"] == "add" else bulk_untag
+        return apply(queryset.model, objects, [self.cleaned_data["tag"]])
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from _global import tag_index
+
+
+class Command(BaseCommand):
+    help = "Adds every tag link of the taggable models' through-tables that is missing from the unified tag index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true", help="Empty the index first")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT")
+
+    def handle(self, *args, **options):
+        added = tag_index.backfill(rebuild=options["rebuild"], batch_size=options["batch_size"])
+        for label, count in added.items():
+            self.stdout.write(f"{label}: {count} added")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {sum(added.values())} tag links"))
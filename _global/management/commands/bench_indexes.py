@@ -0,0 +1,91 @@
+import json
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from _global.benchmarking import throwaway_database, median_ms
+from _global.seeding import DEFAULT_VOLUMES, seed_users, seed_user_data
+from _global.models import Tag
+from _contacts.models import Contact, ContactInformation
+from _buckets.models import Bucket, Document
+from _tasks.models import Task
+from _trips.models import Event, Activity
+from _shopping.models import ShoppingList, ShoppingListItem
+
+
+def index_cases(user):
+    """(model, index name, queryset) for the list access pattern each composite index serves."""
+    shopping_list = ShoppingList.objects.filter(created_by=user).first()
+    event = Event.objects.filter(trip__created_by=user).first()
+    return [
+        (Contact, "contact_owner_created_idx", Contact.objects.filter(created_by=user).order_by("-created_at")[:50]),
+        (Contact, "contact_owner_name_idx", Contact.objects.filter(created_by=user).order_by("name")[:50]),
+        (ContactInformation, "contactinfo_owner_idx", ContactInformation.objects.filter(created_by=user).order_by("-created_at")[:50]),
+        (Task, "task_owner_status_prio_idx", Task.objects.filter(created_by=user, status=Task.STATUSES.OPEN).order_by("priority")[:50]),
+        (ShoppingList, "shoplist_owner_archived_idx", ShoppingList.objects.filter(created_by=user, is_archived=False).order_by("created_at")),
+        (ShoppingListItem, "shoplistitem_list_bought_idx", ShoppingListItem.objects.filter(shopping_list=shopping_list, is_bought=False)),
+        (Event, "event_trip_start_idx", Event.objects.filter(trip=event.trip_id).order_by("date_start", "time_start")),
+        (Activity, "activity_event_start_idx", Activity.objects.filter(event=event).order_by("date_start", "time_start")),
+        (Tag, "tag_owner_name_idx", Tag.objects.filter(created_by=user).order_by("name")),
+        (Document, "document_owner_created_idx", Document.objects.filter(created_by=user).order_by("-created_at")[:50]),
+        (Bucket, "bucket_owner_created_idx", Bucket.objects.filter(created_by=user).order_by("-created_at")[:50]),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway database and compares query plan and time of the per-user list queries "
+        "with and without their composite index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20, help="Number of users sharing the tables")
+        parser.add_argument("--scale", type=float, default=2.0, help="Multiplies the per-user seed volumes")
+        parser.add_argument("--repeat", type=int, default=20, help="Runs per query; the median is reported")
+        parser.add_argument("--report", help="Write a JSON report to this path")
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            results = self.run_benchmarks(options)
+
+        for result in results:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{result['index']}: {result['with_ms']}ms with, {result['without_ms']}ms without"))
+            self.stdout.write(f"  with:    {result['plan_with']}")
+            self.stdout.write(f"  without: {result['plan_without']}")
+        if options["report"]:
+            with open(options["report"], "w") as f:
+                json.dump(results, f, indent=2)
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def run_benchmarks(self, options):
+        volumes = {key: int(value * options["scale"]) for key, value in DEFAULT_VOLUMES.items()}
+        volumes.update(tags_per_object=DEFAULT_VOLUMES["tags_per_object"], informations=DEFAULT_VOLUMES["informations"],
+                       activities=DEFAULT_VOLUMES["activities"], trip_resources=0)
+        rng = random.Random(0)
+        users = seed_users(options["users"], batch_size=5000)
+        for user in users:
+            seed_user_data(user, volumes, rng, batch_size=5000)
+        self.stdout.write(f"Seeded {len(users)} users")
+        self.analyze()
+
+        results = []
+        for model, index_name, queryset in index_cases(users[len(users) // 2]):
+            index = next(index for index in model._meta.indexes if index.name == index_name)
+            result = {"index": index_name, "sql": str(queryset.query)}
+            result["plan_with"] = queryset.explain()
+            result["with_ms"] = median_ms(lambda: list(queryset.all()), options["repeat"])
+            with connection.schema_editor() as schema_editor:
+                schema_editor.remove_index(model, index)
+            self.analyze()
+            result["plan_without"] = queryset.explain()
+            result["without_ms"] = median_ms(lambda: list(queryset.all()), options["repeat"])
+            with connection.schema_editor() as schema_editor:
+                schema_editor.add_index(model, index)
+            # a re-created index has no planner statistics until the next ANALYZE
+            self.analyze()
+            results.append(result)
+        return results
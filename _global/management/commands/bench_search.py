@@ -0,0 +1,116 @@
+import itertools
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from _buckets.models import Document
+from _contacts.models import Contact
+from _global import search
+from _global.benchmarking import throwaway_database, median_ms
+from _global.seeding import bulk_insert, seed_users
+from _shopping.models import Recipe, ShoppingList
+from _tasks.models import Task
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vi", "zo", "be", "du", "fa", "gi", "ho", "ju", "pe", "so"]
+# share of the corpus per type
+MIX = {"documents": 0.45, "tasks": 0.30, "contacts": 0.20, "recipes": 0.05}
+
+
+def icontains_search(user, query, limit=20):
+    """What the index replaces: substring filters over every searchable model (unranked, so LIMIT can stop early)."""
+    hits = []
+    for model, fields in ((Contact, ("name", "description")), (Document, ("name", "description", "content")),
+                          (Task, ("name", "description")), (Recipe, ("name", "content"))):
+        condition = Q()
+        for term in query.split():
+            term_condition = Q()
+            for field in fields:
+                term_condition |= Q(**{f"{field}__icontains": term})
+            condition &= term_condition
+        hits += model.objects.filter(condition, created_by=user).values_list("pk", flat=True)[:limit]
+    return hits
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway database with a synthetic text corpus (Zipf-distributed words) over contacts, "
+        "documents, tasks and recipes, builds the FTS5 index and compares searches with icontains filters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Searchable objects in total")
+        parser.add_argument("--users", type=int, default=10, help="Owners the corpus is spread over")
+        parser.add_argument("--words", type=int, default=40, help="Words per body")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the median is reported")
+        parser.add_argument("--report", help="Write a JSON report to this path")
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            result = self.run_benchmark(options)
+
+        for key, value in result.items():
+            self.stdout.write(f"{key}: {value}")
+        if options["report"]:
+            with open(options["report"], "w") as f:
+                json.dump(result, f, indent=2)
+
+    def seed(self, options, vocabulary):
+        rng = random.Random(0)
+        users = seed_users(options["users"], "bench-search")
+        cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+
+        def text(words):
+            return " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=words))
+
+        def objects(model, count, **fields):
+            for i in range(count):
+                user = users[i % len(users)]
+                yield model(created_by=user, name=text(3).capitalize(), **{field: text(words) for field, words in fields.items()})
+
+        words = options["words"]
+        counts = {kind: int(options["rows"] * share) for kind, share in MIX.items()}
+        bulk_insert(Document, objects(Document, counts["documents"], description=8, content=words), 5000)
+        bulk_insert(Task, objects(Task, counts["tasks"], description=words), 5000)
+        bulk_insert(Contact, objects(Contact, counts["contacts"], description=words), 5000)
+        lists = bulk_insert(ShoppingList, (ShoppingList(created_by=users[i % len(users)], name="Ingredients") for i in range(counts["recipes"])), 5000)
+        bulk_insert(Recipe, (
+            Recipe(created_by=recipe.created_by, shopping_list_id=list_pk, name=recipe.name, content=recipe.content)
+            for recipe, list_pk in zip(objects(Recipe, counts["recipes"], content=words), lists)
+        ), 5000)
+        return users[0]
+
+    def run_benchmark(self, options):
+        vocabulary = ["".join(parts) for parts in itertools.product(SYLLABLES, repeat=3)]
+        user = self.seed(options, vocabulary)
+        repeat = options["repeat"]
+
+        start = time.perf_counter()
+        indexed = search.rebuild()
+        build_s = time.perf_counter() - start
+        start = time.perf_counter()
+        search.optimize()
+        result = {
+            "rows": sum(indexed.values()),
+            "indexed": indexed,
+            "build_s": round(build_s, 2),
+            "rows_per_s": round(sum(indexed.values()) / build_s),
+            "optimize_s": round(time.perf_counter() - start, 2),
+        }
+
+        queries = {
+            "common": vocabulary[0],
+            "rare": vocabulary[-1],
+            "prefix": vocabulary[40][:3],
+            "two_terms": f"{vocabulary[3]} {vocabulary[300]}",
+        }
+        for name, query in queries.items():
+            result[f"{name}_hits"] = len(search.search(user, query, limit=1000))
+            result[f"{name}_fts_ms"] = median_ms(lambda: search.search(user, query), repeat)
+            result[f"{name}_icontains_ms"] = median_ms(lambda: icontains_search(user, query), repeat)
+
+        document = Document.objects.filter(created_by=user).first()
+        result["reindex_on_save_ms"] = median_ms(document.save, repeat)
+        return result
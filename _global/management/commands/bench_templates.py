@@ -0,0 +1,77 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template.backends.django import DjangoTemplates
+from django.test import RequestFactory
+from django_htmx.middleware import HtmxDetails
+
+from _global.benchmarking import median_ms
+from _global.pagination import KeysetPage
+from _global.uuids import uuid7
+from _contacts.models import Contact
+
+
+def make_backend(cached):
+    """A fresh template engine configured like settings.TEMPLATES, with or without the cached loader."""
+    params = {"APP_DIRS": False, **settings.TEMPLATES[0], "NAME": f"bench-{uuid7().hex}"}
+    del params["BACKEND"]
+    options = {**params["OPTIONS"]}
+    options["loaders"] = [("django.template.loaders.cached.Loader", settings.TEMPLATE_LOADERS)] if cached else settings.TEMPLATE_LOADERS
+    params["OPTIONS"] = options
+    return DjangoTemplates(params)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the render time of a template on a fresh engine (first request of a worker) "
+        "against an engine that already compiled it, with and without the cached loader, reading warm "
+        "fragment caches; fragment_miss_ms renders with every fragment cache missing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--template", default="contacts/contact_list.html")
+        parser.add_argument("--rows", type=int, default=50, help="Contacts in the rendered list")
+        parser.add_argument("--repeat", type=int, default=50, help="Renders per measurement; the median is reported")
+        parser.add_argument("--report", help="Write a JSON report to this path")
+
+    def make_context(self, rows):
+        request = RequestFactory().get("/contacts/")
+        request.user = AnonymousUser()
+        request.htmx = HtmxDetails(request)
+        contacts = [Contact(id=uuid7(), name=f"Contact {i}", description="Met at the conference") for i in range(rows)]
+        return request, {
+            "title_action_section": True,
+            "page_title": "My contacts",
+            "obj_list": contacts,
+            "page": KeysetPage(contacts, next_cursor="next"),
+            "cursor": "",
+        }
+
+    def render(self, backend, name, request, context, namespace):
+        return backend.get_template(name).render({**context, "cache_namespace": namespace}, request)
+
+    def handle(self, *args, **options):
+        name, repeat = options["template"], options["repeat"]
+        request, context = self.make_context(options["rows"])
+
+        cached = make_backend(cached=True)
+        uncached = make_backend(cached=False)
+        # compiles the template and fills its fragment caches once, so the timed renders only read them
+        namespace = f"bench:{uuid7().hex}"
+        self.render(cached, name, request, context, namespace)
+        result = {
+            "template": name,
+            "rows": options["rows"],
+            "first_request_ms": median_ms(lambda: self.render(make_backend(cached=True), name, request, context, namespace), repeat),
+            "steady_state_cached_ms": median_ms(lambda: self.render(cached, name, request, context, namespace), repeat),
+            "steady_state_uncached_ms": median_ms(lambda: self.render(uncached, name, request, context, namespace), repeat),
+            # a new namespace per render: every fragment is rendered and written
+            "fragment_miss_ms": median_ms(lambda: self.render(cached, name, request, context, f"bench:{uuid7().hex}"), repeat),
+        }
+        for key, value in result.items():
+            self.stdout.write(f"{key}: {value}")
+        if options["report"]:
+            with open(options["report"], "w") as f:
+                json.dump(result, f, indent=2)
@@ -0,0 +1,89 @@
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from _global.benchmarking import median_ms
+from _global.uuids import uuid7
+
+# Same layout Django uses for a UUIDField primary key on SQLite
+SCHEMA = 'CREATE TABLE "item" ("id" char(32) NOT NULL PRIMARY KEY, "created_at" datetime NOT NULL, "payload" text NOT NULL)'
+GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+class Command(BaseCommand):
+    help = "Compares insert speed, file size and recent-row lookups of uuid4 and uuid7 primary keys on SQLite."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500_000, help="Rows inserted per key type")
+        parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per transaction")
+        parser.add_argument("--cache-kb", type=int, default=2048, help="SQLite page cache; keep it small to expose locality")
+        parser.add_argument("--recent", type=int, default=10_000, help="Most recently inserted rows looked up by pk")
+        parser.add_argument("--report", help="Write a JSON report to this path")
+
+    def handle(self, *args, **options):
+        results = []
+        with tempfile.TemporaryDirectory() as directory:
+            for name, generator in GENERATORS.items():
+                results.append(self.run_benchmark(os.path.join(directory, f"{name}.sqlite3"), name, generator, options))
+
+        for result in results:
+            self.stdout.write(
+                f"{result['key']}: insert {result['insert_s']}s ({result['rows_per_s']} rows/s), "
+                f"{result['size_mb']} MB, recent lookups {result['recent_lookup_ms']}ms, "
+                f"recent range scan {result['recent_scan_ms']}ms ({result['recent_scan_rows']} rows)"
+            )
+        if options["report"]:
+            with open(options["report"], "w") as f:
+                json.dump(results, f, indent=2)
+
+    def run_benchmark(self, path, name, generator, options):
+        db = sqlite3.connect(path, isolation_level=None)
+        db.execute(f"PRAGMA cache_size = -{options['cache_kb']}")
+        db.execute(SCHEMA)
+        payload = "x" * 200
+        recent_ids = []
+
+        start = time.perf_counter()
+        inserted = 0
+        while inserted < options["rows"]:
+            size = min(options["batch_size"], options["rows"] - inserted)
+            rows = [(generator().hex, time.time(), payload) for _ in range(size)]
+            db.execute("BEGIN")
+            db.executemany('INSERT INTO "item" VALUES (?, ?, ?)', rows)
+            db.execute("COMMIT")
+            inserted += size
+            recent_ids = (recent_ids + [row[0] for row in rows])[-options["recent"]:]
+        insert_s = time.perf_counter() - start
+
+        page_count = db.execute("PRAGMA page_count").fetchone()[0]
+        page_size = db.execute("PRAGMA page_size").fetchone()[0]
+        # reopen so lookups start with a cold page cache
+        db.close()
+        db = sqlite3.connect(path)
+        db.execute(f"PRAGMA cache_size = -{options['cache_kb']}")
+
+        def lookups():
+            for pk in recent_ids:
+                db.execute('SELECT "payload" FROM "item" WHERE "id" = ?', (pk,)).fetchone()
+
+        # With time-ordered keys this returns exactly the recent rows, with uuid4 an arbitrary share of the table
+        def range_scan():
+            return db.execute('SELECT "id", "payload" FROM "item" WHERE "id" >= ? ORDER BY "id"', (min(recent_ids),)).fetchall()
+
+        result = {
+            "key": name,
+            "rows": options["rows"],
+            "insert_s": round(insert_s, 2),
+            "rows_per_s": int(options["rows"] / insert_s),
+            "size_mb": round(page_count * page_size / 1024 / 1024, 1),
+            "recent_lookup_ms": median_ms(lookups, 3),
+            "recent_scan_ms": median_ms(range_scan, 3),
+            "recent_scan_rows": len(range_scan()),
+        }
+        db.close()
+        return result
@@ -0,0 +1,142 @@
+import json
+import logging
+import statistics
+import time
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from _global.benchmarking import throwaway_database
+from _global.metrics import request_budget
+from _global.seeding import seed_buckets, seed_contacts, seed_items, seed_shopping_lists, seed_trips
+from _trips.models import Event
+
+BENCHMARKED_APPS = ["_contacts", "_trips", "_buckets", "_global"]
+# Views a plain GET can't exercise
+SKIPPED_URL_NAMES = {
+    "select2_results": "needs a field_id issued by a rendered widget",
+}
+
+
+def iter_url_patterns(patterns, prefix=""):
+    """Yields (url_name, route, pattern) for every named pattern, following include()s."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_url_patterns(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name, prefix + str(pattern.pattern), pattern
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway test database with realistic per-user data volumes and measures query count, "
+        "wall time and rendered bytes for every routed view. Fails when a view exceeds its budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--contacts", type=int, default=3000, help="Contacts for the benchmark user")
+        parser.add_argument("--informations", type=int, default=3, help="Contact informations per contact")
+        parser.add_argument("--events", type=int, default=200, help="Events in the benchmark trip")
+        parser.add_argument("--activities", type=int, default=3, help="Activities per event")
+        parser.add_argument("--items", type=int, default=300, help="Items on the benchmark shopping list")
+        parser.add_argument("--repeat", type=int, default=5, help="Requests per view; the median is reported")
+        parser.add_argument("--report", help="Write a JSON report to this path")
+        parser.add_argument("--keepdb", action="store_true", help="Keep the test database between runs")
+
+    def handle(self, *args, **options):
+        # per-request log lines would drown the report
+        logging.getLogger("_global.middleware").setLevel(logging.WARNING)
+        with throwaway_database(options["keepdb"]):
+            results = self.run_benchmarks(options)
+
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "volumes": {key: options[key] for key in ("contacts", "informations", "events", "activities", "items")},
+            "repeat": options["repeat"],
+            "results": results,
+        }
+        if options["report"]:
+            with open(options["report"], "w") as f:
+                json.dump(report, f, indent=2)
+
+        failed = [result for result in results if not result["passed"]]
+        for result in results:
+            style = self.style.SUCCESS if result["passed"] else self.style.ERROR
+            if result["error"]:
+                self.stdout.write(style(f"{result['url_name']:<32} {result['error']}"))
+                continue
+            self.stdout.write(style(
+                f"{result['url_name']:<32} {result['status']:>5} {result['queries']:>5}q "
+                f"{result['ms']:>9}ms {result['bytes']:>9}B"
+            ))
+        if failed:
+            raise CommandError(f"{len(failed)} of {len(results)} views exceeded their budget or failed")
+
+    def seed(self, options):
+        user = get_user_model().objects.create_user(username="bench", password="bench", is_staff=True)
+        contact_pks = seed_contacts(user, options["contacts"], informations_per_contact=options["informations"])
+        trip_pks = seed_trips(user, 1, options["events"], options["activities"])
+        list_pks = seed_shopping_lists(user, 1, options["items"], seed_items(user, options["items"]))
+        bucket_pks = seed_buckets(user, 1, options["contacts"], {"contacts": contact_pks, "trips": trip_pks, "shopping_lists": list_pks})
+        url_kwargs = {
+            "contact_pk": contact_pks[0] if contact_pks else None,
+            "trip_pk": trip_pks[0],
+            "bucket_pk": bucket_pks[0],
+            "day": Event.objects.filter(trip=trip_pks[0]).values_list("date_start", flat=True).first().isoformat(),
+        }
+        return user, url_kwargs
+
+    def run_benchmarks(self, options):
+        user, url_kwargs = self.seed(options)
+        client = Client()
+        client.force_login(user)
+        results = []
+        for url_name, route, pattern in iter_url_patterns(get_resolver().url_patterns):
+            if pattern.callback.__module__.split(".")[0] not in BENCHMARKED_APPS or url_name in SKIPPED_URL_NAMES:
+                continue
+            budget = request_budget(url_name)
+            kwargs = {key: url_kwargs.get(key) for key in pattern.pattern.converters}
+            results.append(self.measure(client, url_name, reverse(url_name, kwargs=kwargs), budget, options["repeat"]))
+        return results
+
+    def measure(self, client, url_name, path, budget, repeat):
+        result = {
+            "url_name": url_name, "path": path, "budget": budget,
+            "status": None, "queries": None, "ms": None, "bytes": None, "error": None,
+        }
+        timings, query_counts = [], []
+        try:
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = client.get(path)
+                    content = b"".join(response) if response.streaming else response.content
+                    timings.append((time.perf_counter() - start) * 1000)
+                query_counts.append(len(queries))
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            result["passed"] = False
+            return result
+
+        result["status"] = response.status_code
+        if response.status_code == 405:
+            # POST-only actions
+            result["error"] = "skipped, doesn't accept GET"
+            result["passed"] = True
+            return result
+        # the first run fills the tiered and fragment caches, so the budget holds for the most queries of any run
+        result["queries"] = max(query_counts)
+        result["warm_queries"] = query_counts[-1]
+        result["ms"] = round(statistics.median(timings), 2)
+        result["bytes"] = len(content)
+        result["passed"] = (
+            response.status_code < 400
+            and result["queries"] <= budget["queries"]
+            and result["ms"] <= budget["ms"]
+        )
+        return result
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from _global import tag_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the unified tag index with the through-tables of the taggable models. "
+        "Fails if they differ, unless --fix repairs the index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Add missing and delete stale index entries")
+
+    def handle(self, *args, **options):
+        report = tag_index.check(fix=options["fix"])
+        for label, (missing, stale) in report.items():
+            style = self.style.WARNING if missing or stale else str
+            self.stdout.write(style(f"{label}: {missing} missing, {stale} stale"))
+
+        drift = sum(missing + stale for missing, stale in report.values())
+        if drift and options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {drift} entries"))
+        elif drift:
+            raise CommandError(f"The tag index is out of sync ({drift} entries), run with --fix or backfill_tag_index")
+        else:
+            self.stdout.write(self.style.SUCCESS("The tag index is consistent"))
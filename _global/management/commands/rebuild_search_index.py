@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from _global import search
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index from the searchable models (after bulk imports or seeding)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only rebuild the objects of this username")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT")
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            user = get_user_model().objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"No user {options['user']!r}")
+        indexed = search.rebuild(user, options["batch_size"])
+        search.optimize()
+        for kind, count in indexed.items():
+            self.stdout.write(f"{kind}: {count} indexed")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {sum(indexed.values())} objects"))
@@ -0,0 +1,53 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from _global.seeding import DEFAULT_VOLUMES, seed_users, seed_user_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the database with synthetic users and realistic data for every model. "
+        "Volumes are per user; everything is written with batched bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10, help="Number of users to create")
+        parser.add_argument("--prefix", default="seed", help="Username prefix for the created users")
+        parser.add_argument("--scale", type=float, default=1.0, help="Multiplies every per-user volume")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT and transaction")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed, for reproducible datasets")
+        parser.add_argument("--fast", action="store_true", help="Relax SQLite durability (synchronous=OFF, WAL journal) while loading")
+        for key, value in DEFAULT_VOLUMES.items():
+            parser.add_argument(f"--{key.replace('_', '-')}", type=int, default=value, dest=key)
+
+    def handle(self, *args, **options):
+        volumes = {key: int(options[key] * options["scale"]) for key in DEFAULT_VOLUMES}
+        # ratios per parent don't scale
+        for key in ("tags_per_object", "informations", "activities", "trip_resources"):
+            volumes[key] = options[key]
+        rng = random.Random(options["seed"])
+
+        journal_mode = None
+        if options["fast"] and connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA synchronous = OFF")
+                # the journal mode is stored in the database file, so it's restored below
+                cursor.execute("PRAGMA journal_mode")
+                journal_mode = cursor.fetchone()[0]
+                cursor.execute("PRAGMA journal_mode = WAL")
+
+        start = time.perf_counter()
+        try:
+            users = seed_users(options["users"], options["prefix"], options["batch_size"])
+            for i, user in enumerate(users, start=1):
+                seed_user_data(user, volumes, rng, options["batch_size"])
+                self.stdout.write(f"[{i}/{len(users)}] {user.username} seeded ({time.perf_counter() - start:.1f}s)")
+        finally:
+            if journal_mode is not None:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded {len(users)} users in {time.perf_counter() - start:.1f}s"))
@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from _global.template_cache import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Compiles every template of the project and the installed apps. The WSGI application does the same "
+        "at startup when TEMPLATE_WARMUP is set; run this in CI or deploy scripts to catch broken templates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--strict", action="store_true", help="Fail if one of the project's own templates doesn't compile")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        compiled, failures = warm_templates()
+        self.stdout.write(f"Compiled {compiled} templates in {(time.perf_counter() - start) * 1000:.1f}ms")
+        base_dir = str(settings.BASE_DIR)
+        own_failures = [name for name, path, _ in failures if path.startswith(base_dir) and "site-packages" not in path]
+        for name, path, error in failures:
+            style = self.style.ERROR if name in own_failures else self.style.WARNING
+            self.stdout.write(style(f"  {name}: {error.splitlines()[0]}"))
+        if own_failures and options["strict"]:
+            raise CommandError(f"{len(own_failures)} project templates don't compile: {', '.join(own_failures)}")
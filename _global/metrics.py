@@ -0,0 +1,262 @@
+"""
+In-process request metrics rendered in the Prometheus text format.
+Every worker keeps its own counters and histograms and, when METRICS_DIR is set, periodically
+writes a snapshot to `<METRICS_DIR>/<pid>.json`. The /metrics endpoint sums the snapshots of all workers.
+When a worker exits, or once a killed worker's snapshot is a few flush intervals old, its snapshot is
+folded into `retired.json`, which is summed too, so counters never go down when workers come and go.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import fcntl
+    import resource
+except ImportError:  # Windows
+    fcntl = resource = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+DEFAULT_BUDGET = {"queries": 10, "ms": 500}
+# flush intervals after which the snapshot of a worker that no longer runs is retired
+STALE_FLUSH_INTERVALS = 3
+RETIRED_SNAPSHOT = "retired.json"
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+
+def request_budget(url_name):
+    """The PERFORMANCE_BUDGETS entry of `url_name` over the "default" one, as {"queries": ..., "ms": ...}."""
+    budgets = getattr(settings, "PERFORMANCE_BUDGETS", {})
+    return {**DEFAULT_BUDGET, **budgets.get("default", {}), **budgets.get(url_name, {})}
+
+
+def rss_bytes():
+    """Current resident set size of this process, falling back to the peak where /proc is missing."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return 0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def process_exists(pid):
+    if os.name != "posix":
+        # os.kill() would terminate the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.last_flush = 0.0
+
+    def inc(self, name, labels, value=1):
+        key = f"{name}{{{labels}}}"
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value, buckets):
+        key = f"{name}{{{labels}}}"
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = {"buckets": list(buckets), "counts": [0] * len(buckets), "sum": 0, "count": 0}
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                histogram["counts"][i] += 1
+                break
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+    def record_request(self, url_name, status, metrics):
+        url_labels = _labels(url_name=url_name or "unresolved")
+        with self.lock:
+            self.inc("dokdash_requests_total", _labels(url_name=url_name or "unresolved", status=status))
+            self.observe("dokdash_request_duration_seconds", url_labels, metrics.total, LATENCY_BUCKETS)
+            self.observe("dokdash_request_db_queries", url_labels, metrics.db_queries, QUERY_BUCKETS)
+            self.inc("dokdash_request_db_seconds_total", url_labels, metrics.db_time)
+            for alias, (hits, misses) in metrics.cache_stats.items():
+                self.inc("dokdash_cache_hits_total", _labels(cache=alias), hits)
+                self.inc("dokdash_cache_misses_total", _labels(cache=alias), misses)
+        self.maybe_flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "pid": os.getpid(),
+                "rss_bytes": rss_bytes(),
+                "counters": dict(self.counters),
+                "histograms": {key: {**value, "counts": list(value["counts"])} for key, value in self.histograms.items()},
+            }
+
+    def maybe_flush(self):
+        directory = getattr(settings, "METRICS_DIR", None)
+        interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 5)
+        now = time.monotonic()
+        if not directory or now - self.last_flush < interval:
+            return
+        self.last_flush = now
+        self.flush(Path(directory))
+
+    def flush(self, directory):
+        directory.mkdir(parents=True, exist_ok=True)
+        write_snapshot(directory / f"{os.getpid()}.json", self.snapshot())
+
+    def retire_snapshot(self):
+        """Folds the final counts of this process into the retired ones."""
+        directory = getattr(settings, "METRICS_DIR", None)
+        if not directory or not (self.counters or self.histograms):
+            return
+        directory = Path(directory)
+        self.flush(directory)
+        with locked(directory):
+            retire(directory, directory / f"{os.getpid()}.json")
+
+
+def read_snapshot(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def write_snapshot(path, snapshot):
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(snapshot))
+    # atomic, so readers never see a half-written snapshot
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def locked(directory):
+    """Serializes retiring snapshots and reading them between processes (best effort without fcntl)."""
+    with open(directory / "metrics.lock", "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def retire(directory, path):
+    """Adds the snapshot at `path` to the retired one and removes it; the directory must be locked."""
+    snapshot = read_snapshot(path)
+    if snapshot is not None:
+        retired = read_snapshot(directory / RETIRED_SNAPSHOT) or {"counters": {}, "histograms": {}}
+        counters, histograms = merge([retired, snapshot])
+        write_snapshot(directory / RETIRED_SNAPSHOT, {"pid": None, "rss_bytes": 0, "counters": counters, "histograms": histograms})
+    path.unlink(missing_ok=True)
+
+
+registry = MetricsRegistry()
+# forked workers inherit this and retire their own snapshot, as os.getpid() is read at exit
+atexit.register(registry.retire_snapshot)
+
+
+def is_stale(path, now):
+    """Whether the snapshot at `path` belongs to a worker that is gone and stopped flushing a while ago."""
+    interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 5)
+    try:
+        # idle workers don't flush, so age alone doesn't mean the worker is gone
+        return now - path.stat().st_mtime > interval * STALE_FLUSH_INTERVALS and not process_exists(int(path.stem))
+    except (OSError, ValueError):
+        return False
+
+
+def collect_snapshots():
+    """
+    Snapshots of all workers: the live one of this process, the files of the others and the retired counts
+    of exited workers, retiring stale snapshots first.
+    """
+    snapshots = [registry.snapshot()]
+    directory = getattr(settings, "METRICS_DIR", None)
+    if not directory or not Path(directory).is_dir():
+        return snapshots
+    directory = Path(directory)
+    now = time.time()
+    with locked(directory):
+        for path in directory.glob("*.json"):
+            if path.name != RETIRED_SNAPSHOT and is_stale(path, now):
+                retire(directory, path)
+        for path in directory.glob("*.json"):
+            if path.stem == str(os.getpid()):
+                continue
+            snapshot = read_snapshot(path)
+            if snapshot is not None:
+                snapshots.append(snapshot)
+    return snapshots
+
+
+def merge(snapshots):
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for key, value in snapshot["counters"].items():
+            counters[key] = counters.get(key, 0) + value
+        for key, value in snapshot["histograms"].items():
+            merged = histograms.setdefault(key, {"buckets": value["buckets"], "counts": [0] * len(value["counts"]), "sum": 0, "count": 0})
+            merged["counts"] = [a + b for a, b in zip(merged["counts"], value["counts"])]
+            merged["sum"] += value["sum"]
+            merged["count"] += value["count"]
+    return counters, histograms
+
+
+def render_prometheus():
+    snapshots = collect_snapshots()
+    counters, histograms = merge(snapshots)
+    lines = []
+
+    seen = set()
+    for key in sorted(counters):
+        name = key.split("{", 1)[0]
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{key} {counters[key]}")
+
+    for key in sorted(histograms):
+        name, labels = key.split("{", 1)
+        labels = labels.rstrip("}")
+        histogram = histograms[key]
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, count in zip(histogram["buckets"], histogram["counts"]):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram['sum']}")
+        lines.append(f"{name}_count{{{labels}}} {histogram['count']}")
+
+    lines.append("# TYPE dokdash_cache_hit_ratio gauge")
+    # configured caches plus the in-process "l1" tier
+    aliases = [*settings.CACHES, "l1"]
+    for alias in aliases:
+        hits = counters.get(f"dokdash_cache_hits_total{{{_labels(cache=alias)}}}", 0)
+        misses = counters.get(f"dokdash_cache_misses_total{{{_labels(cache=alias)}}}", 0)
+        ratio = hits / (hits + misses) if hits + misses else 0
+        lines.append(f"dokdash_cache_hit_ratio{{{_labels(cache=alias)}}} {ratio:.4f}")
+
+    lines.append("# TYPE dokdash_process_resident_memory_bytes gauge")
+    for snapshot in snapshots:
+        if snapshot["pid"] is None:
+            # the retired counts
+            continue
+        lines.append(f"dokdash_process_resident_memory_bytes{{{_labels(pid=snapshot['pid'])}}} {snapshot['rss_bytes']}")
+    return "\n".join(lines) + "\n"
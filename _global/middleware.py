@@ -0,0 +1,220 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.http import FileResponse
+from django.template.backends.django import Template as DjangoTemplate
+
+from .metrics import registry, request_budget
+
+logger = logging.getLogger(__name__)
+
+# Metrics of the request currently being handled, read by the ORM, template and cache hooks
+current_metrics = ContextVar("current_metrics", default=None)
+
+
+class RequestMetrics:
+    """Counters collected while handling a single request."""
+
+    def __init__(self, request):
+        self.request = request
+        self.total = 0.0
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_stats = {}  # alias: [hits, misses]
+
+    @property
+    def cache_hits(self):
+        return sum(hits for hits, _ in self.cache_stats.values())
+
+    @property
+    def cache_misses(self):
+        return sum(misses for _, misses in self.cache_stats.values())
+
+    def count_cache(self, alias, hits, misses):
+        stats = self.cache_stats.setdefault(alias, [0, 0])
+        stats[0] += hits
+        stats[1] += misses
+
+    def as_server_timing(self):
+        return ", ".join([
+            f"total;dur={self.total * 1000:.1f}",
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+            f"template;dur={self.template_time * 1000:.1f}",
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+        ])
+
+    def as_dict(self):
+        return {
+            "total_ms": round(self.total * 1000, 2),
+            "db_ms": round(self.db_time * 1000, 2),
+            "db_queries": self.db_queries,
+            "template_ms": round(self.template_time * 1000, 2),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+def _query_timer(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - start
+        metrics.db_queries += 1
+
+
+def _timed_template_render(render):
+    def wrapper(self, context=None, request=None):
+        metrics = current_metrics.get()
+        # Nested render_to_string() calls are already part of the outer render
+        if metrics is None or metrics.template_depth:
+            return render(self, context, request)
+        metrics.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+            metrics.template_depth -= 1
+    wrapper._is_timed = True
+    return wrapper
+
+
+def _counted_cache_get(get, alias):
+    missing = object()
+
+    def wrapper(key, default=None, **kwargs):
+        value = get(key, missing, **kwargs)
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.count_cache(alias, 0 if value is missing else 1, 1 if value is missing else 0)
+        return default if value is missing else value
+    return wrapper
+
+
+def _counted_cache_get_many(get_many, alias):
+    def wrapper(keys, **kwargs):
+        keys = list(keys)
+        values = get_many(keys, **kwargs)
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.count_cache(alias, len(values), len(keys) - len(values))
+        return values
+    return wrapper
+
+
+def instrument_caches():
+    """Counts hits and misses on every configured cache (cache instances are per thread)."""
+    for alias in settings.CACHES:
+        cache = caches[alias]
+        if getattr(cache, "_is_counted", False):
+            continue
+        cache.get = _counted_cache_get(cache.get, alias)
+        cache.get_many = _counted_cache_get_many(cache.get_many, alias)
+        cache._is_counted = True
+
+
+@contextmanager
+def measuring(metrics):
+    """Adds the time, queries, templates and cache lookups of the block to `metrics`."""
+    token = current_metrics.set(metrics)
+    start = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_query_timer))
+            yield
+    finally:
+        metrics.total += time.perf_counter() - start
+        current_metrics.reset(token)
+
+
+class MeasuredStream:
+    """
+    Streaming content that adds the work of producing each chunk (not the time the client takes to read it)
+    to `metrics`, and calls `finish` once the content is exhausted or closed.
+    """
+
+    def __init__(self, content, metrics, finish):
+        self.iterator = iter(content)
+        self.metrics = metrics
+        self.finish = finish
+        self.finished = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with measuring(self.metrics):
+            chunk = next(self.iterator, None)
+        if chunk is None:
+            self.close()
+            raise StopIteration
+        return chunk
+
+    def close(self):
+        # the response closes its content whether or not it was read to the end
+        if not self.finished:
+            self.finished = True
+            self.finish()
+
+
+class ServerTimingMiddleware:
+    """
+    Measures total time, template render time, ORM query count/time and cache hits/misses per request.
+    The numbers are exposed as a Server-Timing header, added to the /metrics registry
+    and logged as one JSON line (sampled with PERFORMANCE_LOG_SAMPLE_RATE, always when over budget).
+    A streaming response is measured until its content is exhausted or closed; it gets no header, as its
+    numbers are only known after the headers are sent.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PERFORMANCE_LOG_SAMPLE_RATE", 0.01)
+        if not getattr(DjangoTemplate.render, "_is_timed", False):
+            DjangoTemplate.render = _timed_template_render(DjangoTemplate.render)
+
+    def __call__(self, request):
+        instrument_caches()
+        metrics = RequestMetrics(request)
+        request.performance_metrics = metrics
+        with measuring(metrics):
+            response = self.get_response(request)
+
+        # files are left to wsgi.file_wrapper
+        if response.streaming and not response.is_async and not isinstance(response, FileResponse):
+            response.streaming_content = MeasuredStream(
+                response.streaming_content, metrics, lambda: self.finish(request, response, metrics),
+            )
+            return response
+        response["Server-Timing"] = metrics.as_server_timing()
+        self.finish(request, response, metrics)
+        return response
+
+    def finish(self, request, response, metrics):
+        resolver_match = request.resolver_match
+        url_name = resolver_match.url_name if resolver_match else None
+        registry.record_request(url_name, response.status_code, metrics)
+        budget = request_budget(url_name)
+        over_budget = metrics.db_queries > budget["queries"] or metrics.total * 1000 > budget["ms"]
+        if over_budget or random.random() < self.sample_rate:
+            logger.log(logging.WARNING if over_budget else logging.INFO, json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "url_name": url_name,
+                "status": response.status_code,
+                "over_budget": over_budget,
+                **metrics.as_dict(),
+            }))
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:48
+
+import _global.uuids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('_global', '0002_tag_tag_owner_name_idx'),
+    ]
+
+    # The primary key default only lives in Python, so existing rows and the schema stay untouched
+    # (a plain AlterField would make SQLite rebuild every table).
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='tag',
+                    name='id',
+                    field=models.UUIDField(default=_global.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
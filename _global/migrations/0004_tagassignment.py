@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:06
+
+import _global.uuids
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('_global', '0003_alter_tag_id'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagAssignment',
+            fields=[
+                ('id', models.UUIDField(default=_global.uuids.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('object_id', models.UUIDField()),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='_global.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['content_type', 'object_id'], name='tagassignment_object_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tag', 'content_type', 'object_id'), name='tagassignment_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('_global', '0004_tagassignment'),
+    ]
+
+    operations = [
+        # the index is filled by the `rebuild_search_index` command, see _global/search.py
+        migrations.RunSQL(
+            sql=(
+                "CREATE VIRTUAL TABLE _global_search USING fts5("
+                "title, body, owner, object, kind, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+                ")"
+            ),
+            reverse_sql="DROP TABLE _global_search",
+        ),
+    ]
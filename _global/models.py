@@ -1,13 +1,54 @@
 from django.db import models
-import uuid
+from .uuids import uuid7
 from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
 
 class Tag(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="tags_created")
     created_at = models.DateTimeField(auto_now_add=True)
     
     name = models.CharField(max_length=255)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_by", "name"], name="tag_owner_name_idx"),
+        ]
+    
     def __str__(self):
         return str(self.name)
+
+class TagAssignmentQuerySet(models.QuerySet):
+    def with_tags(self, *tags):
+        """(content_type_id, object_id) of the objects carrying all of `tags` (tags or pks)."""
+        tag_pks = {getattr(tag, "pk", tag) for tag in tags}
+        return self.filter(tag__in=tag_pks).values("content_type_id", "object_id").annotate(
+            matched=models.Count("tag"),
+        ).filter(matched=len(tag_pks)).order_by()
+
+    def usage_counts(self):
+        """{tag_pk: number of tagged objects} over all taggable models."""
+        return dict(self.values_list("tag").annotate(count=models.Count("id")).order_by())
+
+class TagAssignment(models.Model):
+    """
+    One row per (tag, tagged object) across every model with a ManyToManyField to Tag.
+    Denormalized from those through-tables by _global.tag_index, so "everything tagged X" is a single indexed query.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name="assignments")
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name="+")
+    object_id = models.UUIDField()
+    
+    objects = TagAssignmentQuerySet.as_manager()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tag", "content_type", "object_id"], name="tagassignment_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["content_type", "object_id"], name="tagassignment_object_idx"),
+        ]
+    
+    def __str__(self):
+        return f"{self.tag}: {self.content_type.model} {self.object_id}"
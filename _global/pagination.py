@@ -0,0 +1,114 @@
+"""
+Keyset (cursor) pagination for list views.
+
+Pages are selected with `WHERE (field, id) > (last_field, last_id)` instead of OFFSET, so a deep page
+costs the same as the first one as long as an index covers the filter + ordering
+(e.g. `created_by, name`). Cursors are opaque tokens, signed per list (the `scope`), so a cursor of one
+list is rejected by another.
+"""
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+CURSOR_SALT = "_global.pagination"
+
+
+def keyset_after(field_name, value, pk, descending):
+    """Q for the rows after (value, pk) in the `field_name`, pk ordering."""
+    # The leading `field >= value` gives the database a plain range bound on the index
+    if descending:
+        return Q(**{f"{field_name}__lte": value}) & (Q(**{f"{field_name}__lt": value}) | Q(pk__lt=pk))
+    return Q(**{f"{field_name}__gte": value}) & (Q(**{f"{field_name}__gt": value}) | Q(pk__gt=pk))
+
+
+def encode_cursor(field, obj, direction, scope):
+    """The signed cursor of `obj` in the `field`, pk ordering; `direction` is "next" or "prev"."""
+    return signing.dumps(
+        [direction, field.value_to_string(obj), str(obj.pk)], salt=f"{CURSOR_SALT}:{scope}", compress=True,
+    )
+
+
+def decode_cursor(cursor, field, pk_field, scope):
+    """Returns (direction, value, pk) or None for a missing, tampered, malformed or foreign cursor."""
+    if not cursor:
+        return None
+    try:
+        direction, value, pk = signing.loads(cursor, salt=f"{CURSOR_SALT}:{scope}")
+        return direction, field.to_python(value), pk_field.to_python(pk)
+    except (signing.BadSignature, ValidationError, ValueError, TypeError):
+        return None
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginates `queryset` by `ordering` (a non-nullable field, prefixed with "-" for descending)
+    with the primary key as tie-breaker.
+    """
+
+    def __init__(self, queryset, ordering="-created_at", per_page=50):
+        self.queryset = queryset
+        self.descending = ordering.startswith("-")
+        self.field_name = ordering.lstrip("-")
+        self.field = queryset.model._meta.get_field(self.field_name)
+        self.pk_field = queryset.model._meta.pk
+        self.per_page = per_page
+        self.scope = f"{queryset.model._meta.label}:{ordering}"
+
+    def encode_cursor(self, obj, direction):
+        return encode_cursor(self.field, obj, direction, self.scope)
+
+    def decode_cursor(self, cursor):
+        return decode_cursor(cursor, self.field, self.pk_field, self.scope)
+
+    def page(self, cursor=None):
+        """Returns the page after (or, for a "prev" cursor, before) the cursor; the first page without one."""
+        decoded = self.decode_cursor(cursor)
+        backwards = decoded is not None and decoded[0] == "prev"
+        # walking backwards means reading the reversed ordering and flipping the result
+        descending = self.descending != backwards
+        prefix = "-" if descending else ""
+
+        queryset = self.queryset.order_by(f"{prefix}{self.field_name}", f"{prefix}pk")
+        if decoded is not None:
+            queryset = queryset.filter(keyset_after(self.field_name, decoded[1], decoded[2], descending))
+        objects = list(queryset[:self.per_page + 1])
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if backwards:
+            objects.reverse()
+        if not objects:
+            return KeysetPage(objects)
+
+        has_next = has_more if not backwards else True
+        has_previous = decoded is not None if not backwards else has_more
+        return KeysetPage(
+            objects,
+            next_cursor=self.encode_cursor(objects[-1], "next") if has_next else None,
+            previous_cursor=self.encode_cursor(objects[0], "prev") if has_previous else None,
+        )
+
+
+def paginate_keyset(request, queryset, ordering="-created_at", per_page=50):
+    """Returns the KeysetPage for the `cursor` GET parameter of `request`."""
+    return KeysetPaginator(queryset, ordering, per_page).page(request.GET.get("cursor"))
@@ -0,0 +1,214 @@
+"""
+Full-text search over contacts, documents, tasks and recipes, backed by an SQLite FTS5 table.
+
+Every searchable object is one row of `_global_search` (title, body, owner, object, kind). The owner,
+object and kind are stored as tokens, so scoping a search to a user, removing an object and filtering
+by type are index lookups of the same MATCH instead of scans. Ranking is bm25 with the title weighted
+over the body; every term of a query matches as a prefix (`hik` finds "hiking").
+
+The index follows post_save/post_delete of the searchable models (and of contact informations, which
+are part of their contact's body). Writes that bypass signals (bulk_create, QuerySet.update(), raw SQL)
+need `index_objects()` or the `rebuild_search_index` command.
+"""
+import re
+import uuid
+from collections import namedtuple
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .utils import batched
+
+TABLE = "_global_search"
+# weights of title, body, owner, object, kind: only the first two count. Passed as the table's `rank`,
+# so FTS5 sorts by it internally and only computes snippets for the rows that are returned
+RANK = "bm25(10.0, 1.0, 0.0, 0.0, 0.0)"
+# control characters the snippets are marked with, so the text can be escaped before the <mark>s go in
+MARK_START, MARK_END = "\x02", "\x03"
+TERM_RE = re.compile(r"\w+")
+
+
+class SearchType(namedtuple("SearchType", "kind model_label body_fields related url_name url_kwarg")):
+    """
+    A searchable model; `related` is (relation, field) of related rows appended to the body,
+    `url_name`/`url_kwarg` the detail view of a hit, if there is one.
+    """
+
+    __slots__ = ()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+
+SEARCH_TYPES = [
+    SearchType("contacts", "_contacts.Contact", ("description",), ("contact_informations", "content"), "contact_read", "contact_pk"),
+    SearchType("documents", "_buckets.Document", ("description", "content"), None, None, None),
+    SearchType("tasks", "_tasks.Task", ("description",), None, None, None),
+    SearchType("recipes", "_shopping.Recipe", ("content",), None, None, None),
+]
+SEARCH_TYPES_BY_KIND = {search_type.kind: search_type for search_type in SEARCH_TYPES}
+
+SearchHit = namedtuple("SearchHit", "kind id title snippet rank url")
+
+
+def _owner_token(user_id):
+    return f"u{user_id}"
+
+
+# --- INDEXING ---
+
+def _rows(search_type, objects):
+    """(title, body, owner, object, kind) per object; related rows must be prefetched or are queried per object."""
+    for obj in objects:
+        parts = [getattr(obj, field) for field in search_type.body_fields]
+        if search_type.related:
+            relation, field = search_type.related
+            parts += [getattr(related, field) for related in getattr(obj, relation).all()]
+        body = "\n".join(part for part in parts if part)
+        yield obj.name, body, _owner_token(obj.created_by_id), obj.pk.hex, search_type.kind
+
+
+def _queryset(search_type, queryset=None):
+    queryset = search_type.model.objects.all() if queryset is None else queryset
+    queryset = queryset.only("pk", "created_by_id", "name", *search_type.body_fields).order_by()
+    if search_type.related:
+        queryset = queryset.prefetch_related(search_type.related[0])
+    return queryset
+
+
+def _insert(rows, batch_size):
+    inserted = 0
+    with connection.cursor() as cursor:
+        for batch in batched(rows, batch_size):
+            cursor.executemany(f"INSERT INTO {TABLE} (title, body, owner, object, kind) VALUES (%s, %s, %s, %s, %s)", batch)
+            inserted += len(batch)
+    return inserted
+
+
+def remove_objects(pks, batch_size=200):
+    """Drops the index rows of the objects with these primary keys (of any type)."""
+    with connection.cursor() as cursor:
+        for batch in batched((pk.hex for pk in pks), batch_size):
+            match = "object : (" + " OR ".join(f'"{pk_hex}"' for pk_hex in batch) + ")"
+            cursor.execute(f"DELETE FROM {TABLE} WHERE {TABLE} MATCH %s", [match])
+
+
+def index_objects(kind, queryset, batch_size=1000):
+    """(Re-)indexes the objects of `queryset` (of the model of `kind`); returns the number of rows written."""
+    search_type = SEARCH_TYPES_BY_KIND[kind]
+    queryset = _queryset(search_type, queryset)
+    written = 0
+    with transaction.atomic():
+        for batch in batched(queryset.iterator(chunk_size=batch_size), batch_size):
+            remove_objects([obj.pk for obj in batch])
+            written += _insert(_rows(search_type, batch), batch_size)
+    return written
+
+
+def rebuild(user=None, batch_size=5000):
+    """Rebuilds the index (of `user` only, if given); returns {kind: rows indexed}."""
+    indexed = {}
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            if user is None:
+                cursor.execute(f"DELETE FROM {TABLE}")
+            else:
+                cursor.execute(f"DELETE FROM {TABLE} WHERE {TABLE} MATCH %s", [f'owner : "{_owner_token(user.pk)}"'])
+        for search_type in SEARCH_TYPES:
+            queryset = search_type.model.objects.all() if user is None else search_type.model.objects.filter(created_by=user)
+            objects = _queryset(search_type, queryset).iterator(chunk_size=batch_size)
+            indexed[search_type.kind] = _insert(_rows(search_type, objects), batch_size)
+    return indexed
+
+
+def optimize():
+    """Merges the index segments; worth running after a rebuild or large imports."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+
+
+# --- SIGNALS ---
+
+def object_saved(sender, instance, **kwargs):
+    search_type = next(search_type for search_type in SEARCH_TYPES if search_type.model is sender)
+    remove_objects([instance.pk])
+    # a single object: its related rows are queried by _rows()
+    _insert(_rows(search_type, [instance]), 1)
+
+
+def object_deleted(sender, instance, **kwargs):
+    remove_objects([instance.pk])
+
+
+def _relation(search_type):
+    """The reverse relation whose rows are part of the body (e.g. Contact.contact_informations)."""
+    return search_type.model._meta.get_field(search_type.related[0])
+
+
+def related_changed(sender, instance, **kwargs):
+    for search_type in SEARCH_TYPES:
+        if search_type.related and _relation(search_type).related_model is sender:
+            parent_pk = getattr(instance, _relation(search_type).field.attname)
+            index_objects(search_type.kind, search_type.model.objects.filter(pk=parent_pk))
+
+
+def setup():
+    for search_type in SEARCH_TYPES:
+        uid = f"_global.search.{search_type.kind}"
+        post_save.connect(object_saved, sender=search_type.model, dispatch_uid=uid)
+        post_delete.connect(object_deleted, sender=search_type.model, dispatch_uid=uid)
+        if search_type.related:
+            related_model = _relation(search_type).related_model
+            post_save.connect(related_changed, sender=related_model, dispatch_uid=f"{uid}.related")
+            post_delete.connect(related_changed, sender=related_model, dispatch_uid=f"{uid}.related")
+
+
+# --- SEARCH ---
+
+def match_expression(user_id, query, kinds=None):
+    """The MATCH string for `query` (every word as a prefix) within the user's objects, or None without words."""
+    terms = TERM_RE.findall(query)
+    if not terms:
+        return None
+    parts = [f'owner : "{_owner_token(user_id)}"']
+    if kinds:
+        parts.append("kind : (" + " OR ".join(f'"{kind}"' for kind in kinds) + ")")
+    # quoted, so words like AND/NOT/NEAR are plain terms; scoped to the text columns, so they can't match
+    # the owner/object/kind tokens
+    parts.append("{title body} : (" + " AND ".join(f'"{term}"*' for term in terms) + ")")
+    return " AND ".join(parts)
+
+
+def _marked(text):
+    return mark_safe(escape(text).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>"))
+
+
+def _url(search_type, pk):
+    if search_type.url_name is None:
+        return None
+    return reverse(search_type.url_name, kwargs={search_type.url_kwarg: pk})
+
+
+def search(user, query, kinds=None, limit=20):
+    """The user's best `limit` SearchHits for `query`, optionally of the given kinds only."""
+    kinds = [kind for kind in kinds or () if kind in SEARCH_TYPES_BY_KIND]
+    match = match_expression(user.pk, query, kinds)
+    if match is None:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT kind, object, highlight({TABLE}, 0, %s, %s), snippet({TABLE}, 1, %s, %s, '…', 16), rank "
+            f"FROM {TABLE} WHERE {TABLE} MATCH %s AND rank MATCH %s ORDER BY rank LIMIT %s",
+            [MARK_START, MARK_END, MARK_START, MARK_END, match, RANK, limit],
+        )
+        rows = cursor.fetchall()
+    hits = []
+    for kind, object_hex, title, snippet, rank in rows:
+        pk = uuid.UUID(object_hex)
+        hits.append(SearchHit(kind, pk, _marked(title), _marked(snippet), rank, _url(SEARCH_TYPES_BY_KIND[kind], pk)))
+    return hits
@@ -0,0 +1,338 @@
+"""
+Helpers to fill the database with realistic per-user data volumes.
+Rows are generated lazily and written with bulk_create in batches (one transaction per batch),
+so memory stays bounded and tens of millions of rows load in minutes.
+"""
+import random
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from _global import search
+from _global.models import Tag
+from _global.tag_index import index_pairs
+from _global.utils import batched
+from _contacts import duplicates
+from _contacts.models import Contact, ContactInformation
+from _buckets.models import Bucket, Document, File, Image, Link
+from _tasks.models import Task
+from _trips.models import Trip, Event, Activity, TripImage, TripFile, TripLink
+from _shopping.models import Item, StorageLocation, StorageLocationItem, ShoppingList, ShoppingListItem, Recipe
+
+FIRST_NAMES = [
+    "Anna", "Ben", "Clara", "David", "Elena", "Felix", "Greta", "Hannes", "Ida", "Jonas",
+    "Katrin", "Lukas", "Marie", "Niklas", "Olga", "Paul", "Quirin", "Rosa", "Stefan", "Theresa",
+]
+LAST_NAMES = [
+    "Huber", "Bauer", "Wagner", "Müller", "Pichler", "Steiner", "Moser", "Mayer", "Hofer", "Leitner",
+    "Berger", "Fuchs", "Eder", "Fischer", "Schmid", "Winkler", "Weber", "Schwarz", "Maier", "Schneider",
+]
+WORDS = [
+    "coffee", "hiking", "books", "cats", "chess", "garden", "music", "travel", "cooking", "football",
+    "photography", "wine", "cycling", "movies", "painting", "yoga", "history", "sailing", "tea", "jazz",
+]
+PLACES = ["Vienna", "Graz", "Linz", "Salzburg", "Innsbruck", "Budapest", "Prague", "Bratislava", "Ljubljana", "Munich"]
+
+# Volumes per user (or per parent where noted) used by `manage.py seed_data`
+DEFAULT_VOLUMES = {
+    "tags": 50,
+    "tags_per_object": 2,
+    "contacts": 1000,
+    "informations": 3,  # per contact
+    "documents": 200,
+    "files": 200,
+    "images": 200,
+    "links": 200,
+    "tasks": 1000,
+    "items": 500,
+    "storage_locations": 10,
+    "storage_items": 500,
+    "shopping_lists": 20,
+    "list_items": 50,  # per shopping list and recipe
+    "recipes": 20,
+    "trips": 5,
+    "events": 50,  # per trip
+    "activities": 4,  # per event
+    "trip_resources": 1,  # images, files and links per event and activity
+    "buckets": 20,
+    "bucket_members": 25,  # per relation and bucket
+}
+
+
+def bulk_insert(model, objs, batch_size=1000, ignore_conflicts=False):
+    """Inserts `objs` (any iterable, consumed lazily) in batches and returns their primary keys."""
+    pks = []
+    for batch in batched(objs, batch_size):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=batch_size, ignore_conflicts=ignore_conflicts)
+        pks.extend(obj.pk for obj in batch)
+    return pks
+
+
+def bulk_link(model, field_name, pairs, batch_size=1000):
+    """Writes (source_pk, target_pk) pairs straight into the through-table of a ManyToManyField."""
+    field = model._meta.get_field(field_name)
+    through = field.remote_field.through
+    source = f"{field.m2m_field_name()}_id"
+    target = f"{field.m2m_reverse_field_name()}_id"
+    linked = 0
+    for batch in batched(pairs, batch_size):
+        rows = [through(**{source: source_pk, target: target_pk}) for source_pk, target_pk in batch]
+        linked += len(bulk_insert(through, rows, batch_size, ignore_conflicts=True))
+        # bulk inserts send no m2m_changed, so the tag index is filled here
+        if field.related_model is Tag:
+            index_pairs(model, batch, batch_size)
+    return linked
+
+
+def _sentence(rng, words=8):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _sample(rng, pks, count):
+    return rng.sample(pks, min(count, len(pks)))
+
+
+def _tag_pairs(rng, pks, tag_pks, per_object):
+    return ((pk, tag_pk) for pk in pks for tag_pk in _sample(rng, tag_pks, per_object))
+
+
+def seed_users(count, prefix="seed", batch_size=1000):
+    """Creates `count` users with unusable passwords and returns them."""
+    User = get_user_model()
+    offset = User.objects.filter(username__startswith=prefix).count()
+    password = make_password(None)
+    users = [User(username=f"{prefix}{offset + i}", password=password) for i in range(count)]
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=batch_size)
+    # bulk_create doesn't set auto-increment pks on every backend
+    return list(User.objects.filter(username__in=[user.username for user in users]))
+
+
+def seed_tags(user, count, rng=None, batch_size=1000):
+    rng = rng or random.Random(0)
+    return bulk_insert(Tag, (Tag(created_by=user, name=f"{rng.choice(WORDS)}-{i}") for i in range(count)), batch_size)
+
+
+def seed_contacts(user, count, informations_per_contact=3, tag_pks=(), tags_per_object=0, rng=None, batch_size=1000):
+    """Creates `count` contacts for `user`, each with a few contact informations, and returns their pks."""
+    rng = rng or random.Random(0)
+    information_types = [choice for choice, _ in ContactInformation.INFORMATION_TYPES.choices]
+    contacts = (
+        Contact(
+            created_by=user,
+            name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            description=_sentence(rng),
+            birthday=date(1950, 1, 1) + timedelta(days=rng.randrange(365 * 60)),
+        )
+        for _ in range(count)
+    )
+    contact_pks = bulk_insert(Contact, contacts, batch_size)
+
+    informations = (
+        ContactInformation(
+            created_by=user,
+            contact_id=contact_pk,
+            information_type=rng.choice(information_types),
+            content=_sentence(rng, 12),
+        )
+        for contact_pk in contact_pks
+        for _ in range(informations_per_contact)
+    )
+    bulk_insert(ContactInformation, informations, batch_size)
+    bulk_link(Contact, "tags", _tag_pairs(rng, contact_pks, list(tag_pks), tags_per_object), batch_size)
+    # bulk inserts send no post_save, so the name trigrams are written here
+    duplicates.rebuild(user, batch_size)
+    return contact_pks
+
+
+def seed_bucket_resources(user, model, count, tag_pks=(), tags_per_object=0, rng=None, batch_size=1000):
+    """Creates documents, files, images or links for `user` and returns their pks."""
+    rng = rng or random.Random(0)
+    extra = {"description": _sentence(rng), "content": _sentence(rng, 40)} if model is Document else {}
+    objs = (model(created_by=user, name=f"{rng.choice(WORDS)} {i}".capitalize(), **extra) for i in range(count))
+    pks = bulk_insert(model, objs, batch_size)
+    if tags_per_object and any(field.name == "tags" for field in model._meta.many_to_many):
+        bulk_link(model, "tags", _tag_pairs(rng, pks, list(tag_pks), tags_per_object), batch_size)
+    return pks
+
+
+def seed_tasks(user, count, tag_pks=(), tags_per_object=0, rng=None, batch_size=1000):
+    rng = rng or random.Random(0)
+    statuses = [choice for choice, _ in Task.STATUSES.choices]
+    tasks = (
+        Task(
+            created_by=user,
+            name=f"{rng.choice(WORDS)} {i}".capitalize(),
+            description=_sentence(rng, 16),
+            priority=rng.randint(1, 10),
+            difficulty=rng.randint(1, 10),
+            status=rng.choice(statuses),
+        )
+        for i in range(count)
+    )
+    pks = bulk_insert(Task, tasks, batch_size)
+    bulk_link(Task, "tags", _tag_pairs(rng, pks, list(tag_pks), tags_per_object), batch_size)
+    return pks
+
+
+def _trip_resources(rng, model, count, **parent):
+    for i in range(count):
+        if model is TripImage:
+            yield TripImage(image=f"trip_images/seed-{i}.jpg", caption=rng.choice(PLACES), **parent)
+        elif model is TripFile:
+            yield TripFile(file=f"trip_files/seed-{i}.pdf", name=f"{rng.choice(WORDS)} ticket".capitalize(), **parent)
+        else:
+            yield TripLink(url=f"https://example.com/{rng.choice(WORDS)}", title=rng.choice(PLACES), **parent)
+
+
+def seed_trips(user, count, events, activities_per_event, resources=0, rng=None, batch_size=1000):
+    """Creates trips for `user` with events spread over consecutive days, each with activities and resources."""
+    rng = rng or random.Random(0)
+    activity_types = [choice for choice, _ in Activity.ACTIVITY_TYPES.choices]
+    trip_pks = bulk_insert(Trip, (
+        Trip(created_by=user, name=f"{rng.choice(PLACES)} {2020 + i % 6}") for i in range(count)
+    ), batch_size)
+    first_day = date(2025, 7, 1)
+
+    def make_events():
+        for trip_pk in trip_pks:
+            for i in range(events):
+                day = first_day + timedelta(days=i // 4)
+                hour = 8 + (i % 4) * 3
+                yield Event(
+                    trip_id=trip_pk,
+                    name=f"{rng.choice(PLACES)} {rng.choice(WORDS)}",
+                    date_start=day,
+                    time_start=time(hour, 0),
+                    date_end=day,
+                    time_end=time(hour + 2, 30),
+                    location=rng.choice(PLACES),
+                    extra_infos=_sentence(rng),
+                )
+
+    def make_activities(batch):
+        for event in batch:
+            for j in range(activities_per_event):
+                minute = j * 150 // activities_per_event
+                yield Activity(
+                    event_id=event.pk,
+                    activity_type=rng.choice(activity_types),
+                    name=f"{rng.choice(WORDS)} {j + 1}".capitalize(),
+                    date_start=event.date_start,
+                    time_start=time(event.time_start.hour + minute // 60, minute % 60),
+                    date_end=event.date_end,
+                    time_end=event.time_end,
+                    location_start=rng.choice(PLACES),
+                    location_end=rng.choice(PLACES),
+                )
+
+    for event_batch in batched(make_events(), batch_size):
+        bulk_insert(Event, event_batch, batch_size)
+        activity_pks = bulk_insert(Activity, make_activities(event_batch), batch_size)
+        for model in (TripImage, TripFile, TripLink):
+            bulk_insert(model, (
+                obj for event in event_batch for obj in _trip_resources(rng, model, resources, event_id=event.pk)
+            ), batch_size)
+            bulk_insert(model, (
+                obj for activity_pk in activity_pks for obj in _trip_resources(rng, model, resources, activity_id=activity_pk)
+            ), batch_size)
+    return trip_pks
+
+
+def seed_items(user, count, rng=None, batch_size=1000):
+    rng = rng or random.Random(0)
+    return bulk_insert(Item, (Item(created_by=user, name=f"{rng.choice(WORDS)} {i}".capitalize()) for i in range(count)), batch_size)
+
+
+def seed_storage(user, locations, items, item_pks, rng=None, batch_size=1000):
+    rng = rng or random.Random(0)
+    location_pks = bulk_insert(StorageLocation, (
+        StorageLocation(created_by=user, name=f"{rng.choice(WORDS)} shelf {i}".capitalize()) for i in range(locations)
+    ), batch_size)
+    if not location_pks or not item_pks:
+        return location_pks
+    bulk_insert(StorageLocationItem, (
+        StorageLocationItem(
+            created_by=user,
+            storage_location_id=rng.choice(location_pks),
+            item_id=rng.choice(item_pks),
+            amount=rng.randint(1, 20),
+        )
+        for _ in range(items)
+    ), batch_size)
+    return location_pks
+
+
+def seed_shopping_lists(user, count, items, item_pks, rng=None, batch_size=1000, name="Weekly groceries"):
+    """Creates recurring shopping lists for `user` with `items` items each and returns their pks."""
+    rng = rng or random.Random(0)
+    units = [choice for choice, _ in ShoppingListItem.AMOUNT_UNITS.choices]
+    list_pks = bulk_insert(ShoppingList, (
+        ShoppingList(created_by=user, name=f"{name} {i + 1}", is_recurring=rng.random() < 0.5) for i in range(count)
+    ), batch_size)
+    bulk_insert(ShoppingListItem, (
+        ShoppingListItem(
+            created_by=user,
+            shopping_list_id=list_pk,
+            item_id=item_pk,
+            amount=rng.randint(1, 20),
+            amount_unit=rng.choice(units),
+            is_bought=rng.random() < 0.5,
+        )
+        for list_pk in list_pks
+        for item_pk in _sample(rng, item_pks, items)
+    ), batch_size)
+    return list_pks
+
+
+def seed_recipes(user, count, items, item_pks, rng=None, batch_size=1000):
+    """Creates recipes, each with its own ingredients shopping list, and returns their pks."""
+    rng = rng or random.Random(0)
+    list_pks = seed_shopping_lists(user, count, items, item_pks, rng, batch_size, name="Ingredients")
+    return bulk_insert(Recipe, (
+        Recipe(created_by=user, shopping_list_id=list_pk, name=f"{rng.choice(WORDS)} stew".capitalize(), content=_sentence(rng, 60))
+        for list_pk in list_pks
+    ), batch_size)
+
+
+def seed_buckets(user, count, members_per_relation, members, tag_pks=(), tags_per_object=0, rng=None, batch_size=1000):
+    """Creates buckets and fills each of their M2M relations from `members` ({field_name: pks})."""
+    rng = rng or random.Random(0)
+    bucket_pks = bulk_insert(Bucket, (
+        Bucket(created_by=user, name=f"{rng.choice(WORDS)} bucket {i}".capitalize(), description=_sentence(rng))
+        for i in range(count)
+    ), batch_size)
+    bulk_link(Bucket, "tags", _tag_pairs(rng, bucket_pks, list(tag_pks), tags_per_object), batch_size)
+    for field_name, pks in members.items():
+        pairs = ((bucket_pk, pk) for bucket_pk in bucket_pks for pk in _sample(rng, pks, members_per_relation))
+        bulk_link(Bucket, field_name, pairs, batch_size)
+    return bucket_pks
+
+
+def seed_user_data(user, volumes=None, rng=None, batch_size=1000):
+    """Fills every model for `user` according to `volumes` (see DEFAULT_VOLUMES)."""
+    volumes = {**DEFAULT_VOLUMES, **(volumes or {})}
+    rng = rng or random.Random(0)
+    tagging = {"tags_per_object": volumes["tags_per_object"], "rng": rng, "batch_size": batch_size}
+
+    tag_pks = seed_tags(user, volumes["tags"], rng, batch_size)
+    members = {
+        "contacts": seed_contacts(user, volumes["contacts"], volumes["informations"], tag_pks, **tagging),
+        "documents": seed_bucket_resources(user, Document, volumes["documents"], tag_pks, **tagging),
+        "files": seed_bucket_resources(user, File, volumes["files"], tag_pks, **tagging),
+        "images": seed_bucket_resources(user, Image, volumes["images"], tag_pks, **tagging),
+        "links": seed_bucket_resources(user, Link, volumes["links"], tag_pks, **tagging),
+        "tasks": seed_tasks(user, volumes["tasks"], tag_pks, **tagging),
+        "trips": seed_trips(user, volumes["trips"], volumes["events"], volumes["activities"], volumes["trip_resources"], rng, batch_size),
+    }
+    item_pks = seed_items(user, volumes["items"], rng, batch_size)
+    seed_storage(user, volumes["storage_locations"], volumes["storage_items"], item_pks, rng, batch_size)
+    members["shopping_lists"] = seed_shopping_lists(user, volumes["shopping_lists"], volumes["list_items"], item_pks, rng, batch_size)
+    members["recipes"] = seed_recipes(user, volumes["recipes"], volumes["list_items"], item_pks, rng, batch_size)
+    seed_buckets(user, volumes["buckets"], volumes["bucket_members"], members, tag_pks, **tagging)
+    # bulk inserts send no post_save, so the search index is filled here
+    search.rebuild(user, batch_size)
+    return members
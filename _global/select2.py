@@ -0,0 +1,88 @@
+"""
+Server-searched Select2 widgets for large querysets.
+
+Only the selected options are rendered into the page; the choices are fetched as JSON pages from
+`select2_results` while typing. The search is a prefix match expressed as index ranges
+(`name >= 'tun' AND name < 'tun\U0010ffff'`), so it stays on a (created_by, name) index where `icontains`
+would scan every row. Result pages are cached in the `select2` cache alias.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils.module_loading import import_string
+from django_select2.conf import settings as select2_settings
+from django_select2.forms import ModelSelect2Widget, ModelSelect2MultipleWidget
+from django_select2.views import AutoResponseView
+
+from .cache import tiered_cache, user_namespace
+
+# sorts after every other character, so `value + PREFIX_END` bounds all strings starting with value
+PREFIX_END = "\U0010ffff"
+
+
+def prefix_q(field_name, term):
+    """Prefix match on `field_name` as ranges; covers the term as typed, lower-case, capitalized and upper-case."""
+    query = Q()
+    for variant in dict.fromkeys([term, term.lower(), term.capitalize(), term.upper()]):
+        query |= Q(**{f"{field_name}__gte": variant, f"{field_name}__lt": variant + PREFIX_END})
+    return query
+
+
+class PrefixSearchMixin:
+    """Searches the first of `search_fields` by prefix and orders by it, so both use the same index."""
+
+    max_results = 25
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("data_view", "select2_results")
+        super().__init__(*args, **kwargs)
+
+    def filter_queryset(self, request, term, queryset=None, **dependent_fields):
+        # the parent only applies the dependent fields when there is no term
+        queryset = super().filter_queryset(request, "", queryset, **dependent_fields)
+        field_name = self.get_search_fields()[0]
+        term = term.strip()
+        if term:
+            queryset = queryset.filter(prefix_q(field_name, term))
+        return queryset.order_by(field_name, "pk")
+
+
+class PrefixModelSelect2Widget(PrefixSearchMixin, ModelSelect2Widget):
+    pass
+
+
+class PrefixModelSelect2MultipleWidget(PrefixSearchMixin, ModelSelect2MultipleWidget):
+    pass
+
+
+class CachedResultsView(AutoResponseView):
+    """
+    AutoResponseView without the COUNT query of the paginator (one extra row tells whether there is more),
+    caching each page by its SQL and the user's cache version.
+    """
+
+    def get(self, request, *args, **kwargs):
+        self.widget = self.get_widget_or_404()
+        self.term = kwargs.get("term", request.GET.get("term", ""))
+        queryset = self.get_queryset()
+        try:
+            page = max(int(request.GET.get("page", 1)), 1)
+        except ValueError:
+            page = 1
+        per_page = self.widget.max_results
+
+        cache = caches[select2_settings.SELECT2_CACHE_BACKEND]
+        raw_key = "|".join([str(queryset.query), str(page), str(per_page), tiered_cache.version(user_namespace(request.user))])
+        key = f"{select2_settings.SELECT2_CACHE_PREFIX}results:{hashlib.sha1(raw_key.encode()).hexdigest()}"
+        data = cache.get(key)
+        if data is None:
+            objects = list(queryset[(page - 1) * per_page:page * per_page + 1])
+            data = {
+                "results": [self.widget.result_from_instance(obj, request) for obj in objects[:per_page]],
+                "more": len(objects) > per_page,
+            }
+            cache.set(key, data, getattr(settings, "SELECT2_RESULTS_CACHE_TIMEOUT", 60))
+        return JsonResponse(data, encoder=import_string(select2_settings.SELECT2_JSON_ENCODER))
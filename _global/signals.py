@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent once per bulk tag/untag (after commit) instead of an m2m_changed per object.
+# Arguments: model, object_ids, tag_ids, action ("add" or "remove"), changed
+tags_bulk_changed = Signal()
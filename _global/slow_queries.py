@@ -0,0 +1,149 @@
+"""
+Opt-in slow-query log. Set SLOW_QUERY_THRESHOLD_MS to install it on every database connection.
+Each statement over the threshold is logged with its normalized SQL, the URL name that issued it,
+the app code that triggered it and its query plan. Stats are aggregated per query fingerprint.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import traceback
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+from .middleware import current_metrics
+
+logger = logging.getLogger(__name__)
+
+_explaining = ContextVar("explaining", default=False)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+_REPEATED_LISTS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """Replaces literals and placeholder lists so that equal queries share a fingerprint."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _PLACEHOLDER_LIST.sub("(...)", sql)
+    sql = _REPEATED_LISTS.sub("(...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()[:12]
+
+
+def app_stack(limit=3):
+    """Returns the innermost frames that belong to the project itself (not Django or site-packages)."""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()[:-1]
+        if frame.filename.startswith(base_dir)
+        and "site-packages" not in frame.filename
+        and not frame.filename.endswith(("slow_queries.py", "middleware.py"))
+    ]
+    return [f"{frame.filename[len(base_dir) + 1:]}:{frame.lineno} in {frame.name}" for frame in frames[-limit:]]
+
+
+def explain(connection, sql, params):
+    if not sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+        return None
+    prefix = "EXPLAIN QUERY PLAN" if connection.vendor == "sqlite" else "EXPLAIN"
+    token = _explaining.set(True)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}", params)
+            return [" ".join(str(column) for column in row) for row in cursor.fetchall()]
+    except Exception as e:
+        return [f"EXPLAIN failed: {e}"]
+    finally:
+        _explaining.reset(token)
+
+
+class SlowQueryLog:
+    """execute_wrapper that logs and aggregates statements slower than `threshold_ms`."""
+
+    def __init__(self, threshold_ms, explain=True):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        if _explaining.get():
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            if duration >= self.threshold:
+                self.record(sql, params, many, context["connection"], duration)
+
+    def record(self, sql, params, many, connection, duration):
+        normalized = normalize_sql(sql)
+        key = fingerprint(normalized)
+        metrics = current_metrics.get()
+        resolver_match = metrics.request.resolver_match if metrics else None
+
+        with self.lock:
+            entry = self.stats.get(key)
+            is_new = entry is None
+            if is_new:
+                entry = self.stats[key] = {
+                    "fingerprint": key, "sql": normalized, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "url_names": set(), "stack": app_stack(), "plan": None,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration * 1000
+            entry["max_ms"] = max(entry["max_ms"], duration * 1000)
+            if resolver_match:
+                entry["url_names"].add(resolver_match.url_name)
+
+        # The plan only depends on the statement shape, so it is captured once per fingerprint
+        if is_new and self.explain and not many:
+            entry["plan"] = explain(connection, sql, params)
+
+        logger.warning(json.dumps({
+            "slow_query": key,
+            "ms": round(duration * 1000, 2),
+            "url_name": resolver_match.url_name if resolver_match else None,
+            "sql": normalized,
+            "stack": entry["stack"] if is_new else app_stack(),
+            "plan": entry["plan"] if is_new else None,
+            "count": entry["count"],
+            "total_ms": round(entry["total_ms"], 2),
+        }))
+
+    def summary(self, limit=20):
+        """Fingerprints sorted by their total time, the worst first."""
+        with self.lock:
+            entries = sorted(self.stats.values(), key=lambda entry: entry["total_ms"], reverse=True)[:limit]
+            return [{**entry, "url_names": sorted(name for name in entry["url_names"] if name)} for entry in entries]
+
+
+slow_query_log = None
+
+
+def install_slow_query_log(sender=None, connection=None, **kwargs):
+    """connection_created receiver: adds the slow-query log to the connection's execute_wrappers once."""
+    if slow_query_log is not None and slow_query_log not in connection.execute_wrappers:
+        connection.execute_wrappers.append(slow_query_log)
+
+
+def setup():
+    global slow_query_log
+    threshold = getattr(settings, "SLOW_QUERY_THRESHOLD_MS", None)
+    if threshold is None:
+        return
+    slow_query_log = SlowQueryLog(threshold, explain=getattr(settings, "SLOW_QUERY_EXPLAIN", True))
+    connection_created.connect(install_slow_query_log, dispatch_uid="_global.slow_queries")
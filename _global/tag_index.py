@@ -0,0 +1,138 @@
+"""
+Keeps TagAssignment in sync with the tag through-tables of every taggable model.
+
+The through-tables stay the source of truth; the index is maintained by m2m_changed (both directions
+of the relation) and post_delete of tagged objects, whose through rows are removed without m2m_changed.
+Writes that bypass signals (bulk_create into a through-table, raw SQL) need `index_pairs()` or the
+`backfill_tag_index` command; `check_tag_index` reports and repairs drift.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.signals import m2m_changed, post_delete
+
+from .models import Tag, TagAssignment
+from .utils import batched
+
+
+def tag_relations():
+    """The ManyToManyFields pointing at Tag (e.g. Contact.tags, Document.tags)."""
+    return [rel.field for rel in Tag._meta.related_objects if rel.many_to_many]
+
+
+def _columns(field):
+    """(object column, tag column) of the field's through-table."""
+    return f"{field.m2m_field_name()}_id", f"{field.m2m_reverse_field_name()}_id"
+
+
+def index_pairs(model, pairs, batch_size=1000):
+    """Adds (object_pk, tag_pk) pairs of `model` to the index, skipping existing ones; returns the number added."""
+    content_type = ContentType.objects.get_for_model(model)
+    created = 0
+    for batch in batched(pairs, batch_size):
+        assignments = TagAssignment.objects.filter(
+            content_type=content_type,
+            object_id__in={object_pk for object_pk, _ in batch}, tag__in={tag_pk for _, tag_pk in batch},
+        )
+        # ignore_conflicts returns the skipped rows too, so count around the insert
+        before = assignments.count()
+        rows = [TagAssignment(tag_id=tag_pk, content_type=content_type, object_id=object_pk) for object_pk, tag_pk in batch]
+        TagAssignment.objects.bulk_create(rows, ignore_conflicts=True)
+        created += assignments.count() - before
+    return created
+
+
+def tags_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        # tag.contacts_tagged.add(...): instance is the tag, pk_set the objects of `model`
+        content_type = ContentType.objects.get_for_model(model)
+        assignments = TagAssignment.objects.filter(tag=instance, content_type=content_type)
+        pairs = [(object_pk, instance.pk) for object_pk in pk_set or ()]
+        objects_filter = {"object_id__in": pk_set}
+    else:
+        content_type = ContentType.objects.get_for_model(instance)
+        assignments = TagAssignment.objects.filter(content_type=content_type, object_id=instance.pk)
+        pairs = [(instance.pk, tag_pk) for tag_pk in pk_set or ()]
+        objects_filter = {"tag__in": pk_set}
+
+    if action == "post_add":
+        index_pairs(content_type.model_class(), pairs)
+    elif action == "post_remove":
+        assignments.filter(**objects_filter).delete()
+    else:
+        assignments.delete()
+
+
+def tagged_object_deleted(sender, instance, **kwargs):
+    TagAssignment.objects.filter(content_type=ContentType.objects.get_for_model(sender), object_id=instance.pk).delete()
+
+
+def tagged_objects(*tags):
+    """Objects carrying all of `tags`: one index query, then one query per model that has matches."""
+    object_ids = {}
+    for row in TagAssignment.objects.with_tags(*tags):
+        object_ids.setdefault(row["content_type_id"], []).append(row["object_id"])
+    objects = []
+    for content_type_id, ids in object_ids.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        objects.extend(model.objects.filter(pk__in=ids))
+    return objects
+
+
+def setup():
+    for field in tag_relations():
+        uid = f"_global.tag_index.{field.model._meta.label}.{field.name}"
+        m2m_changed.connect(tags_changed, sender=field.remote_field.through, dispatch_uid=uid)
+        post_delete.connect(tagged_object_deleted, sender=field.model, dispatch_uid=uid)
+
+
+# --- BACKFILL & CONSISTENCY ---
+
+def _missing(field, content_type):
+    """Through rows without an index entry."""
+    object_column, tag_column = _columns(field)
+    through = field.remote_field.through
+    return through.objects.exclude(Exists(TagAssignment.objects.filter(
+        tag=OuterRef(tag_column), content_type=content_type, object_id=OuterRef(object_column),
+    )))
+
+
+def _stale(field, content_type):
+    """Index entries without a through row."""
+    object_column, tag_column = _columns(field)
+    through = field.remote_field.through
+    return TagAssignment.objects.filter(content_type=content_type).exclude(Exists(through.objects.filter(
+        **{tag_column: OuterRef("tag"), object_column: OuterRef("object_id")}
+    )))
+
+
+def backfill(rebuild=False, batch_size=5000):
+    """Indexes every through row; returns {model label: rows added}."""
+    added = {}
+    with transaction.atomic():
+        if rebuild:
+            TagAssignment.objects.all().delete()
+        for field in tag_relations():
+            content_type = ContentType.objects.get_for_model(field.model)
+            object_column, tag_column = _columns(field)
+            # materialized first, so the inserts don't change the rows being read
+            pairs = list(_missing(field, content_type).values_list(object_column, tag_column))
+            added[field.model._meta.label] = index_pairs(field.model, pairs, batch_size)
+    return added
+
+
+def check(fix=False):
+    """Returns {model label: (missing, stale)}; with `fix`, adds the missing and deletes the stale entries."""
+    report = {}
+    for field in tag_relations():
+        content_type = ContentType.objects.get_for_model(field.model)
+        missing, stale = _missing(field, content_type), _stale(field, content_type)
+        report[field.model._meta.label] = (missing.count(), stale.count())
+        if fix and any(report[field.model._meta.label]):
+            object_column, tag_column = _columns(field)
+            with transaction.atomic():
+                index_pairs(field.model, list(missing.values_list(object_column, tag_column)))
+                TagAssignment.objects.filter(pk__in=stale.values("pk")).delete()
+    return report
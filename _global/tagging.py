@@ -0,0 +1,78 @@
+"""
+Bulk tagging for every model with a `tags` ManyToManyField to Tag (_buckets, _contacts, _tasks).
+
+Rows are written straight into the through-table with bulk_create(ignore_conflicts=True) in batches,
+instead of one INSERT and one m2m_changed per object. The tag index is updated in the same transaction
+and a single `tags_bulk_changed` signal is sent after commit.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from .models import Tag, TagAssignment
+from .utils import batched
+from .signals import tags_bulk_changed
+from .tag_index import index_pairs, tag_relations
+
+
+def tags_field(model):
+    field = next((field for field in tag_relations() if field.model is model), None)
+    if field is None:
+        raise ValueError(f"{model._meta.label} has no tags")
+    return field
+
+
+def _ids(objects):
+    if hasattr(objects, "values_list"):
+        return list(objects.values_list("pk", flat=True))
+    return [getattr(obj, "pk", obj) for obj in objects]
+
+
+def _through(model):
+    """(through model, object column, tag column) of the model's tags field."""
+    field = tags_field(model)
+    return field.remote_field.through, f"{field.m2m_field_name()}_id", f"{field.m2m_reverse_field_name()}_id"
+
+
+def _send(model, object_ids, tag_ids, action, changed):
+    transaction.on_commit(lambda: tags_bulk_changed.send(
+        sender=Tag, model=model, object_ids=object_ids, tag_ids=tag_ids, action=action, changed=changed,
+    ))
+
+
+def bulk_tag(model, objects, tags, batch_size=500):
+    """
+    Adds every tag to every object (a queryset, instances or pks) of `model`; returns the number of new links.
+    Objects are handled `batch_size` at a time, which also keeps the IN lists below SQLite's parameter limit.
+    """
+    through, object_column, tag_column = _through(model)
+    object_ids, tag_ids = _ids(objects), _ids(tags)
+    changed = 0
+    with transaction.atomic():
+        for object_batch in batched(object_ids, batch_size):
+            links = through.objects.filter(**{f"{object_column}__in": object_batch, f"{tag_column}__in": tag_ids})
+            pairs = [(object_id, tag_id) for object_id in object_batch for tag_id in tag_ids]
+            # ignore_conflicts hides how many rows were new, so count around the insert
+            before = links.count()
+            through.objects.bulk_create(
+                [through(**{object_column: object_id, tag_column: tag_id}) for object_id, tag_id in pairs],
+                batch_size=batch_size, ignore_conflicts=True,
+            )
+            changed += links.count() - before
+            index_pairs(model, pairs, batch_size)
+        _send(model, object_ids, tag_ids, "add", changed)
+    return changed
+
+
+def bulk_untag(model, objects, tags, batch_size=500):
+    """Removes every tag from every object of `model`; returns the number of removed links."""
+    through, object_column, tag_column = _through(model)
+    object_ids, tag_ids = _ids(objects), _ids(tags)
+    content_type = ContentType.objects.get_for_model(model)
+    changed = 0
+    with transaction.atomic():
+        for object_batch in batched(object_ids, batch_size):
+            deleted, _ = through.objects.filter(**{f"{object_column}__in": object_batch, f"{tag_column}__in": tag_ids}).delete()
+            changed += deleted
+            TagAssignment.objects.filter(content_type=content_type, object_id__in=object_batch, tag__in=tag_ids).delete()
+        _send(model, object_ids, tag_ids, "remove", changed)
+    return changed
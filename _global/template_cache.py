@@ -0,0 +1,52 @@
+"""
+Compiles every project and app template into the cached template loader, so the first request
+of a worker doesn't pay for parsing the base_jesus.html → base_default.html → page chain.
+"""
+import os
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+TEMPLATE_EXTENSIONS = (".html", ".txt", ".xml")
+
+
+def template_dirs(engine):
+    """Directories searched by the engine's loaders (DIRS and app dirs), looking through the cached loader."""
+    for loader in engine.template_loaders:
+        for inner in getattr(loader, "loaders", [loader]):
+            if hasattr(inner, "get_dirs"):
+                yield from inner.get_dirs()
+
+
+def iter_templates(engine):
+    """Yields (name, path) of every template file below the engine's template directories."""
+    for directory in template_dirs(engine):
+        directory = str(directory)
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(TEMPLATE_EXTENSIONS):
+                    path = os.path.join(root, filename)
+                    yield os.path.relpath(path, directory).replace(os.sep, "/"), path
+
+
+def warm_templates():
+    """
+    Loads every template of the Django template engines and returns (compiled, failures), failures being
+    (name, path, error). Some third-party templates need apps that aren't installed and are expected to fail.
+    """
+    compiled, failures = 0, []
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        seen = set()
+        for name, path in iter_templates(backend.engine):
+            # a name found in several directories resolves to the first one, like at request time
+            if name in seen:
+                continue
+            seen.add(name)
+            try:
+                backend.engine.get_template(name)
+                compiled += 1
+            except (TemplateSyntaxError, TemplateDoesNotExist) as e:
+                failures.append((name, path, str(e)))
+    return compiled, failures
@@ -0,0 +1,55 @@
+"""
+{% fragment_cache "name" vary_on... [namespace=...] %} ... {% endfragment_cache %}
+
+Like Django's {% cache %}, but stored in the tiered cache: the rendered block is keyed on its name,
+the `vary_on` values (e.g. a cursor or an `updated_at` stamp) and, if given, the current version of
+a cache namespace, so bumping the namespace drops every fragment in it. Querysets used only inside
+the block are never evaluated on a hit.
+"""
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.template.base import token_kwargs
+
+from _global.cache import tiered_cache
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, name, vary_on, namespace):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+        self.namespace = namespace
+
+    def render(self, context):
+        name = self.name.resolve(context)
+        vary_on = "|".join(str(value.resolve(context)) for value in self.vary_on)
+        key = f"fragment:{name}:{hashlib.md5(vary_on.encode(), usedforsecurity=False).hexdigest()}"
+        namespace = self.namespace.resolve(context) if self.namespace is not None else None
+        timeout = getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 60 * 60)
+        return tiered_cache.get_or_set(key, lambda: self.nodelist.render(context), timeout, namespace=namespace)
+
+
+@register.tag
+def fragment_cache(parser, token):
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires at least a fragment name")
+    nodelist = parser.parse(("endfragment_cache",))
+    parser.delete_first_token()
+
+    kwargs = {}
+    args = []
+    for bit in bits[1:]:
+        kwarg = token_kwargs([bit], parser)
+        if kwarg:
+            kwargs.update(kwarg)
+        else:
+            args.append(parser.compile_filter(bit))
+    unknown = set(kwargs) - {"namespace"}
+    if unknown:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' got unknown arguments: {', '.join(sorted(unknown))}")
+    return FragmentCacheNode(nodelist, args[0], args[1:], kwargs.get("namespace"))
@@ -1,3 +1,250 @@
-from django.test import TestCase
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from _buckets.models import Bucket
+from _contacts.models import Contact
+from _tasks.models import Task
+from .cache import TieredCache, tiered_cache
+from .forms import BulkTagForm
+from .metrics import MetricsRegistry, collect_snapshots, merge, registry
+from .models import Tag
+from .pagination import KeysetPaginator
+from .search import search
+from .select2 import PrefixModelSelect2Widget
+from .tag_index import index_pairs
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("searcher", password="x")
+        Contact.objects.create(created_by=cls.user, name="Ada Lovelace", description="Wrote the first program")
+        Task.objects.create(created_by=cls.user, name="Water the plants")
+
+    def test_finds_text_by_prefix(self):
+        self.assertEqual([hit.kind for hit in search(self.user, "lovel")], ["contacts"])
+        self.assertEqual([hit.kind for hit in search(self.user, "plants")], ["tasks"])
+
+    def test_terms_dont_match_the_token_columns(self):
+        # owner ("u<pk>"), object (pk hex) and kind are columns of the index too
+        contact = Contact.objects.get(created_by=self.user)
+        for query in ["contacts", "tasks", "u", f"u{self.user.pk}", "0", "01", contact.pk.hex[:6]]:
+            with self.subTest(query=query):
+                self.assertEqual(search(self.user, query), [])
+
+
+class FlakyCache(LocMemCache):
+    """Raises like an unreachable Redis while `down`."""
+
+    down = True
+
+    def _call(name):
+        def call(self, *args, **kwargs):
+            if self.down:
+                raise ConnectionError("cache down")
+            return getattr(super(FlakyCache, self), name)(*args, **kwargs)
+        return call
+
+    get, set, add, delete, set_many = map(_call, ["get", "set", "add", "delete", "set_many"])
+    del _call
+
+
+class TieredCacheFailureTests(TestCase):
+    def test_writes_survive_an_l2_outage(self):
+        user = get_user_model().objects.create_user("writer", password="x")
+        with mock.patch.object(TieredCache, "l2", FlakyCache("down", {})), \
+                mock.patch.object(tiered_cache, "down_until", 0.0):
+            # the invalidation receivers bump versions on every save
+            contact = Contact.objects.create(created_by=user, name="Grace Hopper")
+            contact.delete()
+            self.assertEqual(tiered_cache.get_or_set("key", lambda: "computed", namespace="test"), "computed")
+        self.assertTrue(tiered_cache.missed_bumps)
+
+    def test_unreachable_at_startup_recovers_with_the_missed_bumps(self):
+        l2 = FlakyCache("flaky", {})
+        worker, other_worker = TieredCache(version_ttl=0), TieredCache(version_ttl=0)
+        with mock.patch("_global.cache.caches", {"default": l2}):
+            worker.bump("test")
+            bumped = worker.missed_bumps["test"]
+            l2.down = False
+            # the retry interval is over
+            worker.down_until = 0.0
+            self.assertEqual(worker.version("test"), bumped)
+            self.assertEqual(worker.missed_bumps, {})
+            self.assertEqual(other_worker.version("test"), bumped)
+
+
+class MetricsSnapshotTests(TestCase):
+    def write_snapshot(self, directory, pid, age, requests=1):
+        path = Path(directory) / f"{pid}.json"
+        path.write_text(json.dumps({"pid": pid, "rss_bytes": 0, "counters": {"requests_total{}": requests}, "histograms": {}}))
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def requests_total(self):
+        counters, _ = merge(collect_snapshots())
+        return counters["requests_total{}"]
+
+    def test_retires_stale_snapshots_of_exited_workers(self):
+        exited = subprocess.Popen([sys.executable, "-c", ""])
+        exited.wait()
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_DIR=directory, METRICS_FLUSH_INTERVAL=5):
+            stale = self.write_snapshot(directory, exited.pid, age=60, requests=3)
+            # an idle worker doesn't flush, but is still running
+            idle = self.write_snapshot(directory, os.getppid(), age=60, requests=4)
+            self.assertEqual(self.requests_total(), 7)
+            self.assertFalse(stale.exists())
+            self.assertTrue(idle.exists())
+            # the exited worker's counts stay in the retired ones
+            self.assertEqual(self.requests_total(), 7)
+            pids = [snapshot["pid"] for snapshot in collect_snapshots()]
+            self.assertCountEqual(pids, [os.getpid(), os.getppid(), None])
+
+    def test_exiting_worker_retires_its_counts(self):
+        worker = MetricsRegistry()
+        worker.inc("requests_total", "", 2)
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            self.write_snapshot(directory, os.getppid(), age=0, requests=4)
+            worker.retire_snapshot()
+            self.assertFalse((Path(directory) / f"{os.getpid()}.json").exists())
+            self.assertEqual(self.requests_total(), 6)
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("pager", password="x")
+        Contact.objects.bulk_create(Contact(created_by=cls.user, name=name) for name in ["Ada", "Bea", "Cy", "Di", "Ed"])
+
+    def paginator(self, per_page=2):
+        return KeysetPaginator(Contact.objects.filter(created_by=self.user), ordering="name", per_page=per_page)
+
+    def names(self, page):
+        return [contact.name for contact in page]
+
+    def test_walks_forward_and_back(self):
+        paginator = self.paginator()
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        last = paginator.page(second.next_cursor)
+        self.assertEqual([self.names(first), self.names(second), self.names(last)], [["Ada", "Bea"], ["Cy", "Di"], ["Ed"]])
+        self.assertFalse(first.has_previous)
+        self.assertFalse(last.has_next)
+        self.assertTrue(last.has_previous)
+        back = paginator.page(last.previous_cursor)
+        self.assertEqual(self.names(back), ["Cy", "Di"])
+        self.assertEqual(self.names(paginator.page(back.previous_cursor)), ["Ada", "Bea"])
+        self.assertFalse(paginator.page(back.previous_cursor).has_previous)
+
+    def test_full_last_page_has_no_next(self):
+        page = self.paginator(per_page=5).page()
+        self.assertEqual(len(page), 5)
+        self.assertFalse(page.has_next)
+
+    def test_empty_and_invalid_cursors_give_the_first_page(self):
+        for cursor in [None, "", "garbage"]:
+            with self.subTest(cursor=cursor):
+                page = self.paginator().page(cursor)
+                self.assertEqual(self.names(page), ["Ada", "Bea"])
+                self.assertFalse(page.has_previous)
+
+    def test_empty_list(self):
+        page = KeysetPaginator(Contact.objects.none(), ordering="name").page()
+        self.assertEqual((list(page), page.has_next, page.has_previous), ([], False, False))
+
+    def test_ties_are_broken_by_pk(self):
+        Contact.objects.bulk_create(Contact(created_by=self.user, name="Ada") for _ in range(3))
+        paginator, seen, cursor = self.paginator(), [], None
+        while True:
+            page = paginator.page(cursor)
+            seen += [contact.pk for contact in page]
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(len(seen), 8)
+        self.assertEqual(len(set(seen)), 8)
+
+    def test_cursor_of_another_list_is_ignored(self):
+        cursor = self.paginator().page().next_cursor
+        bucket = Bucket.objects.create(created_by=self.user, name="Inbox")
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("bucket_content", kwargs={"bucket_pk": bucket.pk}), {"cursor": cursor})
+        self.assertEqual(response.status_code, 200)
+        buckets = KeysetPaginator(Bucket.objects.filter(created_by=self.user)).page(cursor)
+        self.assertEqual([obj.pk for obj in buckets], [bucket.pk])
+
+
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("timed", password="x")
+        Contact.objects.create(created_by=cls.user, name="Ada Lovelace")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_streaming_response_is_measured_until_exhausted(self):
+        with mock.patch.object(registry, "record_request") as record_request, \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("contact_export_csv"))
+            b"".join(response.streaming_content)
+            response.close()
+        record_request.assert_called_once()
+        metrics = record_request.call_args.args[2]
+        # the export query runs while the content is read
+        self.assertEqual(metrics.db_queries, len(queries))
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(PERFORMANCE_LOG_SAMPLE_RATE=0)
+    def test_logs_only_requests_over_budget(self):
+        with self.assertNoLogs("_global.middleware"):
+            self.client.get(reverse("bucket_list"))
+        with override_settings(PERFORMANCE_BUDGETS={"bucket_list": {"queries": 0}}), \
+                self.assertLogs("_global.middleware", "WARNING") as logs:
+            self.client.get(reverse("bucket_list"))
+        self.assertTrue(json.loads(logs.records[0].getMessage())["over_budget"])
+
+
+class BulkTagFormTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("tagger", password="x")
+        cls.other = get_user_model().objects.create_user("other", password="x")
+        cls.tag = Tag.objects.create(created_by=cls.user, name="friends")
+        cls.other_tag = Tag.objects.create(created_by=cls.other, name="work")
+        cls.contact = Contact.objects.create(created_by=cls.user, name="Ada Lovelace")
+
+    def form(self, tag):
+        return BulkTagForm(self.user, {"ids": [str(self.contact.pk)], "tag": str(tag.pk), "action": "add"})
+
+    def test_tags_are_searched_on_the_server(self):
+        self.assertIsInstance(BulkTagForm(self.user).fields["tag"].widget, PrefixModelSelect2Widget)
+
+    def test_only_the_users_tags_are_accepted(self):
+        self.assertTrue(self.form(self.tag).is_valid())
+        self.assertFalse(self.form(self.other_tag).is_valid())
+
+
+class TagIndexTests(TestCase):
+    def test_index_pairs_counts_only_new_entries(self):
+        user = get_user_model().objects.create_user("indexer", password="x")
+        contact = Contact.objects.create(created_by=user, name="Ada Lovelace")
+        indexed, new = Tag.objects.create(created_by=user, name="a"), Tag.objects.create(created_by=user, name="b")
+        contact.tags.add(indexed)
+        self.assertEqual(index_pairs(Contact, [(contact.pk, indexed.pk), (contact.pk, new.pk)]), 1)
+        self.assertEqual(index_pairs(Contact, [(contact.pk, indexed.pk), (contact.pk, new.pk)]), 0)
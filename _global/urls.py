@@ -1,6 +1,11 @@
 from django.urls import path
 from . import views
+from .select2 import CachedResultsView
 
 urlpatterns = [
-    path('', views.homepage, name="homepage")
+    path('', views.homepage, name="homepage"),
+    # no trailing slash, that's where scrapers expect it
+    path('metrics', views.metrics, name="metrics"),
+    path('select2/results.json', CachedResultsView.as_view(), name="select2_results"),
+    path('search/', views.search, name="search"),
 ]
@@ -0,0 +1,9 @@
+"""Small helpers shared by the apps."""
+from itertools import islice
+
+
+def batched(iterable, size):
+    """Lists of up to `size` items of `iterable`, consumed lazily."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
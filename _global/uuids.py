@@ -0,0 +1,45 @@
+"""
+Time-ordered UUIDs (UUIDv7, RFC 9562) used as the primary key default of every model.
+
+The first 48 bits are the Unix time in milliseconds, so new keys are always appended to the right
+edge of the primary key B-tree instead of landing on a random page like uuid4 keys do.
+Existing uuid4 rows don't need to be rewritten: both are plain UUIDs in the same column, and all
+keys generated from now on sort after each other in one narrow, growing key range.
+"""
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7():
+    """
+    Returns a UUIDv7. The 12 `rand_a` bits hold a counter that is randomly seeded every millisecond
+    and incremented within it, so keys generated by one process are strictly increasing.
+    """
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF  # leave headroom to count up
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # counter exhausted within this millisecond: borrow the next one
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & 0x3FFF_FFFF_FFFF_FFFF
+    value = (ms & 0xFFFF_FFFF_FFFF) << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand_b
+    return uuid.UUID(int=value)
+
+
+def uuid7_timestamp(value):
+    """Returns the creation time of a UUIDv7 in seconds since the epoch."""
+    return (value.int >> 80) / 1000
@@ -1,4 +1,31 @@
 from django.shortcuts import render
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse, JsonResponse
+
+from .metrics import render_prometheus
+from .search import search as search_index
 
 def homepage(request):
     return render(request, "global/homepage.html")
+
+def metrics(request):
+    allowed_ips = getattr(settings, "METRICS_ALLOWED_IPS", [])
+    if not request.user.is_staff and request.META.get("REMOTE_ADDR") not in allowed_ips:
+        raise PermissionDenied
+    return HttpResponse(render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@login_required
+def search(request):
+    query = request.GET.get("q", "")
+    try:
+        limit = min(max(int(request.GET.get("limit", 20)), 1), 100)
+    except ValueError:
+        limit = 20
+    hits = search_index(request.user, query, kinds=request.GET.getlist("type"), limit=limit)
+    results = [
+        {"type": hit.kind, "id": str(hit.id), "title": hit.title, "snippet": hit.snippet, "rank": hit.rank, "url": hit.url}
+        for hit in hits
+    ]
+    return JsonResponse({"query": query, "results": results})
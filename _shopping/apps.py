@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ShoppingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = '_shopping'
+
+    def ready(self):
+        from . import receivers  # noqa: F401 (connects the signal receivers)
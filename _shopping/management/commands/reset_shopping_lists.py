@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from _shopping.models import ShoppingList
+
+
+class Command(BaseCommand):
+    help = "Resets all recurring shopping lists with bought items, in batches of lists."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Shopping lists reset per UPDATE")
+
+    def handle(self, *args, **options):
+        lists_reset = items_reset = 0
+        last_pk = None
+        # walk the due lists by pk, so memory stays bounded by the batch size
+        while True:
+            due = ShoppingList.objects.due_for_reset().order_by("pk")
+            if last_pk is not None:
+                due = due.filter(pk__gt=last_pk)
+            batch = list(due.values_list("pk", flat=True)[:options["batch_size"]])
+            if not batch:
+                break
+            items_reset += ShoppingList.objects.filter(pk__in=batch).reset()
+            lists_reset += len(batch)
+            last_pk = batch[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Reset {items_reset} items on {lists_reset} shopping lists"))
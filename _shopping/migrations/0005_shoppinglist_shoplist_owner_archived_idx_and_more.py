@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('_shopping', '0004_alter_shoppinglist_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='shoppinglist',
+            index=models.Index(fields=['created_by', 'is_archived', 'created_at'], name='shoplist_owner_archived_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shoppinglistitem',
+            index=models.Index(fields=['shopping_list', 'is_bought'], name='shoplistitem_list_bought_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:48
+
+import _global.uuids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('_shopping', '0005_shoppinglist_shoplist_owner_archived_idx_and_more'),
+    ]
+
+    # The primary key default only lives in Python, so existing rows and the schema stay untouched
+    # (a plain AlterField would make SQLite rebuild every table).
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='item',
+                    name='id',
+                    field=models.UUIDField(default=_global.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='recipe',
+                    name='id',
+                    field=models.UUIDField(default=_global.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='shoppinglist',
+                    name='id',
+                    field=models.UUIDField(default=_global.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='shoppinglistitem',
+                    name='id',
+                    field=models.UUIDField(default=_global.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='storagelocation',
+                    name='id',
+                    field=models.UUIDField(default=_global.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='storagelocationitem',
+                    name='id',
+                    field=models.UUIDField(default=_global.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
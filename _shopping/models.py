@@ -1,9 +1,11 @@
-from django.db import models
-import uuid
+from django.db import models, transaction
+from _global.uuids import uuid7
 from django.contrib.auth import get_user_model
 
+from .signals import shopping_list_reset
+
 class Item(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="items_created")
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -16,7 +18,7 @@ class Item(models.Model):
         return str(self.name)
         
 class StorageLocation(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="storage_locations_created")
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -32,8 +34,27 @@ class StorageLocation(models.Model):
         
         
    
+class ShoppingListQuerySet(models.QuerySet):
+    def due_for_reset(self):
+        """Recurring, not archived lists with at least one bought item."""
+        bought_items = ShoppingListItem.objects.filter(shopping_list=models.OuterRef("pk"), is_bought=True)
+        return self.filter(is_recurring=True, is_archived=False).filter(models.Exists(bought_items))
+
+    def reset(self):
+        """Marks every item of these lists as not bought with a single UPDATE and returns the number of items."""
+        # the lists are only read for the receivers of shopping_list_reset, and before the UPDATE changes them
+        shopping_list_ids = list(self.values_list("pk", flat=True)) if shopping_list_reset.has_listeners(ShoppingList) else None
+        with transaction.atomic():
+            items_reset = ShoppingListItem.objects.filter(shopping_list__in=self.values("pk"), is_bought=True).update(is_bought=False)
+            if shopping_list_ids is not None:
+                transaction.on_commit(lambda: shopping_list_reset.send(
+                    sender=ShoppingList, shopping_list_ids=shopping_list_ids, items_reset=items_reset
+                ))
+        return items_reset
+
+
 class ShoppingList(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="shopping_lists_created")
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -43,20 +64,23 @@ class ShoppingList(models.Model):
     is_recurring = models.BooleanField(default=False)
     is_archived = models.BooleanField(default=False)
     
+    objects = ShoppingListQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Shopping List"
         verbose_name_plural = "Shopping Lists"
+        indexes = [
+            models.Index(fields=["created_by", "is_archived", "created_at"], name="shoplist_owner_archived_idx"),
+        ]
     
     def __str__(self):
         return str(self.name)
         
     def reset(self):
-        for item in self.shopping_list_items.all():
-            item.is_bought = False
-            item.save()
+        return ShoppingList.objects.filter(pk=self.pk).reset()
 
 class Recipe(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="recipes_created")
     created_at = models.DateTimeField(auto_now_add=True)
     shopping_list = models.OneToOneField(ShoppingList, on_delete=models.CASCADE, related_name="recipes") # acts as the ingredients too
@@ -64,7 +88,7 @@ class Recipe(models.Model):
     content = models.TextField()
     
 class StorageLocationItem(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="storage_location_items_created")
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -90,7 +114,7 @@ class ShoppingListItem(models.Model):
         PACKAGES = "PACKAGES", "Packages"
         BOTTLES = "BOTTLES", "Bottles"
         
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="shopping_list_items_created")
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -105,6 +129,9 @@ class ShoppingListItem(models.Model):
     class Meta:
         verbose_name = "Shopping List Item"
         verbose_name_plural = "Shopping List Items"
+        indexes = [
+            models.Index(fields=["shopping_list", "is_bought"], name="shoplistitem_list_bought_idx"),
+        ]
     
     def __str__(self):
         return f"{self.item.name}: {self.amount}"
@@ -0,0 +1,13 @@
+from django.dispatch import receiver
+
+from _global.cache import tiered_cache, user_namespace
+from .models import ShoppingList
+from .signals import shopping_list_reset
+
+
+@receiver(shopping_list_reset, dispatch_uid="_shopping.receivers.bump_owner_cache")
+def bump_owner_cache(sender, shopping_list_ids, **kwargs):
+    """The reset is a single UPDATE without post_save signals, so the owners' cache versions are bumped here."""
+    owner_ids = ShoppingList.objects.filter(pk__in=shopping_list_ids).values_list("created_by_id", flat=True).distinct()
+    for owner_id in owner_ids:
+        tiered_cache.bump(user_namespace(owner_id))
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent once per reset (after commit) instead of a post_save per item.
+# Arguments: shopping_list_ids, items_reset
+shopping_list_reset = Signal()
@@ -1,3 +1,40 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from _global.seeding import seed_items, seed_shopping_lists
+from .models import ShoppingList, ShoppingListItem
+from .signals import shopping_list_reset
+
+
+class ShoppingListResetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("shopper", password="x")
+        seed_shopping_lists(cls.user, 4, 10, seed_items(cls.user, 10))
+        ShoppingList.objects.update(is_recurring=True)
+        ShoppingListItem.objects.update(is_bought=True)
+
+    def test_reset_is_one_update(self):
+        with mock.patch.object(shopping_list_reset, "has_listeners", return_value=False), \
+                CaptureQueriesContext(connection) as queries:
+            self.assertEqual(ShoppingList.objects.due_for_reset().reset(), 40)
+        statements = [query["sql"] for query in queries if "SAVEPOINT" not in query["sql"]]
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith("UPDATE"))
+        self.assertFalse(ShoppingListItem.objects.filter(is_bought=True).exists())
 
-# Create your tests here.
+    def test_receivers_get_the_reset_lists(self):
+        received = mock.Mock()
+        shopping_list_reset.connect(received, sender=ShoppingList)
+        self.addCleanup(shopping_list_reset.disconnect, received, sender=ShoppingList)
+        due = ShoppingList.objects.filter(pk__in=ShoppingList.objects.order_by("pk").values("pk")[:2])
+        with self.captureOnCommitCallbacks(execute=True):
+            items_reset = due.reset()
+        self.assertEqual(items_reset, 20)
+        kwargs = received.call_args.kwargs
+        self.assertCountEqual(kwargs["shopping_list_ids"], due.values_list("pk", flat=True))
+        self.assertEqual(kwargs["items_reset"], 20)
@@ -1,5 +1,5 @@
 from django.db import models
-import uuid
+from _global.uuids import uuid7
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -10,7 +10,7 @@ class Task(models.Model):
         ON_HOLD = "ON_HOLD", "On Hold"
         DONE = "DONE", "Done"
         
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="tasks_created")
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -31,5 +31,11 @@ class Task(models.Model):
     
     tags = models.ManyToManyField("_global.Tag", blank=True, related_name="tasks_tagged")
     
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_by", "status", "priority"], name="task_owner_status_prio_idx"),
+            models.Index(fields=["created_by", "created_at"], name="task_owner_created_idx"),
+        ]
+    
     def __str__(self):
         return str(self.name)
\ No newline at end of file
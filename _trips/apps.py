@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TripsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = '_trips'
+
+    def ready(self):
+        from . import conflicts, receivers  # noqa: F401 (connects the signal receivers)
@@ -0,0 +1,97 @@
+"""
+Overlap detection for trip timelines.
+
+Events of a trip and activities of an event conflict when their [effective_start, effective_end)
+intervals overlap; back-to-back entries don't. A sweep over the intervals sorted by start keeps the
+still-open ones in a heap ordered by end, so a trip is checked in O(n log n + k) for k conflicts
+instead of comparing every pair. Entries without an end after their start have no extent and are skipped.
+"""
+import heapq
+from collections import namedtuple
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from _global.cache import tiered_cache
+from .models import Event, Activity
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+Interval = namedtuple("Interval", "start end key")
+
+
+def overlapping_pairs(intervals):
+    """Yields (earlier, later, overlap_start, overlap_end) for every pair of overlapping Intervals."""
+    active = []  # (end, position, interval) of the intervals still open at the sweep position
+    for position, interval in enumerate(sorted(intervals, key=lambda interval: interval.start)):
+        while active and active[0][0] <= interval.start:
+            heapq.heappop(active)
+        for end, _, other in active:
+            yield other, interval, interval.start, min(end, interval.end)
+        heapq.heappush(active, (interval.end, position, interval))
+
+
+def _intervals(rows):
+    return [Interval(row["effective_start"], row["effective_end"], row) for row in rows if row["effective_end"] > row["effective_start"]]
+
+
+def _conflicts(intervals, kind):
+    return [
+        {
+            "type": kind,
+            "a": {"id": str(a.key["id"]), "name": a.key["name"]},
+            "b": {"id": str(b.key["id"]), "name": b.key["name"]},
+            "overlap_start": start.isoformat(),
+            "overlap_end": end.isoformat(),
+        }
+        for a, b, start, end in overlapping_pairs(intervals)
+    ]
+
+
+def compute_trip_conflicts(trip_id):
+    """All overlapping events of the trip and overlapping activities within each of its events (two queries)."""
+    fields = ("id", "name", "effective_start", "effective_end")
+    events = Event.objects.filter(
+        trip_id=trip_id, effective_start__isnull=False, effective_end__isnull=False,
+    ).values(*fields)
+    activities = Activity.objects.filter(
+        event__trip_id=trip_id, effective_start__isnull=False, effective_end__isnull=False,
+    ).values("event_id", *fields)
+
+    activities_by_event = {}
+    for activity in activities:
+        activities_by_event.setdefault(activity["event_id"], []).append(activity)
+
+    conflicts = _conflicts(_intervals(events), "event")
+    for rows in activities_by_event.values():
+        conflicts += _conflicts(_intervals(rows), "activity")
+    return conflicts
+
+
+def trip_namespace(trip_id):
+    return f"trip:{trip_id}"
+
+
+def get_trip_conflicts(trip_id):
+    """Cached compute_trip_conflicts(); invalidated whenever an event or activity of the trip is saved or deleted."""
+    return tiered_cache.get_or_set(
+        "conflicts", lambda: compute_trip_conflicts(trip_id), CACHE_TIMEOUT, namespace=trip_namespace(trip_id),
+    )
+
+
+# QuerySet.update() and bulk_create() don't send these signals; callers using them
+# have to call invalidate_trip_conflicts() themselves.
+def invalidate_trip_conflicts(trip_id):
+    tiered_cache.bump(trip_namespace(trip_id))
+
+
+@receiver([post_save, post_delete], sender=Event, dispatch_uid="_trips.conflicts.event")
+def event_changed(sender, instance, **kwargs):
+    invalidate_trip_conflicts(instance.trip_id)
+
+
+@receiver([post_save, post_delete], sender=Activity, dispatch_uid="_trips.conflicts.activity")
+def activity_changed(sender, instance, **kwargs):
+    trip_id = Event.objects.filter(pk=instance.event_id).values_list("trip_id", flat=True).first()
+    if trip_id is not None:
+        invalidate_trip_conflicts(trip_id)
@@ -0,0 +1,104 @@
+import json
+import random
+from datetime import date, datetime, time, timedelta
+from itertools import combinations
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from _global.benchmarking import throwaway_database, median_ms
+from _global.seeding import bulk_insert
+from _trips.conflicts import compute_trip_conflicts, get_trip_conflicts, invalidate_trip_conflicts, overlapping_pairs, _intervals
+from _trips.models import Trip, Event, Activity
+
+
+def naive_pairs(intervals):
+    """The pairwise check the sweep replaces."""
+    return [(a, b) for a, b in combinations(intervals, 2) if a.start < b.end and b.start < a.end]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway database with one long trip and compares the sweep-line conflict check "
+        "with a pairwise one, plus the cost of a cached lookup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=50, help="Events of the trip, four per day")
+        parser.add_argument("--activities", type=int, default=10_000, help="Activities spread over the events")
+        parser.add_argument("--overlap-rate", type=float, default=0.05, help="Share of activities starting before the previous one ends")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the median is reported")
+        parser.add_argument("--skip-naive", action="store_true", help="Don't run the quadratic comparison")
+        parser.add_argument("--report", help="Write a JSON report to this path")
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            result = self.run_benchmark(options)
+
+        for key, value in result.items():
+            self.stdout.write(f"{key}: {value}")
+        if options["report"]:
+            with open(options["report"], "w") as f:
+                json.dump(result, f, indent=2)
+
+    def seed(self, options):
+        rng = random.Random(0)
+        user = get_user_model().objects.create_user("bench-conflicts", password="bench")
+        trip = Trip.objects.create(created_by=user, name="Long trip")
+        first_day = date(2025, 7, 1)
+        events = []
+        for i in range(options["events"]):
+            day = first_day + timedelta(days=i // 4)
+            # every fifth event runs into the next one
+            end_hour = 8 + (i % 4) * 4 + (5 if i % 5 == 0 else 3)
+            events.append(Event(
+                trip=trip, name=f"Event {i + 1}", date_start=day, time_start=time(8 + (i % 4) * 4, 0),
+                date_end=day + timedelta(days=end_hour // 24), time_end=time(end_hour % 24, 0),
+            ))
+        bulk_insert(Event, events, 5000)
+
+        def make_activities():
+            per_event = max(1, options["activities"] // len(events))
+            for event in events:
+                # back-to-back slots of one to five minutes, a share of them starting early
+                cursor = datetime.combine(event.date_start, event.time_start)
+                for j in range(per_event):
+                    length = timedelta(minutes=rng.randint(1, 5))
+                    start = cursor - timedelta(minutes=2) if rng.random() < options["overlap_rate"] else cursor
+                    end = start + length
+                    yield Activity(
+                        event_id=event.pk, activity_type=Activity.ACTIVITY_TYPES.MAIN, name=f"Activity {j + 1}",
+                        date_start=start.date(), time_start=start.time(), date_end=end.date(), time_end=end.time(),
+                    )
+                    cursor = max(cursor, end)
+
+        bulk_insert(Activity, make_activities(), 5000)
+        return trip
+
+    def run_benchmark(self, options):
+        trip = self.seed(options)
+        repeat = options["repeat"]
+        rows = list(Activity.objects.filter(event__trip=trip).values("event_id", "id", "name", "effective_start", "effective_end"))
+        by_event = {}
+        for row in rows:
+            by_event.setdefault(row["event_id"], []).append(row)
+        groups = [_intervals(group) for group in by_event.values()]
+
+        result = {
+            "events": options["events"],
+            "activities": len(rows),
+            "conflicts": len(compute_trip_conflicts(trip.pk)),
+            "sweep_ms": median_ms(lambda: [list(overlapping_pairs(group)) for group in groups], repeat),
+            "compute_ms": median_ms(lambda: compute_trip_conflicts(trip.pk), repeat),
+        }
+        if not options["skip_naive"]:
+            result["naive_ms"] = median_ms(lambda: [naive_pairs(group) for group in groups], repeat)
+            # the whole trip as a single timeline, where the quadratic check hurts most
+            everything = [interval for group in groups for interval in group]
+            result["sweep_single_timeline_ms"] = median_ms(lambda: list(overlapping_pairs(everything)), repeat)
+            result["naive_single_timeline_ms"] = median_ms(lambda: naive_pairs(everything), 1)
+
+        invalidate_trip_conflicts(trip.pk)
+        get_trip_conflicts(trip.pk)
+        result["cached_ms"] = median_ms(lambda: get_trip_conflicts(trip.pk), repeat)
+        return result
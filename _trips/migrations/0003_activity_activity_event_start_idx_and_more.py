@@ -0,0 +1,21 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('_trips', '0002_alter_activity_options_alter_tripfile_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['event', 'date_start', 'time_start'], name='activity_event_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['trip', 'date_start', 'time_start'], name='event_trip_start_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:55
+
+import _trips.models
+import django.db.models.functions.math
+import django.db.models.lookups
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('_trips', '0005_trip_created_at_trip_created_by_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='effective_end',
+            field=models.GeneratedField(db_persist=False, expression=_trips.models.CombineDateTime('date_end', 'time_end'), output_field=models.DateTimeField(blank=True, null=True)),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='effective_start',
+            field=models.GeneratedField(db_persist=False, expression=_trips.models.CombineDateTime('date_start', 'time_start'), output_field=models.DateTimeField(blank=True, null=True)),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='effective_end',
+            field=models.GeneratedField(db_persist=False, expression=_trips.models.CombineDateTime('date_end', 'time_end'), output_field=models.DateTimeField(blank=True, null=True)),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='effective_start',
+            field=models.GeneratedField(db_persist=False, expression=_trips.models.CombineDateTime('date_start', 'time_start'), output_field=models.DateTimeField(blank=True, null=True)),
+        ),
+        # Modifying a field into a GeneratedField isn't supported, so it's dropped and re-added
+        migrations.RemoveField(
+            model_name='activity',
+            name='duration',
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='duration',
+            field=models.GeneratedField(db_persist=False, expression=models.Case(models.When(models.Q(('date_start__isnull', True), ('time_start__isnull', True), ('date_end__isnull', True), ('time_end__isnull', True), _connector='OR'), then=models.Value(None)), models.When(django.db.models.lookups.GreaterThan(_trips.models.CombineDateTime('date_end', 'time_end'), _trips.models.CombineDateTime('date_start', 'time_start')), then=django.db.models.functions.math.Round(_trips.models.HoursBetween(_trips.models.CombineDateTime('date_start', 'time_start'), _trips.models.CombineDateTime('date_end', 'time_end')), 1)), default=models.Value(0), output_field=models.DecimalField(decimal_places=1, max_digits=10)), output_field=models.DecimalField(blank=True, decimal_places=1, max_digits=10, null=True)),
+        ),
+        # Modifying a field into a GeneratedField isn't supported, so it's dropped and re-added
+        migrations.RemoveField(
+            model_name='event',
+            name='duration',
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='duration',
+            field=models.GeneratedField(db_persist=False, expression=models.Case(models.When(models.Q(('date_start__isnull', True), ('time_start__isnull', True), ('date_end__isnull', True), ('time_end__isnull', True), _connector='OR'), then=models.Value(None)), models.When(django.db.models.lookups.GreaterThan(_trips.models.CombineDateTime('date_end', 'time_end'), _trips.models.CombineDateTime('date_start', 'time_start')), then=django.db.models.functions.math.Round(_trips.models.HoursBetween(_trips.models.CombineDateTime('date_start', 'time_start'), _trips.models.CombineDateTime('date_end', 'time_end')), 1)), default=models.Value(0), output_field=models.DecimalField(decimal_places=1, max_digits=10)), output_field=models.DecimalField(blank=True, decimal_places=1, max_digits=10, null=True)),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['event', 'effective_start'], name='activity_event_effective_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['trip', 'effective_start'], name='event_trip_effective_idx'),
+        ),
+    ]
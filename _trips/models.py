@@ -1,34 +1,109 @@
 from django.db import models
-import uuid
-from django.utils.timezone import datetime
+from _global.uuids import uuid7
+from django.contrib.auth import get_user_model
+from django.db.models import Case, Func, Q, Value, When
+from django.db.models.functions import Coalesce, Round
+from django.db.models.lookups import GreaterThan
+from datetime import time
+
+class TripQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Trips the user created or keeps in one of their buckets."""
+        return self.filter(models.Q(created_by=user) | models.Q(buckets__created_by=user)).distinct()
 
 class Trip(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    # nullable: trips created before ownership was tracked are only reachable through buckets
+    created_by = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="trips_created", blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # also touched when one of its events or activities changes (see receivers.py)
+    updated_at = models.DateTimeField(auto_now=True)
+    
     name = models.CharField(max_length=510)
     
+    objects = TripQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_by", "created_at"], name="trip_owner_created_idx"),
+        ]
+    
     def __str__(self):
         return self.name
 
+# --- DATABASE EXPRESSIONS ---
+
+class CombineDateTime(Func):
+    """date + time as a datetime, midnight when the time is missing, NULL without a date."""
+    arity = 2
+    output_field = models.DateTimeField()
+    template = "(%(expressions)s)"
+    arg_joiner = " + "
+
+    def __init__(self, date_field, time_field, **extra):
+        super().__init__(date_field, Coalesce(time_field, Value(time(0, 0))), **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template="datetime(%(expressions)s)", arg_joiner=" || ' ' || ", **extra_context)
+
+class HoursBetween(Func):
+    """Hours from the first to the second datetime expression."""
+    arity = 2
+    output_field = models.FloatField()
+    template = "(EXTRACT(EPOCH FROM (%(expressions)s)) / 3600)"
+    arg_joiner = " - "
+
+    def __init__(self, start, end, **extra):
+        super().__init__(end, start, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # julianday() is a float, so round to whole seconds first
+        return self.as_sql(
+            compiler, connection,
+            template="(ROUND((julianday(%(expressions)s)) * 86400) / 3600.0)", arg_joiner=") - julianday(",
+            **extra_context,
+        )
+
+def effective_start_field():
+    return models.GeneratedField(
+        expression=CombineDateTime("date_start", "time_start"),
+        output_field=models.DateTimeField(blank=True, null=True),
+        db_persist=False,
+    )
+
+def effective_end_field():
+    return models.GeneratedField(
+        expression=CombineDateTime("date_end", "time_end"),
+        output_field=models.DateTimeField(blank=True, null=True),
+        db_persist=False,
+    )
+
+def duration_field():
+    """Hours between start and end (one decimal), 0 if the end isn't after the start, NULL if anything is missing."""
+    start = CombineDateTime("date_start", "time_start")
+    end = CombineDateTime("date_end", "time_end")
+    return models.GeneratedField(
+        expression=Case(
+            When(
+                Q(date_start__isnull=True) | Q(time_start__isnull=True) | Q(date_end__isnull=True) | Q(time_end__isnull=True),
+                then=Value(None),
+            ),
+            When(GreaterThan(end, start), then=Round(HoursBetween(start, end), 1)),
+            default=Value(0),
+            output_field=models.DecimalField(max_digits=10, decimal_places=1),
+        ),
+        output_field=models.DecimalField(blank=True, null=True, max_digits=10, decimal_places=1),
+        db_persist=False,
+    )
+
 # --- MIXINS ---
 
 class TimelineMixin:
-    """Logic for Dates, Times and Duration"""
-    
-    @property
-    def effective_start(self):
-        if self.date_start:
-            if self.time_start:
-                return datetime.combine(self.date_start, self.time_start)
-            return self.date_start
-        return None
-
-    @property
-    def effective_end(self):
-        if self.date_end:
-            if self.time_end:
-                return datetime.combine(self.date_end, self.time_end)
-            return self.date_end
-        return None
+    """
+    Display logic for Dates, Times and Duration.
+    `duration`, `effective_start` and `effective_end` are computed by the database (see the fields above),
+    so they stay correct for bulk_create/update() and can be sorted and filtered on in SQL.
+    """
 
     @property
     def has_time(self):
@@ -43,25 +118,10 @@ class TimelineMixin:
             return f"{self.duration}h"
         return None
 
-    def calculate_duration(self):
-        """Internal logic to calculate hours between start and end."""
-        if (self.date_start and self.time_start and 
-            self.date_end and self.time_end):
-            
-            start = datetime.combine(self.date_start, self.time_start)
-            end = datetime.combine(self.date_end, self.time_end)
-            
-            if end > start:
-                diff = end - start
-                hours = diff.total_seconds() / 3600
-                self.duration = round(hours, 1)
-            else:
-                self.duration = 0
-
 # --- MAIN MODELS ---
 
 class Event(TimelineMixin, models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     trip = models.ForeignKey(Trip, on_delete=models.CASCADE, related_name="events")
     name = models.CharField(max_length=510)
     
@@ -69,18 +129,23 @@ class Event(TimelineMixin, models.Model):
     time_start = models.TimeField(blank=True, null=True)
     date_end = models.DateField(blank=True, null=True)
     time_end = models.TimeField(blank=True, null=True)
-    duration = models.DecimalField(blank=True, null=True, max_digits=10, decimal_places=1)
+    duration = duration_field()
+    effective_start = effective_start_field()
+    effective_end = effective_end_field()
     
     location = models.CharField(max_length=510, blank=True, null=True)
     extra_infos = models.TextField(blank=True, null=True)
     optional = models.BooleanField(default=False)
     
-    def save(self, *args, **kwargs):
-        self.calculate_duration()
-        super().save(*args, **kwargs)
-
+    class Meta:
+        indexes = [
+            models.Index(fields=["trip", "date_start", "time_start"], name="event_trip_start_idx"),
+            models.Index(fields=["trip", "effective_start"], name="event_trip_effective_idx"),
+        ]
+    
     def __str__(self):
-        return f"{self.trip.name} - {self.name}"
+        # not the trip's name: printing a list of events would load each trip
+        return self.name
 
 class Activity(TimelineMixin, models.Model):
     class ACTIVITY_TYPES(models.TextChoices):
@@ -94,7 +159,7 @@ class Activity(TimelineMixin, models.Model):
         MAIN = "MAIN", "Main Activity"
         WAITING = "WAITING", "Waiting / Buffer"
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="activities")
     activity_type = models.CharField(max_length=255, choices=ACTIVITY_TYPES.choices)
     name = models.CharField(max_length=510)
@@ -103,21 +168,24 @@ class Activity(TimelineMixin, models.Model):
     time_start = models.TimeField(blank=True, null=True)
     date_end = models.DateField(blank=True, null=True)
     time_end = models.TimeField(blank=True, null=True)
-    duration = models.DecimalField(blank=True, null=True, max_digits=10, decimal_places=1)
+    duration = duration_field()
+    effective_start = effective_start_field()
+    effective_end = effective_end_field()
     
     location_start = models.CharField(max_length=510, blank=True, null=True)
     location_end = models.CharField(max_length=510, blank=True, null=True)
     
     class Meta:
         verbose_name_plural = "Activities"
+        indexes = [
+            models.Index(fields=["event", "date_start", "time_start"], name="activity_event_start_idx"),
+            models.Index(fields=["event", "effective_start"], name="activity_event_effective_idx"),
+        ]
 
     def save(self, *args, **kwargs):
-        # 1. Auto-fill Date from Event if missing
-        if not self.date_start and self.event and self.event.date_start:
+        # Auto-fill Date from Event if missing (only then is the event loaded)
+        if not self.date_start and self.event_id and self.event.date_start:
             self.date_start = self.event.date_start
-
-        # 2. Auto-calculate duration
-        self.calculate_duration()
         
         super().save(*args, **kwargs)
 
@@ -127,7 +195,7 @@ class Activity(TimelineMixin, models.Model):
 # --- RESOURCE MODELS ---
 
 class TripImage(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="images", blank=True, null=True)
     activity = models.ForeignKey(Activity, on_delete=models.CASCADE, related_name="images", blank=True, null=True)
     image = models.ImageField(upload_to='trip_images/')
@@ -138,7 +206,7 @@ class TripImage(models.Model):
         verbose_name_plural = "Trip Images"
 
 class TripFile(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="files", blank=True, null=True)
     activity = models.ForeignKey(Activity, on_delete=models.CASCADE, related_name="files", blank=True, null=True)
     file = models.FileField(upload_to='trip_files/')
@@ -149,7 +217,7 @@ class TripFile(models.Model):
         verbose_name_plural = "Trip Files"
 
 class TripLink(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="links", blank=True, null=True)
     activity = models.ForeignKey(Activity, on_delete=models.CASCADE, related_name="links", blank=True, null=True)
     url = models.URLField()
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Trip, Event, Activity
+
+
+# Trip.updated_at is the change stamp of the trip page (conditional GETs in trip_read)
+@receiver([post_save, post_delete], sender=Event, dispatch_uid="_trips.receivers.event_changed")
+def event_changed(sender, instance, **kwargs):
+    Trip.objects.filter(pk=instance.trip_id).update(updated_at=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=Activity, dispatch_uid="_trips.receivers.activity_changed")
+def activity_changed(sender, instance, **kwargs):
+    Trip.objects.filter(events=instance.event_id).update(updated_at=timezone.now())
@@ -1,3 +1,72 @@
-from django.test import TestCase
+import random
+from datetime import date, time
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from _global.seeding import seed_trips
+from .conflicts import Interval, compute_trip_conflicts, overlapping_pairs
+from .models import Event, Trip
+
+
+class TripDayTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = get_user_model().objects.create_user("traveller", password="x")
+        cls.trip_pk = seed_trips(cls.owner, 1, 2, 1)[0]
+        day = Event.objects.filter(trip=cls.trip_pk).values_list("date_start", flat=True).first()
+        cls.url = reverse("trip_day", kwargs={"trip_pk": cls.trip_pk, "day": day.isoformat()})
+
+    def test_owner_sees_the_day(self):
+        self.client.force_login(self.owner)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_invisible_trip_is_not_found(self):
+        self.client.force_login(get_user_model().objects.create_user("stranger", password="x"))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_event_label_needs_no_query(self):
+        event = Event.objects.filter(trip=self.trip_pk).first()
+        with self.assertNumQueries(0):
+            str(event)
+
+
+class OverlappingPairsTests(SimpleTestCase):
+    def pairs(self, *intervals):
+        return sorted(
+            (a.key, b.key, start, end)
+            for a, b, start, end in overlapping_pairs([Interval(start, end, key) for key, (start, end) in enumerate(intervals)])
+        )
+
+    def test_touching_intervals_dont_overlap(self):
+        self.assertEqual(self.pairs((1, 2), (2, 3), (3, 4)), [])
+
+    def test_overlap_is_the_shared_span(self):
+        self.assertEqual(self.pairs((1, 3), (2, 4)), [(0, 1, 2, 3)])
+        # touching at one end, overlapping at the other
+        self.assertEqual(self.pairs((1, 3), (3, 5), (2, 4)), [(0, 2, 2, 3), (2, 1, 3, 4)])
+
+    def test_contained_and_equal_intervals(self):
+        self.assertEqual(self.pairs((1, 10), (2, 3), (4, 5)), [(0, 1, 2, 3), (0, 2, 4, 5)])
+        self.assertEqual(len(self.pairs((1, 2), (1, 2), (1, 2))), 3)
+
+    def test_matches_comparing_every_pair(self):
+        rng = random.Random(0)
+        intervals = [(start, start + rng.randint(1, 10)) for start in (rng.randint(0, 100) for _ in range(200))]
+        expected = sorted(
+            (min(i, j), max(i, j))
+            for i, (start, end) in enumerate(intervals) for j, (other_start, other_end) in enumerate(intervals)
+            if i < j and start < other_end and other_start < end
+        )
+        self.assertEqual(sorted((min(a, b), max(a, b)) for a, b, _, _ in self.pairs(*intervals)), expected)
+
+
+class TripConflictTests(TestCase):
+    def test_back_to_back_events_dont_conflict(self):
+        trip = Trip.objects.create(name="Lisbon")
+        day = date(2026, 5, 1)
+        for name, start, end in [("Museum", time(10), time(12)), ("Lunch", time(12), time(13)), ("Tram", time(11), time(12, 30))]:
+            Event.objects.create(trip=trip, name=name, date_start=day, time_start=start, date_end=day, time_end=end)
+        conflicts = {(conflict["a"]["name"], conflict["b"]["name"]) for conflict in compute_trip_conflicts(trip.pk)}
+        self.assertEqual(conflicts, {("Museum", "Tram"), ("Tram", "Lunch")})
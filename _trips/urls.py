@@ -4,4 +4,6 @@ from . import views
 urlpatterns = [
     path('', views.trip_list, name="trip_list"),
     path('<uuid:trip_pk>/', views.trip_read, name="trip_read"),
+    path('<uuid:trip_pk>/days/<str:day>/', views.trip_day, name="trip_day"),
+    path('<uuid:trip_pk>/conflicts/', views.trip_conflicts, name="trip_conflicts"),
 ]
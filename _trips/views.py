@@ -1,22 +1,69 @@
+from datetime import date
+
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Prefetch
+from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Prefetch
+from django.http import Http404, JsonResponse
+
+from _global.conditional import stamped
+from _global.pagination import paginate_keyset
+from .conflicts import get_trip_conflicts
 from .models import Trip, Event, Activity, TripImage, TripFile, TripLink
 
+# URL slug for events without a start date
+UNSCHEDULED = "unscheduled"
+
+def trip_read_stamp(request, trip_pk):
+    updated_at = Trip.objects.visible_to(request.user).filter(pk=trip_pk).values_list("updated_at", flat=True).first()
+    return (updated_at, trip_pk) if updated_at else None
+
+@login_required
+@stamped(trip_read_stamp)
 def trip_read(request, trip_pk):
-    trip = get_object_or_404(Trip, pk=trip_pk)
+    trip = get_object_or_404(Trip.objects.visible_to(request.user), pk=trip_pk)
+    
+    # Only a lightweight day index here: one aggregate query, however long the trip is.
+    # Each day's events are loaded lazily through trip_day.
+    days = Event.objects.filter(trip=trip).values("date_start").annotate(
+        event_count=Count("id"),
+    ).order_by("date_start")
+    
+    context = {
+        "title_action_section": True,
+        "page_title": trip.name,
+        "trip": trip,
+        "conflict_count": len(get_trip_conflicts(trip.pk)),
+        "days": [
+            {**day, "slug": day["date_start"].isoformat() if day["date_start"] else UNSCHEDULED}
+            for day in days
+        ],
+    }
+    return render(request, "trips/trip_read.html", context)
+
+@login_required
+def trip_day(request, trip_pk, day):
+    if day == UNSCHEDULED:
+        day_filter = {"date_start__isnull": True}
+    else:
+        try:
+            day_filter = {"date_start": date.fromisoformat(day)}
+        except ValueError:
+            raise Http404
+    # a trip the user can't see is a 404, not an empty day
+    trip = get_object_or_404(Trip.objects.visible_to(request.user), pk=trip_pk)
     
     # 1. Prefetch Activities (with their resources)
-    # We sort activities by time so the timeline is correct
-    activities_qs = Activity.objects.order_by('date_start', 'time_start').prefetch_related(
+    # We sort activities by their effective start so the timeline is correct
+    activities_qs = Activity.objects.order_by('effective_start').prefetch_related(
         'images', 
         'files', 
         'links'
     )
     
-    # 2. Prefetch Events
+    # 2. Events of this day only
     # Filter Event Resources: Only get images/files/links that are NOT attached to an activity
     # (activity__isnull=True)
-    events = Event.objects.filter(trip=trip).order_by('date_start', 'time_start').prefetch_related(
+    events = Event.objects.filter(trip=trip, **day_filter).order_by('effective_start').prefetch_related(
         
         # Event Resources (Filtered)
         Prefetch('images', queryset=TripImage.objects.filter(activity__isnull=True)),
@@ -28,11 +75,29 @@ def trip_read(request, trip_pk):
     )
     
     context = {
-        "trip": trip,
         "events": events,
     }
-    
-    return render(request, "trip_read.html", context)
-    
+    if request.htmx:
+        return render(request, "trips/trip_day_events.html", context)
+    context.update({
+        "title_action_section": True,
+        "page_title": day,
+    })
+    return render(request, "trips/trip_day.html", context)
+
+@login_required
+def trip_conflicts(request, trip_pk):
+    trip = get_object_or_404(Trip.objects.visible_to(request.user), pk=trip_pk)
+    conflicts = get_trip_conflicts(trip.pk)
+    return JsonResponse({"trip": str(trip.pk), "count": len(conflicts), "conflicts": conflicts})
+
+@login_required
 def trip_list(request):
-    pass
+    page = paginate_keyset(request, Trip.objects.visible_to(request.user))
+    context = {
+        "title_action_section": True,
+        "page_title": "My trips",
+        "obj_list": page.object_list,
+        "page": page,
+    }
+    return render(request, "trips/trip_list.html", context)
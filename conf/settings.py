@@ -77,6 +77,7 @@ SOCIALACCOUNT_PROVIDERS = {
 }
 
 MIDDLEWARE = [
+    '_global.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,21 +93,33 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'conf.urls'
 
+# Templates are parsed once per process and kept by the cached loader. The development
+# autoreloader clears that cache whenever a template changes, so it is used with DEBUG as well.
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': ['templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
         },
     },
 ]
 
+# Compile every template when the WSGI application starts (see _global.template_cache)
+TEMPLATE_WARMUP = not DEBUG
+
 WSGI_APPLICATION = 'conf.wsgi.application'
 
 
@@ -171,6 +184,8 @@ CACHES = {
         "LOCATION": "redis://127.0.0.1:6379/1",  # Using db 1 for default
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "SOCKET_CONNECT_TIMEOUT": 1,
+            "SOCKET_TIMEOUT": 1,
         }
     },
     "select2": {
@@ -178,8 +193,55 @@ CACHES = {
         "LOCATION": "redis://127.0.0.1:6379/2",  # Using db 2 for select2
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "SOCKET_CONNECT_TIMEOUT": 1,
+            "SOCKET_TIMEOUT": 1,
         }
     }
 }
 
-SELECT2_CACHE_BACKEND = "select2"
\ No newline at end of file
+SELECT2_CACHE_BACKEND = "select2"
+# Result pages of the server-searched widgets (_global.select2)
+SELECT2_RESULTS_CACHE_TIMEOUT = 60
+
+# Tiered cache (_global.cache): in-process LRU in front of the default cache
+L1_CACHE_MAX_ENTRIES = 1000
+L1_CACHE_TTL = 60
+# Longest time another process keeps using a bumped (invalidated) cache version
+CACHE_VERSION_TTL = 2
+
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "_global": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
+# Share of requests whose Server-Timing metrics are also written to the log (0.0 - 1.0);
+# requests over their PERFORMANCE_BUDGETS entry are always logged
+PERFORMANCE_LOG_SAMPLE_RATE = 0.01
+
+# Log statements slower than this (in ms) with their query plan; None disables the slow-query log
+SLOW_QUERY_THRESHOLD_MS = None
+SLOW_QUERY_EXPLAIN = True
+
+# /metrics is open to staff users and these client IPs (e.g. the Prometheus server)
+METRICS_ALLOWED_IPS = []
+# Workers write their metrics snapshot here so /metrics can sum all of them; None keeps them per process
+METRICS_DIR = os.environ.get("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = 5
+
+# Performance budgets checked by `manage.py bench_views` (and logged when exceeded by a request).
+# "default" applies to every view, entries keyed by URL name override it.
+PERFORMANCE_BUDGETS = {
+    "default": {"queries": 10, "ms": 500},
+    # one keyset query per member relation, then one hydration query (plus tags) per kind on the page
+    "bucket_read": {"queries": 30},
+    "bucket_content": {"queries": 30},
+    # the visible trip, its events of the day and the activities, with three resource prefetches for each
+    "trip_day": {"queries": 12},
+}